@@ -0,0 +1,79 @@
+"""
+JWT authentication with a cached user.
+
+`CachedJWTAuthentication` is simplejwt's JWTAuthentication, except that the
+user is read from the shared cache, keyed by a per-user version, instead of
+with a SELECT on every request. It is loaded with its user_type, which most
+views look at. Saving or deleting the user bumps the version (see
+account/signals.py); this covers password changes and deactivation, which
+both save the user. AUTH_USER_CACHE_SECONDS keeps the TTL short, which bounds
+the staleness after writes that bypass save(), such as queryset.update().
+
+`add_user_claims(token, user)` puts stable claims (email, first name and the
+user_type term) in tokens issued at login and signup, so clients can read
+them without asking the API. Set JWT_EMBED_USER_CLAIMS = False to leave
+them out.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from globalconceptBE.cache_versions import bump, current_version
+
+AUTH_USER_VERSION_KEY = "account:auth-user:version:{user_id}"
+AUTH_USER_KEY = "account:auth-user:{user_id}:{version}"
+
+
+def invalidate_auth_user(user_id):
+    """The next request authenticated as `user_id` reloads the user."""
+    if user_id is not None:
+        bump(AUTH_USER_VERSION_KEY.format(user_id=user_id))
+
+
+def get_cached_user(user_id):
+    """The user with primary key `user_id` (with its user_type), or None."""
+    from account.models import User
+
+    version = current_version(AUTH_USER_VERSION_KEY.format(user_id=user_id))
+    key = AUTH_USER_KEY.format(user_id=user_id, version=version)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related("user_type").filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, getattr(settings, "AUTH_USER_CACHE_SECONDS", 60))
+    return user
+
+
+def add_user_claims(token, user):
+    if getattr(settings, "JWT_EMBED_USER_CLAIMS", True):
+        token["email"] = user.email
+        token["first_name"] = user.first_name
+        token["user_type"] = user.user_type.term if user.user_type else None
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
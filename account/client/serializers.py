@@ -18,6 +18,8 @@ class ClientSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Client
+        select_related = ('client_type',)
+        prefetch_related = ('service_of_interest', 'assign_to_teams')
         fields = [
             'id',
             'password',
@@ -50,6 +52,7 @@ class ClientSerializer(serializers.ModelSerializer):
             "is_prospect",
             "wallet",
             "referred_by",
+            "referral_count",
         ]
         read_only_fields = [
             'id',
@@ -62,6 +65,7 @@ class ClientSerializer(serializers.ModelSerializer):
             'service_of_interest_name',
             'assigned_to_teams_name',
             "wallet",
+            "referral_count",
         ]
         extra_kwargs = {
             'password': {'write_only': True},
@@ -0,0 +1,111 @@
+"""
+Collision-free custom_id allocation.
+
+Codes are 7 base36 characters, like the random codes issued before. Instead
+of drawing a random code and probing the table for it, each code comes from
+a monotonically increasing counter passed through a keyed bijection (a
+Feistel network over 38 bits, cycle-walked into the 36**7 code space). A
+counter value never repeats, so a code never repeats, and neighbouring
+values give unrelated-looking codes.
+
+The counter is a PostgreSQL sequence where available, so allocation takes
+no lock and survives rollbacks without handing a value out twice; other
+backends fall back to the single-row CustomIdCounter table.
+
+CUSTOM_ID_KEY (default: SECRET_KEY) keys the bijection. Changing it once
+codes have been issued would let new codes collide with old ones.
+"""
+import hashlib
+import hmac
+import string
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+ALPHABET = string.digits + string.ascii_uppercase
+LENGTH = 7
+DOMAIN = len(ALPHABET) ** LENGTH  # 78,364,164,096 codes
+
+SEQUENCE_NAME = "account_custom_id_seq"
+
+_HALF_BITS = 19  # 2**38 is the smallest even-bit block covering DOMAIN
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+
+def _key():
+    return (getattr(settings, "CUSTOM_ID_KEY", "") or settings.SECRET_KEY).encode()
+
+
+def _round(key, index, half):
+    digest = hmac.new(key, b"%d:%d" % (index, half), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], "big") & _HALF_MASK
+
+
+def permute(value, key=None):
+    """Map 0 <= value < DOMAIN to a unique, scrambled value in the same range."""
+    if not 0 <= value < DOMAIN:
+        raise ValueError(f"custom_id counter exhausted or negative: {value}")
+    key = key or _key()
+    while True:
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for index in range(_ROUNDS):
+            left, right = right, left ^ _round(key, index, right)
+        value = (left << _HALF_BITS) | right
+        # Cycle-walk: a bijection on 2**38 revisits DOMAIN in a few steps.
+        if value < DOMAIN:
+            return value
+
+
+def encode(value):
+    chars = []
+    for _ in range(LENGTH):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def ensure_sequence():
+    """Create the PostgreSQL counter sequence (no-op on other backends)."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME}")
+
+
+def _next_values(count):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT nextval('{SEQUENCE_NAME}') FROM generate_series(1, %s)", [count])
+            return [row[0] for row in cursor.fetchall()]
+
+    from account.models import CustomIdCounter
+
+    with transaction.atomic():
+        CustomIdCounter.objects.get_or_create(pk=1)
+        CustomIdCounter.objects.filter(pk=1).update(value=F("value") + count)
+        end = CustomIdCounter.objects.values_list("value", flat=True).get(pk=1)
+    return list(range(end - count + 1, end + 1))
+
+
+def allocate_custom_ids(count):
+    """Return `count` unused custom_ids."""
+    from account.models import User
+
+    codes = []
+    while len(codes) < count:
+        key = _key()
+        batch = [encode(permute(value, key)) for value in _next_values(count - len(codes))]
+        # Codes issued by the old random generator can still be hit; one
+        # lookup per batch skips them.
+        taken = set(User.objects.filter(custom_id__in=batch).values_list("custom_id", flat=True))
+        codes.extend(code for code in batch if code not in taken)
+    return codes
+
+
+def assign_custom_ids(users):
+    """Fill custom_id on every user that lacks one, e.g. before bulk_create."""
+    missing = [user for user in users if not user.custom_id]
+    for user, code in zip(missing, allocate_custom_ids(len(missing)) if missing else []):
+        user.custom_id = code
+    return users
@@ -0,0 +1,141 @@
+"""
+Customer dashboard read model.
+
+`get_dashboard(user)` serves the payload of CustomerDashboardView from the
+shared cache, keyed by a per-user version. Writes to any model that feeds the
+dashboard bump that user's version (see account/signals.py), so a warm load
+does no database work at all and a stale payload is never served.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from globalconceptBE.cache_versions import bump, current_version
+
+DASHBOARD_VERSION_KEY = "account:dashboard:version:{user_id}"
+DASHBOARD_DATA_KEY = "account:dashboard:{user_id}:{version}"
+
+ACTIVE_LOAN_STATUSES = ["Pending", "Approved", "Active"]
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def invalidate_dashboard(user_id):
+    """Make the next dashboard load for `user_id` rebuild from the database."""
+    if user_id is not None:
+        bump(DASHBOARD_VERSION_KEY.format(user_id=user_id))
+
+
+def get_dashboard(user):
+    version = current_version(DASHBOARD_VERSION_KEY.format(user_id=user.pk))
+    key = DASHBOARD_DATA_KEY.format(user_id=user.pk, version=version)
+    data = cache.get(key)
+    if data is None:
+        data = build_dashboard(user)
+        cache.set(key, data, getattr(settings, "CUSTOMER_DASHBOARD_CACHE_SECONDS", 600))
+    return data
+
+
+def _application_counts(queryset):
+    return queryset.aggregate(
+        total=Count("id"),
+        pending=Count("id", filter=Q(status__term__iexact="pending")),
+    )
+
+
+def _profile_completion(user):
+    from account.models import UserProfile
+
+    core_fields = [
+        user.first_name, user.last_name, user.phone_number,
+        user.date_of_birth, user.gender_id, user.nationality,
+        user.country_of_residence, user.current_address, user.profile_picture,
+    ]
+    extended = (
+        UserProfile.objects.filter(user_id=user.pk)
+        .values_list("passport_number", "highest_qualification", "previous_job_title", "emergency_contact_name")
+        .first()
+    )
+    all_fields = core_fields + list(extended or [])
+    filled = sum(1 for f in all_fields if f)
+    return round(filled / len(all_fields) * 100) if all_fields else 0
+
+
+def _recent_applications(model, owner_field, user_id, kind, label):
+    applications = (
+        model.objects.filter(**{f"{owner_field}_id": user_id})
+        .select_related("status")
+        .only("id", "submitted_at", "status__term")
+        .order_by("-submitted_at")[:3]
+    )
+    return [
+        {
+            "id": app.pk,
+            "type": kind,
+            "label": label,
+            "status": str(app.status) if app.status else "pending",
+            "date": app.submitted_at.strftime(DATE_FORMAT) if app.submitted_at else None,
+        }
+        for app in applications
+    ]
+
+
+def build_dashboard(user):
+    """Compute the dashboard payload for `user` in a handful of aggregate queries."""
+    from account.client.documents.models import ClientDocuments
+    from app.visa.study.models import StudyVisaApplication
+    from app.visa.work.offers.models import WorkVisaApplication
+    from wallet.loan.models import LoanApplication
+    from wallet.models import Wallet
+    from wallet.transactions.models import WalletTransaction
+
+    # Client is a multi-table child of User, so applications reference the user's pk.
+    study = _application_counts(StudyVisaApplication.objects.filter(applicant_id=user.pk))
+    work = _application_counts(WorkVisaApplication.objects.filter(client_id=user.pk))
+
+    wallet = Wallet.objects.filter(user_id=user.pk).values("balance", "currency").first()
+    wallet_currency = wallet["currency"] if wallet else "NGN"
+
+    loans = LoanApplication.objects.filter(user_id=user.pk).aggregate(
+        active=Count("id", filter=Q(status__term__in=ACTIVE_LOAN_STATUSES)),
+        total_amount=Sum("amount"),
+    )
+
+    recent_transactions = [
+        {
+            "id": tx["id"],
+            "type": tx["transaction_type"],
+            "amount": float(tx["amount"]),
+            "currency": tx["currency"],
+            "status": tx["status"],
+            "description": tx["description"],
+            "date": tx["created_at"].strftime(DATE_FORMAT),
+        }
+        for tx in WalletTransaction.objects.filter(user_id=user.pk)
+        .order_by("-created_at")
+        .values("id", "transaction_type", "amount", "currency", "status", "description", "created_at")[:5]
+    ]
+
+    recent_applications = (
+        _recent_applications(StudyVisaApplication, "applicant", user.pk, "study_visa", "Study Visa Application")
+        + _recent_applications(WorkVisaApplication, "client", user.pk, "work_visa", "Work Visa Application")
+    )
+    recent_applications.sort(key=lambda x: x["date"] or "", reverse=True)
+
+    return {
+        "profile_completion": _profile_completion(user),
+        "applications": {
+            "total": study["total"] + work["total"],
+            "pending": study["pending"] + work["pending"],
+            "study_visa": study["total"],
+            "work_visa": work["total"],
+        },
+        "wallet": {
+            "balance": float(wallet["balance"]) if wallet else None,
+            "currency": wallet_currency,
+        },
+        "loans": {"active": loans["active"], "total_amount": float(loans["total_amount"] or 0)},
+        "documents_uploaded": ClientDocuments.objects.filter(client_id=user.pk).count(),
+        "recent_transactions": recent_transactions,
+        "recent_applications": recent_applications[:5],
+    }
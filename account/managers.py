@@ -46,6 +46,11 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(), so allocate the missing custom_ids in one batch.
+        from account.custom_ids import assign_custom_ids
+        return super().bulk_create(assign_custom_ids(list(objs)), *args, **kwargs)
+
 
 # ✅ Role-based managers
 class SuperAdminManager(models.Manager):
@@ -6,23 +6,21 @@ from definition.permissions.models import UserPermissions
 from definition.roles.models import Roles
 from django_countries.fields import CountryField
 from cloudinary.models import CloudinaryField
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
 from globalconceptBE.validators import validate_image_file
-import string
-import random
 
 
 def generate_unique_custom_id():
-    from account.models import User
-    attempts = 0
-    while attempts < 10:
-        custom_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=7))
-        if not User.objects.filter(custom_id=custom_id).exists():
-            return custom_id
-        attempts += 1
-    raise ValueError("Unable to generate unique custom_id after several attempts")
+    from account.custom_ids import allocate_custom_ids
+    return allocate_custom_ids(1)[0]
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class CustomIdCounter(models.Model):
+    """Single-row counter behind account.custom_ids on backends without sequences."""
+    value = models.BigIntegerField(default=0)
+
+
+class User(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     first_name = models.CharField(max_length=200)
     middle_name = models.CharField(max_length=200, null=True, blank=True)
     last_name = models.CharField(max_length=200)
@@ -63,17 +61,43 @@ class User(AbstractBaseUser, PermissionsMixin):
         help_text="The custom_id of the user who referred this client",
         verbose_name="Referred By"
     )
+    referral_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text="Number of users whose referred_by is this user's custom_id (kept in sync by signals)."
+    )
+    # Written only by account/referrals.py; ordinary saves of an existing row
+    # leave them out, so a stale instance cannot write an old count back.
+    counter_fields = ('referral_count',)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
     objects = UserManager()
 
+    # The referral counter signals compare referred_by on save; the CV render
+    # signals compare the fields printed on a CV.
+    tracked_fields = (
+        'referred_by', 'first_name', 'middle_name', 'last_name', 'email', 'phone_number', 'country_of_residence',
+    )
+
+    class Meta:
+        indexes = [
+            # Referee listing: filter on referred_by, newest first.
+            models.Index(fields=['referred_by', '-created_date', '-id']),
+        ]
+
     def save(self, *args, **kwargs):
         if self.referred_by and self.custom_id and self.referred_by == self.custom_id:
             raise ValueError("A user cannot refer themselves.")
         if not self.custom_id:
             self.custom_id = generate_unique_custom_id()
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
         super().save(*args, **kwargs)
 
     @property
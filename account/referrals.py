@@ -0,0 +1,38 @@
+"""
+Materialized referral counters.
+
+`User.referral_count` holds how many users have `referred_by` equal to that
+user's custom_id. Signals refresh the counters of the referrers a write
+touches (see account/signals.py); `sync_referral_counts` recomputes all of
+them in one statement and runs after migrate. User.save() leaves the counter
+out, so only these updates write it; they drop the recounted users from the
+authentication cache, which serves the user serializers.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from account.authentication import invalidate_auth_user
+from account.models import User
+
+
+def refresh_referral_counts(*codes):
+    """Recount the referees of the users whose custom_id is in `codes`."""
+    for code in {code for code in codes if code}:
+        referrers = User.objects.filter(custom_id=code)
+        referrers.update(referral_count=User.objects.filter(referred_by=code).count())
+        for user_id in referrers.values_list("pk", flat=True):
+            invalidate_auth_user(user_id)
+
+
+def sync_referral_counts():
+    """Recompute every user's referral_count."""
+    referees = (
+        User.objects.filter(referred_by=OuterRef("custom_id"))
+        .order_by()
+        .values("referred_by")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return User.objects.update(
+        referral_count=Coalesce(Subquery(referees, output_field=IntegerField()), Value(0))
+    )
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from wallet.serializers import WalletSerializer
 from .models import User, UserProfile
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 
 
 def _country_repr(val):
@@ -29,7 +30,7 @@ class UserProfileExtendedSerializer(serializers.ModelSerializer):
 
 # ── Full profile read (GET /users/profile/) ──────────────────────────────────
 
-class UserProfileDetailSerializer(serializers.ModelSerializer):
+class UserProfileDetailSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     """All User fields + extended profile fields flattened."""
     country_of_residence = serializers.SerializerMethodField()
     nationality = serializers.SerializerMethodField()
@@ -58,6 +59,7 @@ class UserProfileDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        select_related = ('user_type', 'gender', 'extended_profile')
         fields = [
             "id", "first_name", "middle_name", "last_name",
             "phone_number", "date_of_birth", "gender", "gender_name",
@@ -244,13 +246,15 @@ class UserProfileUpdateSerializer(serializers.Serializer):
 
 # ── Legacy UserSerializer (kept for admin ViewSet) ────────────────────────────
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     country_of_residence = serializers.SerializerMethodField()
     nationality = serializers.SerializerMethodField()
     wallet = WalletSerializer(read_only=True)
 
     class Meta:
         model = User
+        select_related = ('user_type', 'gender')
+        prefetch_related = ('extra_permissions',)
         fields = [
             "id", "first_name", "middle_name", "last_name",
             "phone_number", "date_of_birth", "gender",
@@ -261,12 +265,13 @@ class UserSerializer(serializers.ModelSerializer):
             "created_by", "created_date", "modified_by", "modified_date",
             "last_login", "user_type_name", "full_name",
             "profile_picture_url", "gender_name", "referred_by", "wallet",
+            "referral_count",
         ]
         read_only_fields = [
             "id", "custom_id", "created_by", "created_date",
             "modified_by", "modified_date", "last_login",
             "user_type_name", "full_name", "profile_picture_url",
-            "wallet", "gender_name",
+            "wallet", "gender_name", "referral_count",
         ]
 
     def get_country_of_residence(self, obj):
@@ -1,16 +1,25 @@
-from django.db.models.signals import post_save, post_migrate
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, post_migrate
 from django.dispatch import receiver
 
+from account.client.documents.models import ClientDocuments
+from account.authentication import invalidate_auth_user
+from account.custom_ids import ensure_sequence
+from account.dashboard import invalidate_dashboard
 from account.models import User, UserProfile
+from account.referrals import refresh_referral_counts, sync_referral_counts
 from account.client.models import Client
+from app.visa.study.models import StudyVisaApplication
+from app.visa.work.offers.models import WorkVisaApplication
 from definition.roles.models import Roles
-from definition.models import TableDropDownDefinition
+from wallet.loan.models import LoanApplication
+from wallet.models import Wallet
+from wallet.transactions.models import WalletTransaction
+from definition.registry import get_definition
 
 
 def get_customer_client_type():
-    return TableDropDownDefinition.objects.filter(
-        table_name='client_type', term__iexact='JAPA Client'
-    ).first()
+    return get_definition('client_type', 'JAPA Client', iexact=True)
 
 
 @receiver(post_save, sender=User)
@@ -117,3 +126,76 @@ def create_customer_clients_after_migrate(sender, **kwargs):
                 last_login=user.last_login,
                 is_staff=user.is_staff,
             )
+
+
+# Models that feed CustomerDashboardView, and the attribute holding the user's pk.
+DASHBOARD_OWNER_FIELDS = {
+    User: "pk",
+    Client: "pk",
+    UserProfile: "user_id",
+    Wallet: "user_id",
+    WalletTransaction: "user_id",
+    StudyVisaApplication: "applicant_id",
+    WorkVisaApplication: "client_id",
+    LoanApplication: "user_id",
+    ClientDocuments: "client_id",
+}
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=UserProfile)
+@receiver([post_save, post_delete], sender=Wallet)
+@receiver([post_save, post_delete], sender=WalletTransaction)
+@receiver([post_save, post_delete], sender=StudyVisaApplication)
+@receiver([post_save, post_delete], sender=WorkVisaApplication)
+@receiver([post_save, post_delete], sender=LoanApplication)
+@receiver([post_save, post_delete], sender=ClientDocuments)
+def invalidate_customer_dashboard(sender, instance, **kwargs):
+    """
+    Bump the owner's dashboard version once the write commits, so a
+    concurrent load cannot cache pre-commit data under the new version.
+    """
+    user_id = getattr(instance, DASHBOARD_OWNER_FIELDS[sender])
+    transaction.on_commit(lambda: invalidate_dashboard(user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    """
+    Drop the cached user behind JWT authentication (a password change or
+    deactivation must apply to the next request), and again once the write
+    commits, so a concurrent request cannot re-cache the pre-commit row.
+    """
+    invalidate_auth_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_auth_user(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Client)
+def refresh_referrer_counts(sender, instance, **kwargs):
+    """
+    Keep User.referral_count in step with referred_by. Only the referrers a
+    write touches are recounted, after commit; saves that leave referred_by
+    alone cost nothing.
+    """
+    if kwargs.get('signal') is post_save and not instance.has_changed('referred_by'):
+        return
+    codes = {instance.referred_by, instance.previous('referred_by')}
+    if any(codes):
+        transaction.on_commit(lambda: refresh_referral_counts(*codes))
+
+
+@receiver(post_migrate)
+def backfill_referral_counts(sender, **kwargs):
+    """Recompute every referral counter once the account app is migrated."""
+    if sender.name == 'account':
+        sync_referral_counts()
+
+
+@receiver(post_migrate)
+def create_custom_id_sequence(sender, **kwargs):
+    """Create the sequence behind custom_id allocation (see account/custom_ids.py)."""
+    if sender.name == 'account':
+        ensure_sequence()
@@ -1,3 +1,262 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from account.authentication import CachedJWTAuthentication, add_user_claims, get_cached_user
+from account.client.models import Client
+from account.models import User
+from app.benchmark import fixtures
+from definition.permissions.effective import EffectivePermissions, get_effective_permissions
+from definition.permissions.models import Modules, UserPermissions
+from definition.permissions.staffs_permissions import CanCreateStaffs, CanViewStaffs
+from definition.roles.models import Roles
+from wallet.transactions.models import WalletTransaction
+
+
+class CustomerDashboardCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 3, "notifications": 0, "messages": 0, "applications": 2})
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").get()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.url = reverse("customer_dashboard")
+
+    def test_warm_load_does_no_queries(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.json(), second.json())
+
+    def test_contributing_write_invalidates(self):
+        before = self.client.get(self.url).json()
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(
+                user=self.customer,
+                wallet=self.customer.wallet,
+                transaction_type="deposit",
+                amount=Decimal("10.00"),
+                status="pending",
+                reference="DASHBOARD-TEST-1",
+            )
+        after = self.client.get(self.url).json()
+        self.assertEqual(after["recent_transactions"][0]["id"],
+                         WalletTransaction.objects.get(reference="DASHBOARD-TEST-1").pk)
+        self.assertNotEqual(before["recent_transactions"], after["recent_transactions"])
+
+    def test_cold_build_query_count(self):
+        from account.dashboard import build_dashboard
+
+        # wallet, 2x application counts, loans, transactions, 2x recent
+        # applications, profile, documents
+        with self.assertNumQueries(9):
+            build_dashboard(self.customer)
+
+
+class ReferralTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 3, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.referrer, *cls.clients = Client.objects.filter(
+            email__endswith=f"@{fixtures.EMAIL_DOMAIN}"
+        ).order_by("pk")
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for client in self.clients:
+                client.referred_by = self.referrer.custom_id
+                client.save()
+            self.user = User.objects.create(
+                email="referee@example.com", first_name="Plain", last_name="User",
+                user_type=User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}").user_type,
+                referred_by=self.referrer.custom_id,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.referrer)
+
+    def test_referral_count_follows_referred_by(self):
+        self.referrer.refresh_from_db()
+        self.assertEqual(self.referrer.referral_count, 3)
+
+        moved = User.objects.get(pk=self.clients[0].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.referred_by = None
+            moved.save()
+        self.referrer.refresh_from_db()
+        self.assertEqual(self.referrer.referral_count, 2)
+
+    def test_saving_a_stale_referrer_keeps_the_count(self):
+        stale = Client.objects.get(pk=self.referrer.pk)
+        self.assertEqual(get_cached_user(self.referrer.pk).referral_count, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(
+                email="late@example.com", first_name="Late", last_name="Referee",
+                user_type=self.user.user_type, referred_by=self.referrer.custom_id,
+            )
+        self.assertEqual(get_cached_user(self.referrer.pk).referral_count, 4)
+
+        stale.first_name = "Renamed"
+        stale.save()
+        self.referrer.refresh_from_db()
+        self.assertEqual((self.referrer.first_name, self.referrer.referral_count), ("Renamed", 4))
+
+    def test_referees_listed_once_each(self):
+        response = self.client.get(reverse("my_referees"))
+        data = response.json()
+        self.assertEqual(data["count"], 3)
+        types = {row["id"]: row["referee_type"] for row in data["results"]}
+        self.assertEqual(types, {
+            self.clients[0].pk: "client",
+            self.clients[1].pk: "client",
+            self.user.pk: "user",
+        })
+
+
+class CustomIdAllocatorTests(TestCase):
+
+    def test_codes_are_unique_and_well_formed(self):
+        from account.custom_ids import ALPHABET, allocate_custom_ids
+
+        codes = allocate_custom_ids(500) + allocate_custom_ids(500)
+        self.assertEqual(len(set(codes)), 1000)
+        for code in codes:
+            self.assertEqual(len(code), 7)
+            self.assertTrue(set(code) <= set(ALPHABET))
+
+    def test_permutation_is_injective(self):
+        from account.custom_ids import DOMAIN, permute
+
+        values = list(range(2000)) + list(range(DOMAIN - 2000, DOMAIN))
+        permuted = [permute(value, b"test-key") for value in values]
+        self.assertEqual(len(set(permuted)), len(values))
+        self.assertTrue(all(0 <= value < DOMAIN for value in permuted))
+
+    def test_bulk_create_fills_custom_ids(self):
+        fixtures.seed(counts={"customers": 0, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        user_type = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}").user_type
+        users = User.objects.bulk_create([
+            User(email=f"bulk{i}@example.com", first_name="Bulk", last_name=str(i), user_type=user_type)
+            for i in range(20)
+        ])
+        self.assertTrue(all(user.custom_id for user in users))
+        self.assertEqual(
+            User.objects.filter(email__startswith="bulk").values("custom_id").distinct().count(), 20
+        )
+
+
+class EffectivePermissionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 0, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.view, _ = UserPermissions.objects.get_or_create(name="view staffs")
+        cls.create, _ = UserPermissions.objects.get_or_create(name="create staffs")
+        cls.module = Modules.objects.create(name="Staff management (test)")
+        cls.module.permissions.add(cls.view)
+        cls.role = Roles.objects.create(name="HR (test)")
+        cls.role.modules.add(cls.module)
+        cls.staff = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.staff.role = cls.role
+        cls.staff.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def _allowed(self, permission_class):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.staff.pk)
+        return permission_class().has_permission(request, None)
+
+    def test_checks_are_cached(self):
+        self.assertTrue(self._allowed(CanViewStaffs))
+        self.assertFalse(self._allowed(CanCreateStaffs))
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.staff.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(CanViewStaffs().has_permission(request, None))
+            self.assertFalse(CanCreateStaffs().has_permission(request, None))
+        self.assertEqual(get_effective_permissions(request.user), {"view staffs"})
+
+    def test_module_and_extra_permission_changes_apply_immediately(self):
+        self.assertFalse(self._allowed(CanCreateStaffs))
+        self.module.permissions.add(self.create)
+        self.assertTrue(self._allowed(CanCreateStaffs))
+
+        self.module.permissions.remove(self.create)
+        self.assertFalse(self._allowed(CanCreateStaffs))
+        self.staff.extra_permissions.add(self.create)
+        self.assertTrue(self._allowed(CanCreateStaffs))
+        self.create.extra_user_permissions.remove(self.staff)
+        self.assertFalse(self._allowed(CanCreateStaffs))
+
+    def test_set_cached_before_commit_is_dropped_after_commit(self):
+        stale = EffectivePermissions(self.role.name, frozenset({"view staffs"}))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.module.permissions.add(self.create)
+            # A concurrent request that still reads the old rows caches the old set.
+            with mock.patch("definition.permissions.effective.compute_permissions", return_value=stale):
+                self.assertFalse(self._allowed(CanCreateStaffs))
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self._allowed(CanCreateStaffs))
+
+    def test_role_change_applies_immediately(self):
+        self.assertTrue(self._allowed(CanViewStaffs))
+        User.objects.filter(pk=self.staff.pk).update(role=None)
+        self.assertFalse(self._allowed(CanViewStaffs))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").get()
+
+    def setUp(self):
+        cache.clear()
+
+    def _authenticate(self, token=None):
+        token = token or AccessToken.for_user(self.customer)
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_warm_authentication_does_no_queries(self):
+        user_type = self.customer.user_type.term
+        self._authenticate()
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+            self.assertEqual(user.user_type_name, user_type)
+        self.assertEqual(user.pk, self.customer.pk)
+
+    def test_saves_apply_to_the_next_request(self):
+        self._authenticate()
+        self.customer.first_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.save()
+        self.assertEqual(self._authenticate().first_name, "Renamed")
+
+        token = AccessToken.for_user(self.customer)
+        self.customer.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(token)
+
+    def test_user_claims_are_optional(self):
+        token = add_user_claims(RefreshToken.for_user(self.customer), self.customer)
+        self.assertEqual(token["user_type"], self.customer.user_type.term)
+        with override_settings(JWT_EMBED_USER_CLAIMS=False):
+            token = add_user_claims(RefreshToken.for_user(self.customer), self.customer)
+        self.assertNotIn("user_type", token)
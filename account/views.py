@@ -1,11 +1,12 @@
-from account.models import User, UserProfile
+from account.models import User
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Exists, OuterRef, Sum, Q
 from rest_framework.permissions import IsAdminUser
 from account.client.serializers import ClientSerializer
 from account.client.models import Client
 from app.views import CustomPagination
+from globalconceptBE.prefetch import OptimizedQuerySetMixin, optimize_queryset
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets
@@ -33,12 +34,14 @@ from .serializers import (
     UserProfileDetailSerializer,
     UserProfileUpdateSerializer,
 )
-from .models import User, UserProfile
+from .dashboard import get_dashboard
+from .models import User
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from account.authentication import add_user_claims
 
 
 class SignUpView(APIView):
@@ -69,7 +72,7 @@ class SignUpView(APIView):
                 import logging
                 logging.getLogger(__name__).exception("Welcome email failed for %s: %s", user.email, _email_exc)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = add_user_claims(RefreshToken.for_user(user), user)
             return Response(
                 {
                     "user_id": user.id,
@@ -89,11 +92,7 @@ class SignUpView(APIView):
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
-        token = super().get_token(user)
-        token["email"] = user.email
-        token["first_name"] = user.first_name
-        token["user_type"] = user.user_type.term if user.user_type else None
-        return token
+        return add_user_claims(super().get_token(user), user)
 
     def validate(self, attrs):
         attrs["username"] = attrs.get("email")
@@ -198,7 +197,7 @@ class PasswordResetConfirmView(APIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -249,139 +248,12 @@ class CustomerDashboardView(APIView):
     """
     GET /api/users/dashboard/
     Returns stats and recent activity for the logged-in customer.
+    Served from a per-user cache that signals invalidate (see account/dashboard.py).
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-
-        # Applications
-        try:
-            client = Client.objects.get(pk=user.pk)
-            study_total = StudyVisaApplication.objects.filter(applicant=client).count()
-            study_pending = StudyVisaApplication.objects.filter(
-                applicant=client, status__term__iexact="pending"
-            ).count()
-            work_total = WorkVisaApplication.objects.filter(applicant=client).count()
-            work_pending = WorkVisaApplication.objects.filter(
-                applicant=client, status__term__iexact="pending"
-            ).count()
-        except Client.DoesNotExist:
-            client = None
-            study_total = study_pending = work_total = work_pending = 0
-
-        total_applications = study_total + work_total
-        pending_applications = study_pending + work_pending
-
-        # Wallet
-        wallet_balance = None
-        wallet_currency = "NGN"
-        try:
-            from wallet.models import Wallet
-            w = Wallet.objects.get(user=user)
-            wallet_balance = float(w.balance)
-            wallet_currency = w.currency
-        except Exception:
-            pass
-
-        # Loans
-        try:
-            loans = LoanApplication.objects.filter(user=user)
-            active_loans = loans.filter(
-                status__term__in=["Pending", "Approved", "Active"]
-            ).count()
-            total_loan_amount = float(loans.aggregate(s=Sum("amount"))["s"] or 0)
-        except Exception:
-            active_loans = 0
-            total_loan_amount = 0.0
-
-        # Documents
-        try:
-            from account.client.documents.models import ClientDocuments
-            docs_uploaded = ClientDocuments.objects.filter(client__pk=user.pk).count()
-        except Exception:
-            docs_uploaded = 0
-
-        # Profile completeness
-        core_fields = [
-            user.first_name, user.last_name, user.phone_number,
-            user.date_of_birth, user.gender_id, user.nationality,
-            user.country_of_residence, user.current_address, user.profile_picture,
-        ]
-        try:
-            ep = user.extended_profile
-            ext_fields = [
-                ep.passport_number, ep.highest_qualification,
-                ep.previous_job_title, ep.emergency_contact_name,
-            ]
-        except UserProfile.DoesNotExist:
-            ext_fields = []
-        all_fields = core_fields + ext_fields
-        filled = sum(1 for f in all_fields if f)
-        profile_completion = round(filled / len(all_fields) * 100) if all_fields else 0
-
-        # Recent transactions
-        recent_transactions = []
-        try:
-            for tx in WalletTransaction.objects.filter(user=user).order_by("-created_at")[:5]:
-                recent_transactions.append({
-                    "id": tx.pk,
-                    "type": getattr(tx, "transaction_type", "transaction"),
-                    "amount": float(tx.amount),
-                    "currency": getattr(tx, "currency", wallet_currency),
-                    "status": tx.status,
-                    "description": getattr(tx, "description", ""),
-                    "date": tx.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                })
-        except Exception:
-            pass
-
-        # Recent applications
-        recent_applications = []
-        if client:
-            try:
-                for app in StudyVisaApplication.objects.filter(
-                    applicant=client
-                ).order_by("-submitted_at")[:3]:
-                    recent_applications.append({
-                        "id": app.pk,
-                        "type": "study_visa",
-                        "label": "Study Visa Application",
-                        "status": str(app.status) if app.status else "pending",
-                        "date": app.submitted_at.strftime("%Y-%m-%dT%H:%M:%SZ") if app.submitted_at else None,
-                    })
-            except Exception:
-                pass
-            try:
-                for app in WorkVisaApplication.objects.filter(
-                    applicant=client
-                ).order_by("-submitted_at")[:3]:
-                    recent_applications.append({
-                        "id": app.pk,
-                        "type": "work_visa",
-                        "label": "Work Visa Application",
-                        "status": str(app.status) if app.status else "pending",
-                        "date": app.submitted_at.strftime("%Y-%m-%dT%H:%M:%SZ") if app.submitted_at else None,
-                    })
-            except Exception:
-                pass
-            recent_applications.sort(key=lambda x: x["date"] or "", reverse=True)
-            recent_applications = recent_applications[:5]
-
-        return Response({
-            "profile_completion": profile_completion,
-            "applications": {
-                "total": total_applications,
-                "pending": pending_applications,
-                "study_visa": study_total,
-                "work_visa": work_total,
-            },
-            "wallet": {"balance": wallet_balance, "currency": wallet_currency},
-            "loans": {"active": active_loans, "total_amount": total_loan_amount},
-            "documents_uploaded": docs_uploaded,
-            "recent_transactions": recent_transactions,
-            "recent_applications": recent_applications,
-        })
+        return Response(get_dashboard(request.user))
 
 
 class GetMyRefeereesView(APIView):
@@ -389,47 +261,36 @@ class GetMyRefeereesView(APIView):
 
     def get(self, request):
         user = request.user
-        # Get referees from User model (those whose 'referred_by' = this user's custom_id)
-        user_referees = User.objects.filter(referred_by=user.custom_id)
-        # Get referees from Client model (those whose 'referred_by' = this user's custom_id)
-        client_referees = Client.objects.filter(referred_by=user.custom_id)
-
-        # Combine both querysets as a list, tagging them for serialization
-        combined = (
-            [{'type': 'user', 'instance': u} for u in user_referees] +
-            [{'type': 'client', 'instance': c} for c in client_referees]
+        # Client is a multi-table child of User, so every referee is a User row;
+        # filter, order and paginate those in the database and flag the clients.
+        if user.custom_id:
+            referees = User.objects.filter(referred_by=user.custom_id)
+        else:
+            referees = User.objects.none()
+        referees = optimize_queryset(
+            referees.annotate(is_client=Exists(Client.objects.filter(pk=OuterRef('pk'))))
+            .order_by('-created_date', '-id'),
+            UserSerializer,
         )
 
-        # Sort combined by created_date descending, assuming both models have this field,
-        # if not, fallback as-is
-        try:
-            combined.sort(key=lambda x: getattr(
-                x['instance'], 'created_date', None), reverse=True)
-        except Exception:
-            pass
-
         paginator = CustomPagination()
-        paginated_combined = paginator.paginate_queryset(combined, request)
+        page = paginator.paginate_queryset(referees, request)
+
+        client_ids = [referee.pk for referee in page if referee.is_client]
+        clients = optimize_queryset(Client.objects.filter(pk__in=client_ids), ClientSerializer).in_bulk()
 
         # Serialize keeping type info
+        context = {'request': request}
         results = []
-        for item in paginated_combined:
-            if item['type'] == 'user':
-                # Use context to pass request for serializer if necessary
-                data = UserSerializer(item['instance'], context={
-                                      'request': request}).data
-                data['referee_type'] = 'user'
+        for referee in page:
+            if referee.is_client:
+                data = ClientSerializer(clients[referee.pk], context=context).data
+                data['referee_type'] = 'client'
             else:
-                # Force country field (if Country instance) to string in the output, if needed
-                client_instance = item['instance']
-                client_data = ClientSerializer(client_instance, context={
-                                               'request': request}).data
-                # Country is already handled as string by ClientSerializer
-                client_data['referee_type'] = 'client'
-                data = client_data
+                data = UserSerializer(referee, context=context).data
+                data['referee_type'] = 'user'
             results.append(data)
 
-        # Ensure the response is a DRF Response (already paginated)
         return paginator.get_paginated_response(results)
 
 # Admin dashboard analytics view for backend API (to power the frontend dashboard)
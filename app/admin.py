@@ -1,6 +1,10 @@
 from django.contrib import admin
 from import_export import resources
-from import_export.admin import ImportExportModelAdmin
+from app.exports.admin import BackgroundExportAdmin
+from app.exports.models import ExportJob
+from app.imports.admin import ImportJobForm
+from app.imports.jobs import queue_import
+from app.imports.models import ImportJob
 
 from app.ad_banners.models import AdBanner
 from .hotels.models import Hotel, HotelBooking, Amenity
@@ -225,100 +229,100 @@ class UtilityBillPaymentResource(resources.ModelResource):
 # Admin registrations
 
 @admin.register(Hotel)
-class HotelAdmin(ImportExportModelAdmin):
+class HotelAdmin(BackgroundExportAdmin):
     resource_class = HotelResource
 
 @admin.register(HotelBooking)
-class HotelBookingAdmin(ImportExportModelAdmin):
+class HotelBookingAdmin(BackgroundExportAdmin):
     resource_class = HotelBookingResource
 
 @admin.register(Amenity)
-class AmenityAdmin(ImportExportModelAdmin):
+class AmenityAdmin(BackgroundExportAdmin):
     resource_class = AmenityResource
 
 @admin.register(FlightBooking)
-class FlightBookingAdmin(ImportExportModelAdmin):
+class FlightBookingAdmin(BackgroundExportAdmin):
     resource_class = FlightBookingResource
 
 @admin.register(StudyVisaOffer)
-class StudyVisaOfferAdmin(ImportExportModelAdmin):
+class StudyVisaOfferAdmin(BackgroundExportAdmin):
     resource_class = StudyVisaOfferResource
 
 @admin.register(StudyVisaOfferRequirement)
-class StudyVisaOfferRequirementAdmin(ImportExportModelAdmin):
+class StudyVisaOfferRequirementAdmin(BackgroundExportAdmin):
     resource_class = StudyVisaOfferRequirementResource
 
 @admin.register(StudyVisaApplication)
-class StudyVisaApplicationAdmin(ImportExportModelAdmin):
+class StudyVisaApplicationAdmin(BackgroundExportAdmin):
     resource_class = StudyVisaApplicationResource
 
 @admin.register(WorkVisaOffer)
-class WorkVisaOfferAdmin(ImportExportModelAdmin):
+class WorkVisaOfferAdmin(BackgroundExportAdmin):
     resource_class = WorkVisaOfferResource
 
 @admin.register(WorkVisaOfferRequirement)
-class WorkVisaOfferRequirementAdmin(ImportExportModelAdmin):
+class WorkVisaOfferRequirementAdmin(BackgroundExportAdmin):
     resource_class = WorkVisaOfferRequirementResource
 
 @admin.register(WorkVisaApplication)
-class WorkVisaApplicationAdmin(ImportExportModelAdmin):
+class WorkVisaApplicationAdmin(BackgroundExportAdmin):
     resource_class = WorkVisaApplicationResource
 
 @admin.register(WorkVisaApplicationComment)
-class WorkVisaApplicationCommentAdmin(ImportExportModelAdmin):
+class WorkVisaApplicationCommentAdmin(BackgroundExportAdmin):
     resource_class = WorkVisaApplicationCommentResource
 
 @admin.register(WorkVisaInterview)
-class WorkVisaInterviewAdmin(ImportExportModelAdmin):
+class WorkVisaInterviewAdmin(BackgroundExportAdmin):
     resource_class = WorkVisaInterviewResource
 
 @admin.register(WorkOrganization)
-class WorkOrganizationAdmin(ImportExportModelAdmin):
+class WorkOrganizationAdmin(BackgroundExportAdmin):
     resource_class = WorkOrganizationResource
 
 @admin.register(VacationOffer)
-class VacationOfferAdmin(ImportExportModelAdmin):
+class VacationOfferAdmin(BackgroundExportAdmin):
     resource_class = VacationOfferResource
 
 @admin.register(VacationOfferIncludedItem)
-class VacationOfferIncludedItemAdmin(ImportExportModelAdmin):
+class VacationOfferIncludedItemAdmin(BackgroundExportAdmin):
     resource_class = VacationOfferIncludedItemResource
 
 @admin.register(VacationOfferImage)
-class VacationOfferImageAdmin(ImportExportModelAdmin):
+class VacationOfferImageAdmin(BackgroundExportAdmin):
     resource_class = VacationOfferImageResource
 
 @admin.register(VacationVisaApplication)
-class VacationVisaApplicationAdmin(ImportExportModelAdmin):
+class VacationVisaApplicationAdmin(BackgroundExportAdmin):
     resource_class = VacationVisaApplicationResource
 
 @admin.register(PilgrimageOffer)
-class PilgrimageOfferAdmin(ImportExportModelAdmin):
+class PilgrimageOfferAdmin(BackgroundExportAdmin):
     resource_class = PilgrimageOfferResource
 
 @admin.register(PilgrimageOfferIncludedItem)
-class PilgrimageOfferIncludedItemAdmin(ImportExportModelAdmin):
+class PilgrimageOfferIncludedItemAdmin(BackgroundExportAdmin):
     resource_class = PilgrimageOfferIncludedItemResource
 
 @admin.register(PilgrimageOfferImage)
-class PilgrimageOfferImageAdmin(ImportExportModelAdmin):
+class PilgrimageOfferImageAdmin(BackgroundExportAdmin):
     resource_class = PilgrimageOfferImageResource
 
 @admin.register(PilgrimageVisaApplication)
-class PilgrimageVisaApplicationAdmin(ImportExportModelAdmin):
+class PilgrimageVisaApplicationAdmin(BackgroundExportAdmin):
     resource_class = PilgrimageVisaApplicationResource
 
 # --- Airtime Admin Registration ---
 
 @admin.register(NetworkProvider)
-class NetworkProviderAdmin(ImportExportModelAdmin):
+class NetworkProviderAdmin(BackgroundExportAdmin):
     resource_class = NetworkProviderResource
     list_display = ("id", "label", "value", "active", "accent", "logo")
     list_filter = ("active",)
     search_fields = ("label", "value")
 
 @admin.register(AirtimePurchase)
-class AirtimePurchaseAdmin(ImportExportModelAdmin):
+class AirtimePurchaseAdmin(BackgroundExportAdmin):
     resource_class = AirtimePurchaseResource
     list_display = (
         "id", "user", "provider", "phone", "amount",
@@ -329,14 +333,14 @@ class AirtimePurchaseAdmin(ImportExportModelAdmin):
     search_fields = ("id", "user__username", "phone", "external_ref", "status_message")
 
 @admin.register(DataPlan)
-class DataPlanAdmin(ImportExportModelAdmin):
+class DataPlanAdmin(BackgroundExportAdmin):
     resource_class = DataPlanResource
     list_display = ("id", "provider", "label", "value", "category", "data", "amount")
     list_filter = ("provider", "category")
     search_fields = ("id", "label", "value")
 
 @admin.register(DataPurchase)
-class DataPurchaseAdmin(ImportExportModelAdmin):
+class DataPurchaseAdmin(BackgroundExportAdmin):
     resource_class = DataPurchaseResource
     list_display = (
         "id", "user", "provider", "plan", "phone", "amount",
@@ -348,21 +352,21 @@ class DataPurchaseAdmin(ImportExportModelAdmin):
 # --- Investment Admin Registration ---
 
 @admin.register(InvestmentPlan)
-class InvestmentPlanAdmin(ImportExportModelAdmin):
+class InvestmentPlanAdmin(BackgroundExportAdmin):
     resource_class = InvestmentPlanResource
     list_display = ("id", "name", "price", "roi_percentage", "period_months", "color", "progress", "withdraw_available")
     search_fields = ("id", "name", "description")
     list_filter = ("withdraw_available", "period_months")
 
 @admin.register(InvestmentPlanBenefit)
-class InvestmentPlanBenefitAdmin(ImportExportModelAdmin):
+class InvestmentPlanBenefitAdmin(BackgroundExportAdmin):
     resource_class = InvestmentPlanBenefitResource
     list_display = ("id", "plan", "order", "text")
     list_filter = ("plan",)
     search_fields = ("plan__name", "text")
 
 @admin.register(Investment)
-class InvestmentAdmin(ImportExportModelAdmin):
+class InvestmentAdmin(BackgroundExportAdmin):
     resource_class = InvestmentResource
     list_display = ("id", "investor", "plan", "amount", "roi_amount", "start_date",
                     "maturity_date", "withdrawable", "next_withdraw_date", "status", "created_at")
@@ -372,59 +376,59 @@ class InvestmentAdmin(ImportExportModelAdmin):
 # --- European Citizenship Admin Registration ---
 
 @admin.register(EuropeanCitizenshipOffer)
-class EuropeanCitizenshipOfferAdmin(ImportExportModelAdmin):
+class EuropeanCitizenshipOfferAdmin(BackgroundExportAdmin):
     resource_class = EuropeanCitizenshipOfferResource
 
 @admin.register(InvestmentOption)
-class InvestmentOptionAdmin(ImportExportModelAdmin):
+class InvestmentOptionAdmin(BackgroundExportAdmin):
     resource_class = InvestmentOptionResource
 
 @admin.register(ProgramType)
-class ProgramTypeAdmin(ImportExportModelAdmin):
+class ProgramTypeAdmin(BackgroundExportAdmin):
     resource_class = ProgramTypeResource
 
 @admin.register(Institution)
-class InstitutionAdmin(ImportExportModelAdmin):
+class InstitutionAdmin(BackgroundExportAdmin):
     resource_class = InstitutionResource
     list_filter = ['city', 'country']
 
 @admin.register(CourseOfStudy)
-class CourseOfStudyAdmin(ImportExportModelAdmin):
+class CourseOfStudyAdmin(BackgroundExportAdmin):
     resource_class = CourseOfStudyResource
     list_filter = ['institution', 'program_type']
 
 @admin.register(AdBanner)
-class AdBannerAdmin(ImportExportModelAdmin):
+class AdBannerAdmin(BackgroundExportAdmin):
     resource_class = AdBannerResource
 
 # --- Education/Exam Fee Admin Registration ---
 
 @admin.register(EducationFeeProvider)
-class EducationFeeProviderAdmin(ImportExportModelAdmin):
+class EducationFeeProviderAdmin(BackgroundExportAdmin):
     resource_class = EducationFeeProviderResource
 
 @admin.register(EducationFeeType)
-class EducationFeeTypeAdmin(ImportExportModelAdmin):
+class EducationFeeTypeAdmin(BackgroundExportAdmin):
     resource_class = EducationFeeTypeResource
 
 @admin.register(EducationFeePayment)
-class EducationFeePaymentAdmin(ImportExportModelAdmin):
+class EducationFeePaymentAdmin(BackgroundExportAdmin):
     resource_class = EducationFeePaymentResource
 
 @admin.register(PilgrimageVisaApplicationComment)
-class PilgrimageVisaApplicationCommentAdmin(ImportExportModelAdmin):
+class PilgrimageVisaApplicationCommentAdmin(BackgroundExportAdmin):
     resource_class = PilgrimageVisaApplicationCommentResource
 
 # --- Utility Services Admin Registration ---
 
 @admin.register(UtilityProvider)
-class UtilityProviderAdmin(ImportExportModelAdmin):
+class UtilityProviderAdmin(BackgroundExportAdmin):
     resource_class = UtilityProviderResource
     list_display = ('id', 'label', 'value', 'logo', 'accent')
     search_fields = ('label', 'value')
 
 @admin.register(UtilityBillPayment)
-class UtilityBillPaymentAdmin(ImportExportModelAdmin):
+class UtilityBillPaymentAdmin(BackgroundExportAdmin):
     resource_class = UtilityBillPaymentResource
     list_display = (
         'id', 'user', 'provider', 'meter_number', 'meter_type', 'amount', 'status',
@@ -436,7 +440,7 @@ class UtilityBillPaymentAdmin(ImportExportModelAdmin):
 # --- Support Ticket Admin Registration ---
 
 @admin.register(SupportTicket)
-class SupportTicketAdmin(ImportExportModelAdmin):
+class SupportTicketAdmin(BackgroundExportAdmin):
     resource_class = SupportTicketResource
     list_display = ["id", "user", "subject",
                     "status", "created_at", "last_reply"]
@@ -444,7 +448,7 @@ class SupportTicketAdmin(ImportExportModelAdmin):
     search_fields = ["id", "user__username", "subject"]
 
 @admin.register(SupportTicketMessage)
-class SupportTicketMessageAdmin(ImportExportModelAdmin):
+class SupportTicketMessageAdmin(BackgroundExportAdmin):
     resource_class = SupportTicketMessageResource
     list_display = ["id", "ticket", "sender", "timestamp"]
     list_filter = ["sender", "timestamp", "ticket"]
@@ -453,9 +457,50 @@ class SupportTicketMessageAdmin(ImportExportModelAdmin):
 # --- FAQ Article Admin Registration ---
 
 @admin.register(FaqArticle)
-class FaqArticleAdmin(ImportExportModelAdmin):
+class FaqArticleAdmin(BackgroundExportAdmin):
     resource_class = FaqArticleResource
     list_display = ["id", "question", "category",
                     "is_active", "created_at", "updated_at"]
     list_filter = ["category", "is_active", "created_at"]
     search_fields = ["id", "question", "answer"]
+
+# --- Export Job Admin Registration ---
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "dataset", "file_type", "status", "row_count", "user", "created_at", "finished_at"]
+    list_filter = ["status", "file_type", "created_at"]
+    search_fields = ["dataset", "user__email"]
+    readonly_fields = ["user", "dataset", "file_type", "object_ids", "status", "file", "row_count", "error",
+                       "created_at", "finished_at"]
+
+# --- Import Job Admin Registration ---
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """Adding a job uploads the file; a Celery worker imports it in chunks."""
+    list_display = ["id", "target", "status", "processed_rows", "total_rows", "created_count", "updated_count",
+                    "error_count", "user", "created_at", "finished_at"]
+    list_filter = ["status", "target", "created_at"]
+    search_fields = ["target", "user__email"]
+    readonly_fields = ["user", "target", "file", "status", "total_rows", "processed_rows", "created_count",
+                       "updated_count", "error_count", "errors", "ignored_columns", "error", "created_at",
+                       "finished_at"]
+
+    def get_form(self, request, obj=None, **kwargs):
+        if obj is None:
+            kwargs["form"] = ImportJobForm
+        return super().get_form(request, obj, **kwargs)
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields if obj else []
+
+    def get_fields(self, request, obj=None):
+        return ["target", "file"] if obj is None else self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.user = request.user
+        super().save_model(request, obj, form, change)
+        if not change:
+            queue_import(obj)
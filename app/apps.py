@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
@@ -7,4 +8,13 @@ class AppConfig(AppConfig):
 
     def ready(self):
         import app.citizenship.european.signals
+        import app.cv_builder.signals
+        # Task modules below app/ are not found by Celery's autodiscovery.
+        import app.cv_builder.tasks
+        import app.exports.tasks
+        import app.imports.tasks
         import app.services.airtime.signals
+        import app.visa.signals
+        from globalconceptBE.search import setup_search
+
+        post_migrate.connect(setup_search, sender=self)
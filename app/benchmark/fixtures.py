@@ -0,0 +1,271 @@
+"""
+Deterministic synthetic dataset for the benchmark command.
+
+Users are created through the normal manager so the usual signals build
+their Client, UserProfile, Wallet and ChatSession rows. The high-volume
+tables (wallet transactions, notifications, chat messages, visa
+applications) are written with chunked bulk_create from a seeded RNG, so two
+runs with the same size and seed produce the same data. Seeding an already
+seeded database adds another batch of rows on top, which the query-budget
+tests use to check that query counts do not grow with the data.
+"""
+import datetime
+import random
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+
+from account.client.models import Client
+from account.models import User
+from app.visa.pilgrimage.offer.models import PilgrimageOffer, PilgrimageVisaApplication
+from app.visa.study.models import StudyVisaApplication
+from app.visa.vacation.offer.models import VacationOffer, VacationVisaApplication
+from app.visa.work.offers.models import WorkVisaApplication, WorkVisaOffer
+from app.visa.work.organization.models import WorkOrganization
+from chat.models import ChatSession, Message
+from definition.registry import get_definition, get_definitions
+from globalconceptBE import search
+from notification.models import Notification
+from wallet.models import Wallet
+from wallet.transactions.models import WalletTransaction
+
+EMAIL_DOMAIN = "bench.invalid"
+
+SIZES = {
+    "small": {
+        "customers": 50,
+        "transactions": 20_000,
+        "notifications": 5_000,
+        "messages": 5_000,
+        "applications": 500,
+    },
+    "full": {
+        "customers": 500,
+        "transactions": 1_000_000,
+        "notifications": 100_000,
+        "messages": 100_000,
+        "applications": 10_000,
+    },
+}
+
+CHUNK_SIZE = 5_000
+
+TRANSACTION_TYPES = [choice for choice, _ in WalletTransaction.TYPE_CHOICES]
+TRANSACTION_STATUSES = [choice for choice, _ in WalletTransaction.STATUS_CHOICES]
+
+
+def is_seeded():
+    return User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").exists()
+
+
+def describe_seeded():
+    """
+    The dataset already in the database, like seed()'s summary: the actual
+    row counts, and the size they match ("custom" if none). The seed is not
+    recorded, so it is None.
+    """
+    counts = {
+        "customers": Client.objects.filter(email__startswith="customer", email__endswith=f"@{EMAIL_DOMAIN}").count(),
+        "transactions": WalletTransaction.objects.filter(reference__startswith="BENCH-").count(),
+        "notifications": Notification.objects.filter(title__startswith="Bench notification").count(),
+        "messages": Message.objects.filter(message__startswith="Bench message").count(),
+        "applications": StudyVisaApplication.objects.filter(passport_number__startswith="A").count(),
+    }
+    size = next((name for name, sizes in SIZES.items() if sizes == counts), "custom")
+    return {"size": size, "seed": None, **counts}
+
+
+def _bulk(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        model.objects.bulk_create(rows[start:start + CHUNK_SIZE])
+
+
+def _stream(model, count, build):
+    """bulk_create `count` rows produced by build(i) without holding them all."""
+    chunk = []
+    for i in range(count):
+        chunk.append(build(i))
+        if len(chunk) >= CHUNK_SIZE:
+            model.objects.bulk_create(chunk)
+            chunk = []
+    if chunk:
+        model.objects.bulk_create(chunk)
+
+
+def _create_users(rng, count):
+    admin = User.objects.filter(email=f"admin@{EMAIL_DOMAIN}").first()
+    if admin is None:
+        admin = User.objects.create_user(
+            email=f"admin@{EMAIL_DOMAIN}",
+            password="bench",
+            first_name="Bench",
+            last_name="Admin",
+            phone_number="08000000000",
+            user_type=get_definition("user_type", "Admin"),
+            is_staff=True,
+            is_superuser=True,
+        )
+    customer_type = get_definition("user_type", "Customer")
+    start = Client.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").count()
+    for i in range(start, start + count):
+        User.objects.create_user(
+            email=f"customer{i:05d}@{EMAIL_DOMAIN}",
+            password="bench",
+            first_name=f"Customer{i:05d}",
+            last_name=rng.choice(["Okafor", "Adeyemi", "Bello", "Eze", "Ibrahim"]),
+            phone_number=f"080{rng.randrange(10**8):08d}",
+            user_type=customer_type,
+        )
+    clients = list(Client.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").order_by("id"))
+    return admin, clients
+
+
+def _create_offers(rng):
+    organization, _ = WorkOrganization.objects.get_or_create(name="Bench Organization", defaults={"country": "GB"})
+    work_offers = [
+        WorkVisaOffer(organization=organization, job_title=f"Bench Job {i}", country="GB", salary=Decimal(1000 + i))
+        for i in range(20)
+    ]
+    _bulk(WorkVisaOffer, work_offers)
+
+    today = datetime.date(2025, 1, 1)
+    vacation_offers = [
+        VacationOffer(
+            title=f"Bench Vacation {i}", description="Synthetic offer", destination="AE",
+            start_date=today, end_date=today + datetime.timedelta(days=7), price=Decimal(500 + i),
+        )
+        for i in range(20)
+    ]
+    _bulk(VacationOffer, vacation_offers)
+
+    pilgrimage_offers = []
+    pilgrimage_type = next(iter(get_definitions("pilgrimage_type")), None)
+    sponsorship = next(iter(get_definitions("pilgrimage_sponsorship_type")), None)
+    if pilgrimage_type and sponsorship:
+        pilgrimage_offers = [
+            PilgrimageOffer(
+                title=f"Bench Pilgrimage {i}", description="Synthetic offer", pilgrimage_type=pilgrimage_type,
+                destination="SA", start_date=today, end_date=today + datetime.timedelta(days=14),
+                price=Decimal(2000 + i), sponsorship=sponsorship,
+            )
+            for i in range(20)
+        ]
+        _bulk(PilgrimageOffer, pilgrimage_offers)
+    # bulk_create skips save(), which maintains the search columns.
+    for model in (WorkVisaOffer, VacationOffer, PilgrimageOffer):
+        search.reindex(model, only_missing=True)
+    return (
+        list(WorkVisaOffer.objects.filter(organization=organization)),
+        list(VacationOffer.objects.filter(title__startswith="Bench Vacation")),
+        list(PilgrimageOffer.objects.filter(title__startswith="Bench Pilgrimage")),
+    )
+
+
+def _create_applications(rng, clients, count, offers):
+    work_offers, vacation_offers, pilgrimage_offers = offers
+    start = StudyVisaApplication.objects.filter(passport_number__startswith="A").count()
+    study_statuses = get_definitions("study_visa_status")
+    birth = datetime.date(1990, 1, 1)
+    travel = datetime.date(2025, 6, 1)
+    contact = {
+        "emergency_contact_name": "Bench Contact",
+        "emergency_contact_phone": "08000000001",
+        "emergency_contact_relationship": "Sibling",
+    }
+
+    _stream(StudyVisaApplication, count, lambda i: StudyVisaApplication(
+        applicant=rng.choice(clients),
+        status=rng.choice(study_statuses) if study_statuses else None,
+        passport_number=f"A{start + i:08d}",
+    ))
+    _stream(WorkVisaApplication, count, lambda i: WorkVisaApplication(
+        client=rng.choice(clients), offer=rng.choice(work_offers), passport_number=f"B{start + i:08d}",
+    ))
+    _stream(VacationVisaApplication, count, lambda i: VacationVisaApplication(
+        offer=rng.choice(vacation_offers), applicant=rng.choice(clients), passport_number=f"C{start + i:08d}",
+        date_of_birth=birth, travel_date=travel, **contact,
+    ))
+    if pilgrimage_offers:
+        _stream(PilgrimageVisaApplication, count, lambda i: PilgrimageVisaApplication(
+            offer=rng.choice(pilgrimage_offers), applicant=rng.choice(clients), passport_number=f"D{start + i:08d}",
+            date_of_birth=birth, preferred_travel_date=travel, passport_photo="bench/passport.jpg", **contact,
+        ))
+
+
+def seed(size="small", seed_value=1234, stdout=None, counts=None):
+    """
+    Build the dataset for `size` ("small" or "full"), or for explicit `counts`
+    with the same keys. Returns a summary dict.
+    """
+    counts = counts or SIZES[size]
+    rng = random.Random(seed_value)
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with db_transaction.atomic():
+        log(f"Creating {counts['customers']} customers...")
+        admin, clients = _create_users(rng, counts["customers"])
+        wallets = {w.user_id: w for w in Wallet.objects.filter(user__in=clients)}
+        users = [c for c in clients if c.pk in wallets]
+
+        log(f"Creating {counts['transactions']} wallet transactions...")
+        offset = WalletTransaction.objects.filter(reference__startswith="BENCH-").count()
+
+        def transaction_row(i):
+            user = rng.choice(users)
+            return WalletTransaction(
+                user_id=user.pk,
+                wallet=wallets[user.pk],
+                transaction_type=rng.choice(TRANSACTION_TYPES),
+                amount=Decimal(rng.randrange(100, 500_000)) / 100,
+                status=rng.choice(TRANSACTION_STATUSES),
+                reference=f"BENCH-{offset + i:08d}",
+            )
+        _stream(WalletTransaction, counts["transactions"], transaction_row)
+
+        log(f"Creating {counts['notifications']} notifications...")
+        _stream(Notification, counts["notifications"], lambda i: Notification(
+            user_id=rng.choice(clients).pk, title=f"Bench notification {i}", message="Synthetic",
+            is_read=rng.random() < 0.5,
+        ))
+
+        log(f"Creating {counts['messages']} chat messages...")
+        sessions = list(ChatSession.objects.filter(customer__in=clients).exclude(agent=None))
+        if not sessions:
+            sessions = [ChatSession.objects.create(customer=c, agent=admin) for c in clients]
+
+        def message_row(i):
+            session = rng.choice(sessions)
+            from_customer = rng.random() < 0.5
+            return Message(
+                chat_session=session,
+                sender_id=session.customer_id if from_customer else session.agent_id,
+                recipient_id=session.agent_id if from_customer else session.customer_id,
+                sender_type="customer" if from_customer else "agent",
+                message=f"Bench message {i}",
+            )
+        _stream(Message, counts["messages"], message_row)
+
+        log(f"Creating {counts['applications']} applications per visa type...")
+        offers = _create_offers(rng)
+        _create_applications(rng, clients, counts["applications"], offers)
+
+    return {"size": size, "seed": seed_value, **counts}
+
+
+def heaviest_customer():
+    """The benchmark customer: the client with the most wallet transactions."""
+    from django.db.models import Count
+
+    top = (
+        WalletTransaction.objects.filter(user__email__endswith=f"@{EMAIL_DOMAIN}")
+        .values("user_id")
+        .annotate(n=Count("id"))
+        .order_by("-n", "user_id")
+        .first()
+    )
+    if top is None:
+        return Client.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").order_by("id").first()
+    return Client.objects.get(pk=top["user_id"])
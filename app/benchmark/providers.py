@@ -0,0 +1,386 @@
+"""
+Local stand-in for the external providers the backend calls.
+
+    amadeus      /amadeus/v1/security/oauth2/token
+                 /amadeus/v1/reference-data/locations
+                 /amadeus/v2/shopping/flight-offers
+    flutterwave  /flutterwave/v3/transactions/<id>/verify, /transfers,
+                 /transfers/<id>, /accounts/resolve, /banks/<country>, /payments
+    premiumsub   /premiumsub/api/topup/, /data/, /verifymeter/, /electricity/,
+                 /cabletv/, /education/   (the Maskawa API)
+
+Responses carry the fields the real clients read (see app/flight/views.py,
+wallet/payment_gateway/flutterwave_service.py, value_services/services.py and
+app/services/airtime/signals.py). Every provider has a `Profile` with a
+latency distribution, an error rate (HTTP 500s and rejected-by-provider
+replies) and a timeout rate (the request hangs for `hang_seconds`, longer than
+any client timeout, then gets a 504).
+
+Inline card payments never reach the backend through a provider call, so the
+simulator adds one endpoint of its own:
+
+    POST /flutterwave/v3/simulator/charges  {"tx_ref", "amount", "currency"}
+
+It records a successful charge and returns its id, which the wallet verify
+endpoint then resolves through /transactions/<id>/verify.
+"""
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("amadeus", "flutterwave", "premiumsub")
+ALIASES = {"maskawa": "premiumsub"}
+
+
+class Latency:
+    """
+    A latency distribution in milliseconds, parsed from a spec string:
+    `120`, `fixed:120`, `uniform:50:300`, `normal:200:40` or
+    `lognormal:150:0.5` (median, sigma).
+    """
+
+    def __init__(self, spec="0"):
+        self.spec = str(spec)
+        kind, *args = self.spec.split(":") if ":" in self.spec else ("fixed", self.spec)
+        try:
+            args = [float(a) for a in args]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(args) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        self.kind, self.args = kind, args
+
+    def sample(self, rng):
+        if self.kind == "fixed":
+            value = self.args[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.args)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            value = median * rng.lognormvariate(0, sigma)
+        return max(value, 0.0) / 1000
+
+
+class Profile:
+    def __init__(self, latency="0", error_rate=0.0, timeout_rate=0.0, hang_seconds=60.0):
+        self.latency = latency if isinstance(latency, Latency) else Latency(latency)
+        self.error_rate = float(error_rate)
+        self.timeout_rate = float(timeout_rate)
+        self.hang_seconds = float(hang_seconds)
+
+    def describe(self):
+        return (
+            f"latency {self.latency.spec}ms, errors {self.error_rate:.1%}, "
+            f"timeouts {self.timeout_rate:.1%} ({self.hang_seconds:g}s)"
+        )
+
+
+class State:
+    """Shared, thread-safe simulator state: profiles, RNG, ids and charges."""
+
+    def __init__(self, profiles, seed=None):
+        self.profiles = profiles
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1_000_001)
+        self.charges = {}
+        self.stats = {name: {"requests": 0, "errors": 0, "timeouts": 0} for name in PROVIDERS}
+
+    def next_id(self):
+        with self.lock:
+            return next(self.ids)
+
+    def draw(self, provider):
+        """Return (delay seconds, outcome) where outcome is ok / error / timeout."""
+        profile = self.profiles[provider]
+        with self.lock:
+            roll = self.rng.random()
+            delay = profile.latency.sample(self.rng)
+            stats = self.stats[provider]
+            stats["requests"] += 1
+            if roll < profile.error_rate:
+                stats["errors"] += 1
+                return delay, "error"
+            if roll < profile.error_rate + profile.timeout_rate:
+                stats["timeouts"] += 1
+                return profile.hang_seconds, "timeout"
+        return delay, "ok"
+
+
+# ── Amadeus ──────────────────────────────────────────────────────────────────
+
+def amadeus_token(state, request):
+    return 200, {"type": "amadeusOAuth2Token", "access_token": uuid.uuid4().hex, "token_type": "Bearer",
+                 "expires_in": 1799, "state": "approved"}
+
+
+def amadeus_locations(state, request):
+    keyword = (request.query.get("keyword") or "LOS").upper()
+    code = re.sub(r"[^A-Z]", "", keyword)[:3].ljust(3, "X")
+    country = request.query.get("countryCode") or "NG"
+    return 200, {
+        "meta": {"count": 1},
+        "data": [{
+            "type": "location", "subType": "AIRPORT", "name": f"{keyword} INTERNATIONAL",
+            "detailedName": f"{keyword}/{country}: {keyword} INTERNATIONAL", "iataCode": code,
+            "address": {"cityName": keyword, "cityCode": code, "countryCode": country},
+        }],
+    }
+
+
+def amadeus_flight_offers(state, request):
+    query = request.query
+    origin = query.get("originLocationCode", "LOS")
+    destination = query.get("destinationLocationCode", "LHR")
+    departure = query.get("departureDate", "2030-01-01")
+    currency = query.get("currencyCode", "USD")
+    count = min(int(query.get("max", 10) or 10), 20)
+    with state.lock:
+        prices = [round(state.rng.uniform(250, 2500), 2) for _ in range(count)]
+    offers = []
+    for i, price in enumerate(prices, start=1):
+        offers.append({
+            "type": "flight-offer", "id": str(i), "source": "GDS", "oneWay": False,
+            "numberOfBookableSeats": 9,
+            "itineraries": [{
+                "duration": "PT6H30M",
+                "segments": [{
+                    "departure": {"iataCode": origin, "at": f"{departure}T08:00:00"},
+                    "arrival": {"iataCode": destination, "at": f"{departure}T14:30:00"},
+                    "carrierCode": "SM", "number": str(100 + i), "duration": "PT6H30M", "numberOfStops": 0,
+                }],
+            }],
+            "price": {"currency": currency, "total": f"{price:.2f}", "base": f"{price * 0.8:.2f}",
+                      "grandTotal": f"{price:.2f}"},
+            "validatingAirlineCodes": ["SM"],
+        })
+    return 200, {"meta": {"count": len(offers)}, "data": offers}
+
+
+# ── Flutterwave ──────────────────────────────────────────────────────────────
+
+def flutterwave_create_charge(state, request):
+    body = request.json()
+    charge_id = state.next_id()
+    charge = {
+        "id": charge_id,
+        "tx_ref": body.get("tx_ref") or f"SIM-{charge_id}",
+        "flw_ref": f"FLW-SIM-{charge_id}",
+        "amount": body.get("amount", 0),
+        "currency": body.get("currency", "NGN"),
+        "status": body.get("status", "successful"),
+        "meta": body.get("meta") or {},
+    }
+    with state.lock:
+        state.charges[charge_id] = charge
+    return 200, {"status": "success", "message": "Charge recorded", "data": charge}
+
+
+def flutterwave_verify(state, request, transaction_id):
+    with state.lock:
+        charge = state.charges.get(int(transaction_id))
+    if charge is None:
+        return 200, {"status": "error", "message": "No transaction was found for this id", "data": None}
+    return 200, {"status": "success", "message": "Transaction fetched successfully", "data": charge}
+
+
+def flutterwave_create_transfer(state, request):
+    body = request.json()
+    transfer_id = state.next_id()
+    return 200, {
+        "status": "success", "message": "Transfer Queued Successfully",
+        "data": {
+            "id": transfer_id, "account_number": body.get("account_number"), "bank_code": body.get("account_bank"),
+            "amount": body.get("amount"), "currency": body.get("currency", "NGN"), "fee": 10.75,
+            "status": "NEW", "reference": body.get("reference"), "narration": body.get("narration"),
+            "complete_message": "", "requires_approval": 0, "is_approved": 1,
+        },
+    }
+
+
+def flutterwave_transfer(state, request, transfer_id):
+    return 200, {"status": "success", "message": "Transfer fetched",
+                 "data": {"id": int(transfer_id), "status": "SUCCESSFUL", "complete_message": "Successful"}}
+
+
+def flutterwave_resolve(state, request):
+    body = request.json()
+    return 200, {"status": "success", "message": "Account details fetched",
+                 "data": {"account_number": body.get("account_number"), "account_name": "SIMULATED ACCOUNT HOLDER"}}
+
+
+BANKS = [
+    ("044", "Access Bank"), ("058", "Guaranty Trust Bank"), ("033", "United Bank for Africa"),
+    ("057", "Zenith Bank"), ("011", "First Bank of Nigeria"), ("50211", "Kuda Bank"),
+]
+
+
+def flutterwave_banks(state, request, country):
+    return 200, {"status": "success", "message": "Banks fetched successfully",
+                 "data": [{"id": i, "code": code, "name": name} for i, (code, name) in enumerate(BANKS, start=1)]}
+
+
+def flutterwave_payment_link(state, request):
+    body = request.json()
+    return 200, {"status": "success", "message": "Hosted Link",
+                 "data": {"link": f"{request.base_url}/flutterwave/checkout/{body.get('tx_ref', '')}"}}
+
+
+# ── PremiumSub / Maskawa ─────────────────────────────────────────────────────
+
+def _premiumsub_ok(state, **data):
+    ident = f"SIM{state.next_id()}"
+    return 200, {"Status": "successful", "status": "success", "ident": ident,
+                 "data": {"reference": ident, **data}}
+
+
+def premiumsub_topup(state, request):
+    body = request.json()
+    return _premiumsub_ok(state, amount=body.get("amount"), mobile_number=body.get("mobile_number"))
+
+
+def premiumsub_data(state, request):
+    body = request.json()
+    return _premiumsub_ok(state, plan=body.get("plan"), mobile_number=body.get("mobile_number"))
+
+
+def premiumsub_verify_meter(state, request):
+    body = request.json()
+    return 200, {"status": "success", "data": {
+        "Customer_Name": "SIMULATED CUSTOMER", "Address": "1 Simulator Way, Lagos",
+        "Meter_Number": body.get("meter_number"), "Minimum_Amount": 500,
+    }}
+
+
+def premiumsub_electricity(state, request):
+    token = "-".join(f"{state.next_id() % 10000:04d}" for _ in range(5))
+    return _premiumsub_ok(state, token=token)
+
+
+def premiumsub_cable(state, request):
+    return _premiumsub_ok(state)
+
+
+def premiumsub_education(state, request):
+    return _premiumsub_ok(state, pin=f"{state.next_id():012d}")
+
+
+# (method, path regex, provider, handler)
+ROUTES = [
+    ("POST", r"/amadeus/v1/security/oauth2/token", "amadeus", amadeus_token),
+    ("GET", r"/amadeus/v1/reference-data/locations", "amadeus", amadeus_locations),
+    ("GET", r"/amadeus/v2/shopping/flight-offers", "amadeus", amadeus_flight_offers),
+    ("POST", r"/flutterwave/v3/simulator/charges", "flutterwave", flutterwave_create_charge),
+    ("GET", r"/flutterwave/v3/transactions/(\d+)/verify", "flutterwave", flutterwave_verify),
+    ("POST", r"/flutterwave/v3/transfers", "flutterwave", flutterwave_create_transfer),
+    ("GET", r"/flutterwave/v3/transfers/(\d+)", "flutterwave", flutterwave_transfer),
+    ("POST", r"/flutterwave/v3/accounts/resolve", "flutterwave", flutterwave_resolve),
+    ("GET", r"/flutterwave/v3/banks/(\w+)", "flutterwave", flutterwave_banks),
+    ("POST", r"/flutterwave/v3/payments", "flutterwave", flutterwave_payment_link),
+    ("POST", r"/premiumsub/api/topup/?", "premiumsub", premiumsub_topup),
+    ("POST", r"/premiumsub/api/data/?", "premiumsub", premiumsub_data),
+    ("POST", r"/premiumsub/api/verifymeter/?", "premiumsub", premiumsub_verify_meter),
+    ("POST", r"/premiumsub/api/electricity/?", "premiumsub", premiumsub_electricity),
+    ("POST", r"/premiumsub/api/cabletv/?", "premiumsub", premiumsub_cable),
+    ("POST", r"/premiumsub/api/education/?", "premiumsub", premiumsub_education),
+]
+_COMPILED = [(method, re.compile(pattern + "$"), provider, handler) for method, pattern, provider, handler in ROUTES]
+
+# Error bodies in each provider's own shape.
+ERRORS = {
+    "amadeus": {"errors": [{"status": 500, "code": 141, "title": "SYSTEM ERROR HAS OCCURRED"}]},
+    "flutterwave": {"status": "error", "message": "Simulated provider error", "data": None},
+    "premiumsub": {"Status": "failed", "error": "Simulated provider error"},
+}
+
+
+class Request:
+    def __init__(self, handler):
+        parts = urlsplit(handler.path)
+        self.path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        length = int(handler.headers.get("Content-Length") or 0)
+        self.body = handler.rfile.read(length) if length else b""
+        self.content_type = handler.headers.get("Content-Type", "")
+        host = handler.headers.get("Host") or "{}:{}".format(*handler.server.server_address[:2])
+        self.base_url = f"http://{host}"
+
+    def json(self):
+        if not self.body:
+            return {}
+        if "application/x-www-form-urlencoded" in self.content_type:
+            return {k: v[-1] for k, v in parse_qs(self.body.decode()).items()}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "ProviderSimulator/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _dispatch(self, method):
+        state = self.server.state
+        request = Request(self)
+        for route_method, pattern, provider, view in _COMPILED:
+            match = pattern.match(request.path)
+            if match and route_method == method:
+                break
+        else:
+            return self._send(404, {"message": f"No simulated endpoint for {method} {request.path}"})
+
+        delay, outcome = state.draw(provider)
+        time.sleep(delay)
+        if outcome == "timeout":
+            return self._send(504, {"message": "Simulated provider timeout"})
+        if outcome == "error":
+            return self._send(500, ERRORS[provider])
+        status, payload = view(state, request, *match.groups())
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (its own timeout fired first).
+            pass
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, Handler)
+        self.state = state
+
+
+def make_server(host="127.0.0.1", port=8765, profiles=None, seed=None):
+    profiles = profiles or {name: Profile() for name in PROVIDERS}
+    return SimulatorServer((host, port), State(profiles, seed=seed))
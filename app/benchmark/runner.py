@@ -0,0 +1,129 @@
+"""
+Endpoint timing, JSON baselines and regression checks for the benchmark command.
+"""
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# (name, url name, who calls it, query string)
+ENDPOINTS = [
+    ("admin_dashboard_analytics", "admin_dashboard_analytics", "admin", ""),
+    ("admin_analytics_report", "admin_analytics_report", "admin", ""),
+    ("admin_user_analytics", "admin_user_analytics", "admin", ""),
+    ("wallet_admin_analytics", "wallet-admin-analytics", "admin", ""),
+    ("customer_dashboard", "customer_dashboard", "customer", ""),
+    ("wallet_transactions", "wallet-transaction-list", "customer", ""),
+    ("wallet_transactions_admin", "wallet-transaction-list", "admin", ""),
+    ("wallet_transactions_admin_deep_page", "wallet-transaction-list", "admin", "page=200"),
+    ("wallet_transactions_admin_cursor", "wallet-transaction-list", "admin", "cursor="),
+    ("notifications", "notification-list", "customer", ""),
+    ("chat_messages", "message-list", "customer", "cursor="),
+    ("study_applications", "studyvisaapplication-list", "admin", ""),
+    ("work_applications", "workvisaapplication-list", "admin", ""),
+    ("vacation_applications", "vacationapplication-list", "admin", ""),
+    ("pilgrimage_applications", "pilgrimageapplication-list", "admin", ""),
+]
+
+
+def _percentile(samples, pct):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def time_endpoint(client, url, iterations, warmup):
+    """Return timing stats (milliseconds) and query count for GET `url`."""
+    for _ in range(warmup):
+        client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    # Read the count now: the next request's request_started resets the log.
+    query_count = len(queries)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "status": response.status_code,
+        "queries": query_count,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "max_ms": round(max(samples), 3),
+        "iterations": iterations,
+    }
+
+
+def run(users, iterations=20, warmup=2, only=None, stdout=None):
+    """Time every endpoint in ENDPOINTS (or those named in `only`)."""
+    clients = {}
+    for role, user in users.items():
+        client = APIClient()
+        client.force_authenticate(user)
+        clients[role] = client
+
+    results = {}
+    for name, url_name, role, query in ENDPOINTS:
+        if only and name not in only:
+            continue
+        url = reverse(url_name) + (f"?{query}" if query else "")
+        results[name] = time_endpoint(clients[role], url, iterations, warmup)
+        if stdout is not None:
+            r = results[name]
+            stdout.write(
+                f"{name:40} {r['status']:>3}  p50 {r['p50_ms']:9.2f}ms  "
+                f"p95 {r['p95_ms']:9.2f}ms  {r['queries']:>4} queries"
+            )
+    return results
+
+
+def report(results, dataset):
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "dataset": dataset,
+        },
+        "results": results,
+    }
+
+
+def save(path, data):
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Return a list of regression messages: p50 or p95 slower than the
+    baseline by more than `threshold` (fraction) and by at least
+    `min_delta_ms`, so tiny endpoints are not failed on timer noise.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            before, after = previous[key], current[key]
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append(
+                    f"{name}: {key} {before:.2f}ms -> {after:.2f}ms (+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
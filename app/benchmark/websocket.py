@@ -0,0 +1,288 @@
+"""
+WebSocket load harness for the Channels consumers.
+
+Sockets are opened in-process with channels' `WebsocketCommunicator` against
+the project's ASGI application, so the measurements cover routing, the
+consumers, their database work and the channel layer, but not Daphne's
+network stack. Three scenarios are available:
+
+    chat            ChatConsumer: rooms of `room_size` sockets; one socket per
+                    room sends a storm of messages which the group fans out to
+                    every member (the sender included).
+    notifications   NotificationConsumer: every socket sends refresh requests
+                    and waits for its own reply (the consumer joins no group).
+    study_comments  StudyVisaCommentConsumer: like chat, on application rooms.
+
+For each scenario the harness reports connect latency, round-trip latency
+(send -> the sender's copy arrives) and fan-out latency (send -> last member
+has it) as p50/p95/p99, delivered messages per second, and memory allocated
+per open connection (measured in a separate pass under tracemalloc so it does
+not slow the timed pass).
+"""
+import asyncio
+import itertools
+import json
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+from channels.testing import WebsocketCommunicator
+
+RECEIVE_TIMEOUT = 3600
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    if len(samples) == 1:
+        cuts = [samples[0]] * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+class Socket:
+    """One communicator plus a reader task that timestamps incoming frames."""
+
+    def __init__(self, application, path, room):
+        self.communicator = WebsocketCommunicator(application, path)
+        self.room = room
+        self.reader = None
+
+    async def connect(self, greeting):
+        started = time.perf_counter()
+        connected, _ = await self.communicator.connect(timeout=RECEIVE_TIMEOUT)
+        elapsed = (time.perf_counter() - started) * 1000
+        if connected:
+            # Consume the frames the consumer sends on connect.
+            for _ in range(greeting):
+                await self.communicator.receive_from(timeout=RECEIVE_TIMEOUT)
+        return connected, elapsed
+
+    def start_reading(self, on_frame):
+        async def read():
+            while True:
+                text = await self.communicator.receive_from(timeout=RECEIVE_TIMEOUT)
+                on_frame(self, json.loads(text), time.perf_counter())
+
+        self.reader = asyncio.ensure_future(read())
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+            try:
+                await self.reader
+            except asyncio.CancelledError:
+                pass
+        await self.communicator.disconnect()
+
+
+class Scenario:
+    """Base scenario: rooms of sockets, one sender per room, token-matched frames."""
+
+    name = None
+    fan_out = True
+    greeting = 1
+
+    def __init__(self, rooms):
+        # rooms: list of dicts with at least "path" (carrying the sender's
+        # ?token=) and "sender"
+        self.rooms = rooms
+
+    def path(self, room):
+        return room["path"]
+
+    def message(self, room, token):
+        raise NotImplementedError
+
+    def token(self, frame):
+        raise NotImplementedError
+
+
+class ChatScenario(Scenario):
+    name = "chat"
+    greeting = 2  # connection_successful + history
+
+    def message(self, room, token):
+        return {"command": "send_message", "message": token}
+
+    def token(self, frame):
+        if frame.get("type") == "message":
+            return frame["message"].get("message")
+        return None
+
+
+class StudyCommentScenario(Scenario):
+    name = "study_comments"
+
+    def message(self, room, token):
+        return {"action": "send_comment", "text": token, "user_id": room["sender"]}
+
+    def token(self, frame):
+        if frame.get("action") == "new_comment":
+            return frame.get("text")
+        return None
+
+
+class NotificationScenario(Scenario):
+    name = "notifications"
+    fan_out = False
+
+    def message(self, room, token):
+        return {"action": "refresh"}
+
+    def token(self, frame):
+        return "reply" if "notifications" in frame else None
+
+
+async def _open(application, scenario, connections, room_size):
+    """Open `connections` sockets spread over the scenario's rooms."""
+    sockets, latencies, refused = [], [], 0
+    rooms = itertools.cycle(scenario.rooms)
+    per_room = 1 if not scenario.fan_out else room_size
+    pending = []
+    while len(pending) < connections:
+        room = next(rooms)
+        for _ in range(min(per_room, connections - len(pending))):
+            pending.append(Socket(application, scenario.path(room), room))
+    for socket, (connected, elapsed) in zip(
+        pending, await asyncio.gather(*(s.connect(scenario.greeting) for s in pending))
+    ):
+        if connected:
+            sockets.append(socket)
+            latencies.append(elapsed)
+        else:
+            refused += 1
+    return sockets, latencies, refused
+
+
+async def _storm(scenario, sockets, messages, timeout):
+    """Each room's first socket sends `messages` messages; collect arrivals."""
+    by_room = defaultdict(list)
+    for socket in sockets:
+        by_room[id(socket.room)].append(socket)
+
+    sent = {}
+    arrivals = defaultdict(list)
+    replies = defaultdict(deque)
+    done = asyncio.Event()
+    delivered = [0]
+
+    def on_frame(socket, frame, at):
+        token = scenario.token(frame)
+        if token is None:
+            return
+        if not scenario.fan_out:
+            queue = replies[id(socket)]
+            if queue:
+                arrivals[queue.popleft()].append((socket, at))
+        elif token in sent:
+            arrivals[token].append((socket, at))
+        else:
+            return
+        delivered[0] += 1
+        if delivered[0] >= expected:
+            done.set()
+
+    senders = []
+    for members in by_room.values():
+        if scenario.fan_out:
+            senders.append((members[0], len(members)))
+        else:
+            senders.extend((member, 1) for member in members)
+    expected = sum(fan_out * messages for _, fan_out in senders)
+    counter = itertools.count()
+    for socket in sockets:
+        socket.start_reading(on_frame)
+
+    async def send_all(socket):
+        for _ in range(messages):
+            token = f"load-{next(counter)}"
+            sent[token] = (socket, time.perf_counter())
+            if not scenario.fan_out:
+                replies[id(socket)].append(token)
+            await socket.communicator.send_to(text_data=json.dumps(scenario.message(socket.room, token)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send_all(socket) for socket, _ in senders))
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+
+    round_trip, fan_out = [], []
+    for token, (sender, sent_at) in sent.items():
+        received = arrivals.get(token, [])
+        own = [at for socket, at in received if socket is sender]
+        if own:
+            round_trip.append((own[0] - sent_at) * 1000)
+        if received:
+            fan_out.append((max(at for _, at in received) - sent_at) * 1000)
+    return {
+        "sent": len(sent),
+        "expected_deliveries": expected,
+        "delivered": delivered[0],
+        "duration_s": round(elapsed, 3),
+        "messages_per_s": round(delivered[0] / elapsed, 1) if elapsed else None,
+        "round_trip": _percentiles(round_trip),
+        "fan_out": _percentiles(fan_out),
+    }
+
+
+async def _measure_memory(application, scenario, connections, room_size):
+    """Bytes allocated per open connection, from a tracemalloc pass."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        sockets, _, _ = await _open(application, scenario, connections, room_size)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    await asyncio.gather(*(s.close() for s in sockets))
+    if not sockets:
+        return None
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return round(grown / len(sockets))
+
+
+async def run_scenario(application, scenario, connections, room_size, messages, timeout, memory=True):
+    sockets, connect_ms, refused = await _open(application, scenario, connections, room_size)
+    try:
+        result = await _storm(scenario, sockets, messages, timeout)
+    finally:
+        await asyncio.gather(*(s.close() for s in sockets))
+    result.update({
+        "connections": len(sockets),
+        "refused": refused,
+        "connect": _percentiles(connect_ms),
+    })
+    if memory:
+        result["bytes_per_connection"] = await _measure_memory(application, scenario, connections, room_size)
+    return result
+
+
+def format_result(name, result):
+    def ms(block):
+        if block["p50_ms"] is None:
+            return "n/a"
+        return f"p50 {block['p50_ms']:.1f} / p95 {block['p95_ms']:.1f} / p99 {block['p99_ms']:.1f}ms"
+
+    per_connection = result.get("bytes_per_connection")
+    lines = [
+        f"{name}: {result['connections']} sockets ({result['refused']} refused)",
+        f"  connect     {ms(result['connect'])}",
+        f"  round trip  {ms(result['round_trip'])}",
+        f"  fan-out     {ms(result['fan_out'])}",
+        f"  delivered   {result['delivered']}/{result['expected_deliveries']} frames in "
+        f"{result['duration_s']}s ({result['messages_per_s']} msg/s)",
+    ]
+    if per_connection is not None:
+        lines.append(f"  memory      {per_connection / 1024:.1f} KiB per connection")
+    return "\n".join(lines)
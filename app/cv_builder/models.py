@@ -1,6 +1,7 @@
 from django.db import models
 from django_countries.fields import CountryField
 from cloudinary.models import CloudinaryField
+from globalconceptBE.storage import job_file_storage
 from globalconceptBE.validators import validate_image_file
 
 from account.models import User
@@ -18,6 +19,9 @@ class CVProfile(models.Model):
     photo = CloudinaryField('image', blank=True, null=True, validators=[validate_image_file])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Content hash of the CV as last rendered or due to be rendered
+    # (app/cv_builder/rendering.py); keys the CVRender files and the ETag.
+    render_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.user.full_name} (CV)"
@@ -123,3 +127,60 @@ class CVPublication(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class CVMatchVector(models.Model):
+    """
+    Weighted term counts of a CV, kept up to date by signals and read by the
+    matching index (app/cv_builder/matching.py).
+    """
+    cv = models.OneToOneField(
+        CVProfile, on_delete=models.CASCADE, primary_key=True, related_name='match_vector')
+    terms = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Match vector for CV {self.cv_id}"
+
+
+class OfferMatchVector(models.Model):
+    """
+    Weighted term counts of a work visa offer and its requirements.
+    """
+    offer = models.OneToOneField(
+        'app.WorkVisaOffer', on_delete=models.CASCADE, primary_key=True, related_name='match_vector')
+    terms = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Match vector for offer {self.offer_id}"
+
+
+def cv_render_upload_to(instance, filename):
+    return f'cv_renders/{instance.cv_id}/{filename}'
+
+
+class CVRender(models.Model):
+    """
+    A rendered PDF or DOCX of a CV, for one content hash. Written by the
+    render_cv task; downloads only ever read it.
+    """
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('docx', 'DOCX'),
+    ]
+    cv = models.ForeignKey(CVProfile, on_delete=models.CASCADE, related_name='renders')
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    content_hash = models.CharField(max_length=64)
+    # Written on the Celery worker, read by the web process: shared storage.
+    file = models.FileField(upload_to=cv_render_upload_to, storage=job_file_storage)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cv', 'format', 'content_hash'], name='unique_cv_render'),
+        ]
+
+    def __str__(self):
+        return f"CV {self.cv_id} {self.format} ({self.content_hash[:12]})"
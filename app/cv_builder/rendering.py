@@ -0,0 +1,379 @@
+"""
+Background CV rendering.
+
+A CV's downloadable files are rendered from a plain "document" (see
+`cv_document`): the owner's name and contact details, the summary and the
+nested sections. The SHA-256 of that document (plus RENDERER_VERSION) is the
+CV's content hash:
+
+  * After any change to the CV, its sections or the owner's name/contact
+    details commits, `refresh_render` recomputes the hash and stores it on
+    CVProfile.render_hash. If no files exist for that hash yet, the
+    `render_cv` Celery task is queued; an unchanged CV hashes the same and is
+    never rendered again.
+  * The task writes one CVRender per format for the hash and removes the
+    CV's renders for older hashes.
+  * Downloads look up the render for the stored hash and serve it with the
+    hash as ETag. A render that is not ready yet answers 202; downloads
+    never render inline.
+
+The renderers use the standard library only: a single-font PDF writer and a
+minimal WordprocessingML package. Both are deterministic, so the same
+document always gives the same bytes. Bump RENDERER_VERSION when the layout
+changes so every CV is rendered afresh.
+"""
+import hashlib
+import io
+import json
+import logging
+import textwrap
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django_countries import countries
+
+from globalconceptBE.on_commit import run_once_on_commit
+
+logger = logging.getLogger(__name__)
+
+RENDERER_VERSION = 1
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# A render queued for a hash is not queued again for this long.
+RENDER_QUEUED_KEY = "cv_render:queued:{cv_id}:{content_hash}"
+RENDER_QUEUED_SECONDS = 300
+
+
+def _join(*parts, sep=" "):
+    return sep.join(str(part).strip() for part in parts if part and str(part).strip())
+
+
+def _period(start, end):
+    return _join(start, end or "Present", sep=" - ") if start else _join(end)
+
+
+def _by_pk(manager):
+    # Prefetched; sorted here so the document does not depend on query order.
+    return sorted(manager.all(), key=lambda obj: obj.pk)
+
+
+def cv_document(cv):
+    """The content of a CV's files, as JSON-serialisable data."""
+    user = cv.user
+    country = countries.name(user.country_of_residence) if user.country_of_residence else ""
+    sections = [
+        ("Experience", [
+            {
+                "title": _join(experience.position, experience.organization, sep=", "),
+                "meta": _join(
+                    _period(_join(experience.start_month, experience.start_year),
+                            _join(experience.end_month, experience.end_year)),
+                    experience.location, sep=" | ",
+                ),
+                "body": experience.description,
+            }
+            for experience in _by_pk(cv.experience)
+        ]),
+        ("Education", [
+            {
+                "title": _join(_join(education.degree, education.field, sep=" in "), education.institution, sep=", "),
+                "meta": _join(_period(education.start_year, education.end_year), education.grade, sep=" | "),
+                "body": education.description,
+            }
+            for education in _by_pk(cv.education)
+        ]),
+        ("Certifications", [
+            {
+                "title": certification.name,
+                "meta": _join(certification.issuer, _join(certification.issue_month, certification.issue_year),
+                              sep=" | "),
+                "body": certification.description,
+            }
+            for certification in _by_pk(cv.certifications)
+        ]),
+        ("Skills", [
+            {"title": "", "meta": "", "body": ", ".join(skill.skill for skill in _by_pk(cv.skills))},
+        ] if cv.skills.all() else []),
+        ("Languages", [
+            {
+                "title": "",
+                "meta": "",
+                "body": ", ".join(f"{language.name} ({language.proficiency})" for language in _by_pk(cv.languages)),
+            },
+        ] if cv.languages.all() else []),
+        ("Publications", [
+            {
+                "title": publication.title,
+                "meta": _join(publication.journal, publication.year, publication.link, sep=" | "),
+                "body": publication.description,
+            }
+            for publication in _by_pk(cv.publications)
+        ]),
+    ]
+    return {
+        "name": user.full_name,
+        "contact": _join(user.email, user.phone_number, country, sep=" | "),
+        "summary": cv.summary,
+        "sections": [{"heading": heading, "entries": entries} for heading, entries in sections if entries],
+    }
+
+
+def document_hash(document):
+    payload = json.dumps({"renderer": RENDERER_VERSION, "document": document}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _blocks(document):
+    """The document as (style, text) blocks, shared by both renderers."""
+    yield "name", document["name"]
+    if document["contact"]:
+        yield "meta", document["contact"]
+    if document["summary"]:
+        yield "heading", "Profile"
+        yield "body", document["summary"]
+    for section in document["sections"]:
+        yield "heading", section["heading"]
+        for entry in section["entries"]:
+            if entry["title"]:
+                yield "title", entry["title"]
+            if entry["meta"]:
+                yield "meta", entry["meta"]
+            if entry["body"]:
+                yield "body", entry["body"]
+
+
+# ── PDF ─────────────────────────────────────────────────────────────────────
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+# style: (font resource, size, space before)
+PDF_STYLES = {
+    "name": ("F2", 20, 0),
+    "heading": ("F2", 13, 14),
+    "title": ("F2", 11, 6),
+    "meta": ("F1", 9, 1),
+    "body": ("F1", 10, 2),
+}
+
+
+def _pdf_text(text):
+    raw = text.encode("cp1252", "replace").decode("latin-1")
+    return raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_lines(text, size):
+    # Helvetica averages about half an em per character.
+    width = max(int((PAGE_WIDTH - 2 * MARGIN) / (size * 0.5)), 20)
+    lines = []
+    for paragraph in str(text).splitlines() or [""]:
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+    return lines
+
+
+def render_pdf(document):
+    pages, current = [], []
+    y = PAGE_HEIGHT - MARGIN
+    for style, text in _blocks(document):
+        font, size, space_before = PDF_STYLES[style]
+        y -= space_before
+        for line in _pdf_lines(text, size):
+            leading = size * 1.3
+            if y - leading < MARGIN:
+                pages.append(current)
+                current, y = [], PAGE_HEIGHT - MARGIN
+            y -= leading
+            current.append(f"BT /{font} {size} Tf {MARGIN} {y:.1f} Td ({_pdf_text(line)}) Tj ET")
+    pages.append(current)
+
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and its content stream per page.
+    objects = {
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        4: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    for index, lines in enumerate(pages):
+        page_id, content_id = 5 + 2 * index, 6 + 2 * index
+        stream = "\n".join(lines)
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        objects[content_id] = f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream"
+        kids.append(f"{page_id} 0 R")
+    objects[1] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = out.tell()
+        out.write(f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for object_id in sorted(objects):
+        out.write(f"{offsets[object_id]:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+# ── DOCX ────────────────────────────────────────────────────────────────────
+
+# style: (bold, half-point size, space before in twentieths of a point)
+DOCX_STYLES = {
+    "name": (True, 40, 0),
+    "heading": (True, 26, 280),
+    "title": (True, 22, 120),
+    "meta": (False, 18, 0),
+    "body": (False, 20, 40),
+}
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _docx_paragraph(style, text):
+    bold, size, space_before = DOCX_STYLES[style]
+    run_properties = ("<w:b/>" if bold else "") + f'<w:sz w:val="{size}"/>'
+    runs = '<w:r><w:br/></w:r>'.join(
+        f'<w:r><w:rPr>{run_properties}</w:rPr><w:t xml:space="preserve">{escape(line)}</w:t></w:r>'
+        for line in str(text).splitlines() or [""]
+    )
+    return f'<w:p><w:pPr><w:spacing w:before="{space_before}"/></w:pPr>{runs}</w:p>'
+
+
+def render_docx(document):
+    body = "".join(_docx_paragraph(style, text) for style, text in _blocks(document))
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, data in (
+            ("[Content_Types].xml", DOCX_CONTENT_TYPES),
+            ("_rels/.rels", DOCX_RELS),
+            ("word/document.xml", xml),
+        ):
+            # A fixed timestamp keeps the bytes identical for the same document.
+            package.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data,
+                             compress_type=zipfile.ZIP_DEFLATED)
+    return out.getvalue()
+
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx}
+
+
+# ── Pipeline ────────────────────────────────────────────────────────────────
+
+def _load(cv_id):
+    from app.cv_builder.models import CVProfile
+
+    return (
+        CVProfile.objects.filter(pk=cv_id)
+        .select_related("user")
+        .prefetch_related("education", "experience", "certifications", "skills", "languages", "publications")
+        .first()
+    )
+
+
+def _store_hash(cv, content_hash):
+    from app.cv_builder.models import CVProfile
+
+    if cv.render_hash != content_hash:
+        # update(): the hash is derived data and must not re-trigger the signals.
+        CVProfile.objects.filter(pk=cv.pk).update(render_hash=content_hash)
+        cv.render_hash = content_hash
+
+
+def _missing_formats(cv_id, content_hash):
+    from app.cv_builder.models import CVRender
+
+    done = set(CVRender.objects.filter(cv_id=cv_id, content_hash=content_hash).values_list("format", flat=True))
+    return [file_format for file_format in RENDERERS if file_format not in done]
+
+
+def enqueue_render(cv_id, content_hash):
+    """Queue render_cv for the CV, unless it was queued for this hash recently."""
+    from app.cv_builder.tasks import render_cv
+
+    key = RENDER_QUEUED_KEY.format(cv_id=cv_id, content_hash=content_hash)
+    if not cache.add(key, True, RENDER_QUEUED_SECONDS):
+        return
+    try:
+        render_cv.delay(cv_id)
+    except Exception:
+        # Runs after commit: a broker outage must not fail the request that
+        # saved the CV. The next download queues the render again.
+        cache.delete(key)
+        logger.exception("Could not queue the render of CV %s", cv_id)
+
+
+def refresh_render(cv_id):
+    """Store the CV's current content hash and queue a render if it has none; returns the hash."""
+    cv = _load(cv_id)
+    if cv is None:
+        return None
+    content_hash = document_hash(cv_document(cv))
+    _store_hash(cv, content_hash)
+    if _missing_formats(cv_id, content_hash):
+        enqueue_render(cv_id, content_hash)
+    return content_hash
+
+
+def schedule_cv_render(cv_id):
+    run_once_on_commit(refresh_render, cv_id)
+
+
+def render_missing(cv_id):
+    """Render the files the CV's current content lacks and drop older renders; returns the formats rendered."""
+    from app.cv_builder.models import CVRender
+
+    cv = _load(cv_id)
+    if cv is None:
+        return []
+    document = cv_document(cv)
+    content_hash = document_hash(document)
+    _store_hash(cv, content_hash)
+
+    rendered = []
+    for file_format in _missing_formats(cv_id, content_hash):
+        data = RENDERERS[file_format](document)
+        render = CVRender(cv=cv, format=file_format, content_hash=content_hash, size=len(data))
+        render.file.save(f"{content_hash}.{file_format}", ContentFile(data), save=False)
+        try:
+            with transaction.atomic():
+                render.save()
+        except IntegrityError:
+            # Another worker stored the same render first.
+            render.file.delete(save=False)
+            continue
+        rendered.append(file_format)
+
+    for stale in CVRender.objects.filter(cv=cv).exclude(content_hash=content_hash):
+        stale.file.delete(save=False)
+        stale.delete()
+    return rendered
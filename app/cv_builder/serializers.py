@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import (
     CVProfile,
@@ -10,7 +11,16 @@ from .models import (
 )
 
 
-class CVEducationSerializer(serializers.ModelSerializer):
+class CVSectionSerializer(serializers.ModelSerializer):
+    """
+    Base for the nested CV sections. The id is writable so that an update can
+    say which existing row an item is; items without one are new (or are
+    matched to an identical existing row, see CVProfileSerializer.update).
+    """
+    id = serializers.IntegerField(required=False)
+
+
+class CVEducationSerializer(CVSectionSerializer):
     class Meta:
         model = CVEducation
         fields = [
@@ -25,7 +35,7 @@ class CVEducationSerializer(serializers.ModelSerializer):
         ]
 
 
-class CVExperienceSerializer(serializers.ModelSerializer):
+class CVExperienceSerializer(CVSectionSerializer):
     class Meta:
         model = CVExperience
         fields = [
@@ -42,7 +52,7 @@ class CVExperienceSerializer(serializers.ModelSerializer):
         ]
 
 
-class CVCertificationSerializer(serializers.ModelSerializer):
+class CVCertificationSerializer(CVSectionSerializer):
     class Meta:
         model = CVCertification
         fields = [
@@ -55,7 +65,7 @@ class CVCertificationSerializer(serializers.ModelSerializer):
         ]
 
 
-class CVSkillSerializer(serializers.ModelSerializer):
+class CVSkillSerializer(CVSectionSerializer):
     class Meta:
         model = CVSkill
         fields = [
@@ -64,7 +74,7 @@ class CVSkillSerializer(serializers.ModelSerializer):
         ]
 
 
-class CVLanguageSerializer(serializers.ModelSerializer):
+class CVLanguageSerializer(CVSectionSerializer):
     class Meta:
         model = CVLanguage
         fields = [
@@ -74,7 +84,7 @@ class CVLanguageSerializer(serializers.ModelSerializer):
         ]
 
 
-class CVPublicationSerializer(serializers.ModelSerializer):
+class CVPublicationSerializer(CVSectionSerializer):
     class Meta:
         model = CVPublication
         fields = [
@@ -112,65 +122,102 @@ class CVProfileSerializer(serializers.ModelSerializer):
             "publications",
         ]
 
+    # Nested sections; each name is both the field and the related_name on CVProfile.
+    SECTIONS = ('education', 'experience', 'certifications', 'skills', 'languages', 'publications')
+
+    # Atomic so that a failing section leaves no half-written CV behind.
+    @transaction.atomic
     def create(self, validated_data):
-        # Extract nested data
-        education_data = validated_data.pop('education', [])
-        experience_data = validated_data.pop('experience', [])
-        certifications_data = validated_data.pop('certifications', [])
-        skills_data = validated_data.pop('skills', [])
-        languages_data = validated_data.pop('languages', [])
-        publications_data = validated_data.pop('publications', [])
+        sections = {name: validated_data.pop(name, []) for name in self.SECTIONS}
 
         # Create the main profile
         cv_profile = CVProfile.objects.create(**validated_data)
 
-        # Bulk create for each nested set. Use related_name + set attribute, not profile arg.
-        # Education
-        for edu in education_data:
-            cv_profile.education.create(**edu)
-        # Experience
-        for exp in experience_data:
-            cv_profile.experience.create(**exp)
-        # Certifications
-        for cert in certifications_data:
-            cv_profile.certifications.create(**cert)
-        # Skills
-        for skill in skills_data:
-            cv_profile.skills.create(**skill)
-        # Languages
-        for lang in languages_data:
-            cv_profile.languages.create(**lang)
-        # Publications
-        for pub in publications_data:
-            cv_profile.publications.create(**pub)
+        # One INSERT per non-empty section; ids sent by the client mean nothing
+        # here. The profile's post_save above schedules the refreshes.
+        for name in self.SECTIONS:
+            model = getattr(cv_profile, name).model
+            rows = [
+                model(cv=cv_profile, **{key: value for key, value in item.items() if key != 'id'})
+                for item in sections[name]
+            ]
+            if rows:
+                model.objects.bulk_create(rows)
 
         return cv_profile
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        # Extract nested data
-        education_data = validated_data.pop('education', [])
-        experience_data = validated_data.pop('experience', [])
-        certifications_data = validated_data.pop('certifications', [])
-        skills_data = validated_data.pop('skills', [])
-        languages_data = validated_data.pop('languages', [])
-        publications_data = validated_data.pop('publications', [])
+        # A section left out of a partial update is left as it is.
+        sections = {name: validated_data.pop(name, None) for name in self.SECTIONS}
 
         # Update profile fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-        # Helper to update nested relations: deletes all old, creates new using related_name
-        def update_nested(related_manager, data_list):
-            related_manager.all().delete()
-            for item in data_list:
-                related_manager.create(**item)
-
-        update_nested(instance.education, education_data)
-        update_nested(instance.experience, experience_data)
-        update_nested(instance.certifications, certifications_data)
-        update_nested(instance.skills, skills_data)
-        update_nested(instance.languages, languages_data)
-        update_nested(instance.publications, publications_data)
+        # Bulk writes send no signals; the instance.save() above schedules the
+        # CV's match-vector and render refresh for the whole update.
+        for name in self.SECTIONS:
+            if sections[name] is not None:
+                self._sync_section(instance, name, sections[name])
 
         return instance
+
+    def _sync_section(self, instance, name, items):
+        """
+        Bring one section in line with `items`: read the existing rows, then
+        at most one bulk_create, one bulk_update and one delete, whatever the
+        number of items.
+
+        Items are matched to existing rows by id; an item without an id (as
+        sent by clients that replace the whole list) is matched to an unused
+        existing row with identical values, so resubmitting an unchanged CV
+        writes nothing.
+        """
+        model = getattr(instance, name).model
+        fields = [field for field in self.fields[name].child.fields if field != 'id']
+        existing = {row.pk: row for row in model.objects.filter(cv=instance)}
+
+        defaults = {field: model._meta.get_field(field).get_default() for field in fields}
+
+        def row_key(row):
+            return tuple(getattr(row, field) for field in fields)
+
+        def item_key(item):
+            return tuple(item.get(field, defaults[field]) for field in fields)
+
+        keep, to_create, to_update = set(), [], []
+        unmatched = []
+        for item in items:
+            row = existing.get(item.get('id'))
+            if row is None or row.pk in keep:
+                unmatched.append(item)
+                continue
+            keep.add(row.pk)
+            changed = False
+            for field in fields:
+                if field in item and getattr(row, field) != item[field]:
+                    setattr(row, field, item[field])
+                    changed = True
+            if changed:
+                to_update.append(row)
+
+        spare = {}
+        for row in existing.values():
+            if row.pk not in keep:
+                spare.setdefault(row_key(row), []).append(row)
+        for item in unmatched:
+            same = spare.get(item_key(item))
+            if same:
+                keep.add(same.pop(0).pk)
+            else:
+                to_create.append(model(cv=instance, **{key: value for key, value in item.items() if key != 'id'}))
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, fields)
+        stale = [pk for pk in existing if pk not in keep]
+        if stale:
+            model.objects.filter(cv=instance, id__in=stale).delete()
@@ -0,0 +1,90 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from account.client.models import Client
+from account.models import User
+from app.cv_builder.matching import (
+    invalidate_index,
+    refresh_offer_vectors,
+    schedule_cv_refresh,
+    schedule_offer_refresh,
+)
+from app.cv_builder.models import (
+    CVCertification,
+    CVEducation,
+    CVExperience,
+    CVLanguage,
+    CVProfile,
+    CVPublication,
+    CVSkill,
+)
+from app.cv_builder.rendering import schedule_cv_render
+from app.visa.work.offers.models import WorkVisaOffer, WorkVisaOfferRequirement
+from globalconceptBE.imports import rows_imported
+
+# User fields that appear on a rendered CV.
+RENDERED_USER_FIELDS = ('first_name', 'middle_name', 'last_name', 'email', 'phone_number', 'country_of_residence')
+
+
+@receiver(post_save, sender=CVProfile)
+def refresh_cv_outputs(sender, instance, **kwargs):
+    schedule_cv_refresh(instance.pk)
+    schedule_cv_render(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CVSkill)
+@receiver([post_save, post_delete], sender=CVExperience)
+@receiver([post_save, post_delete], sender=CVEducation)
+@receiver([post_save, post_delete], sender=CVCertification)
+def refresh_cv_outputs_for_detail(sender, instance, **kwargs):
+    schedule_cv_refresh(instance.cv_id)
+    schedule_cv_render(instance.cv_id)
+
+
+@receiver([post_save, post_delete], sender=CVLanguage)
+@receiver([post_save, post_delete], sender=CVPublication)
+def refresh_cv_render_for_detail(sender, instance, **kwargs):
+    # Not used for matching; only the rendered files change.
+    schedule_cv_render(instance.cv_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Client)
+def refresh_cv_render_for_owner(sender, instance, created, **kwargs):
+    if created or not any(instance.has_changed(field) for field in RENDERED_USER_FIELDS):
+        return
+    for cv_id in CVProfile.objects.filter(user_id=instance.pk).values_list('pk', flat=True):
+        schedule_cv_render(cv_id)
+
+
+@receiver(post_save, sender=WorkVisaOffer)
+def refresh_offer_match_vector(sender, instance, **kwargs):
+    schedule_offer_refresh(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=WorkVisaOfferRequirement)
+def refresh_offer_match_vector_for_requirement(sender, instance, **kwargs):
+    schedule_offer_refresh(instance.offer_id)
+
+
+@receiver(rows_imported, sender=WorkVisaOffer)
+def refresh_imported_offer_match_vectors(sender, created, updated, **kwargs):
+    refresh_offer_vectors(created + updated)
+
+
+@receiver(rows_imported, sender=WorkVisaOfferRequirement)
+def refresh_offer_match_vectors_for_imported_requirements(sender, created, updated, **kwargs):
+    offer_ids = WorkVisaOfferRequirement.objects.filter(pk__in=created + updated).values_list('offer_id', flat=True)
+    refresh_offer_vectors(set(offer_ids))
+
+
+@receiver(post_delete, sender=CVProfile)
+def drop_cv_from_match_index(sender, instance, **kwargs):
+    """Deletions cannot be followed incrementally; make the indexes reload."""
+    transaction.on_commit(lambda: invalidate_index("cv"))
+
+
+@receiver(post_delete, sender=WorkVisaOffer)
+def drop_offer_from_match_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_index("offer"))
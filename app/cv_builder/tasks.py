@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from app.cv_builder import rendering
+
+
+@shared_task
+def render_cv(cv_id):
+    """
+    Renders the PDF and DOCX of a CV for its current content, skipping formats
+    already rendered for that content, and removes renders of older content.
+    Queued by app/cv_builder/rendering.py whenever a CV changes.
+    """
+    return rendering.render_missing(cv_id)
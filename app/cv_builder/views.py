@@ -1,8 +1,13 @@
+from django.http import FileResponse
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from app.views import CustomPagination
-from .models import CVProfile
+from globalconceptBE.etags import not_modified, with_etag
+from app.visa.work.offers.models import WorkVisaOffer
+from . import matching, rendering
+from .models import CVProfile, CVRender
 from .serializers import CVProfileSerializer
 
 
@@ -48,3 +53,55 @@ class CVProfileViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='matching-offers')
+    def matching_offers(self, request, pk=None):
+        """
+        The work visa offers that best match this CV, best first.
+        ?limit= sets how many (default 10, at most 100).
+        """
+        cv = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except (ValueError, TypeError):
+            limit = 10
+        ranked = matching.top_offers(cv, limit)
+        offers = WorkVisaOffer.objects.in_bulk([offer_id for offer_id, _ in ranked])
+        results = [
+            {'offer': offer_id, 'job_title': offers[offer_id].job_title, 'score': score}
+            for offer_id, score in ranked if offer_id in offers
+        ]
+        return Response({'cv': cv.pk, 'results': results})
+
+    @action(detail=True, methods=['get'], url_path=r'download/(?P<file_type>pdf|docx)')
+    def download(self, request, pk=None, file_type=None):
+        """
+        The CV as a PDF or DOCX file. Files are rendered in the background when
+        the CV changes (see rendering.py); this only serves them. Answers 202
+        while the current content is still being rendered, and 304 when
+        If-None-Match already names it.
+        """
+        cv = self.get_object()
+        content_hash = cv.render_hash or rendering.refresh_render(cv.pk)
+        etag = f'"{content_hash}-{file_type}"'
+        cached = not_modified(request, etag, cache_control='private, no-cache')
+        if cached is not None:
+            return cached
+
+        render = CVRender.objects.filter(cv=cv, format=file_type, content_hash=content_hash).first()
+        if render is None:
+            rendering.enqueue_render(cv.pk, content_hash)
+            response = Response(
+                {'detail': 'The CV is being prepared. Please try again shortly.'},
+                status=status.HTTP_202_ACCEPTED,
+            )
+            response['Retry-After'] = '5'
+            return response
+
+        response = FileResponse(
+            render.file.open('rb'),
+            as_attachment=True,
+            filename=f'cv-{cv.pk}.{file_type}',
+            content_type=rendering.CONTENT_TYPES[file_type],
+        )
+        return with_etag(response, etag, cache_control='private, no-cache')
@@ -0,0 +1,43 @@
+from django.contrib import admin, messages
+from import_export.admin import ImportExportModelAdmin
+
+from .jobs import start_export
+
+
+class BackgroundExportAdminMixin:
+    """
+    Adds "export in the background" actions to a ModelAdmin. The export is
+    written by a Celery job (app/exports/jobs.py) and the admin is notified
+    when it is ready, instead of the whole table being built in the request.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        for name in ('export_csv_in_background', 'export_xlsx_in_background'):
+            func = getattr(type(self), name)
+            actions[name] = (func, name, func.short_description)
+        return actions
+
+    def _start_background_export(self, request, queryset, file_type):
+        ids = list(queryset.values_list('pk', flat=True))
+        # Everything selected: export the table rather than a list of every id.
+        if len(ids) == self.model._default_manager.count():
+            ids = []
+        job = start_export(request.user, f'admin:{self.model._meta.label_lower}', file_type, ids)
+        self.message_user(
+            request,
+            f"Export #{job.pk} started. You will be notified when the file is ready.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Export selected to CSV (in the background)")
+    def export_csv_in_background(self, request, queryset):
+        self._start_background_export(request, queryset, 'csv')
+
+    @admin.action(description="Export selected to XLSX (in the background)")
+    def export_xlsx_in_background(self, request, queryset):
+        self._start_background_export(request, queryset, 'xlsx')
+
+
+class BackgroundExportAdmin(BackgroundExportAdminMixin, ImportExportModelAdmin):
+    pass
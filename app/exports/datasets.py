@@ -0,0 +1,56 @@
+"""
+The tables that can be exported, by name.
+
+Each dataset gives the rows to export (ordered, so exports are stable) and
+the columns as (header, values_list path) pairs. Admin exports register a
+dataset per model as "admin:<app_label>.<model>".
+"""
+from django.apps import apps
+
+from globalconceptBE.exports import model_columns
+
+
+class Dataset:
+    def __init__(self, model, filters=None, columns=None, exclude=('password',)):
+        self.model_label = model
+        self.filters = filters or {}
+        self.extra_columns = columns or []
+        self.exclude = exclude
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def columns(self):
+        return model_columns(self.model, exclude=self.exclude) + list(self.extra_columns)
+
+    def queryset(self, object_ids=None):
+        queryset = self.model._default_manager.filter(**self.filters).order_by('pk')
+        if object_ids:
+            queryset = queryset.filter(pk__in=object_ids)
+        return queryset
+
+
+DATASETS = {
+    'roles': Dataset('definition.Roles', filters={'is_deleted': False}),
+    'wallet-transactions': Dataset('wallet.WalletTransaction', columns=[('user_email', 'user__email')]),
+    'work-visa-applications': Dataset('app.WorkVisaApplication', columns=[('client_email', 'client__email')]),
+    'study-visa-applications': Dataset('app.StudyVisaApplication', columns=[('applicant_email', 'applicant__email')]),
+    'vacation-visa-applications': Dataset(
+        'app.VacationVisaApplication', columns=[('applicant_email', 'applicant__email')]),
+    'pilgrimage-visa-applications': Dataset(
+        'app.PilgrimageVisaApplication', columns=[('applicant_email', 'applicant__email')]),
+}
+
+
+def get_dataset(name):
+    """The named dataset, or None. "admin:<label>" names any installed model."""
+    if name in DATASETS:
+        return DATASETS[name]
+    if name.startswith('admin:'):
+        try:
+            apps.get_model(name[len('admin:'):])
+        except (LookupError, ValueError):
+            return None
+        return Dataset(name[len('admin:'):])
+    return None
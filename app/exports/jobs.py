@@ -0,0 +1,126 @@
+"""
+Background export jobs.
+
+`start_export` records an ExportJob and queues the run_export task after
+commit. The task streams the dataset's rows into a temporary file with the
+writers in globalconceptBE/exports.py, stores the file on the job and
+notifies the user who asked for it, whether it succeeded or not.
+
+A worker that dies mid-export leaves its job "running"; the periodic
+fail_stale_exports task fails (and notifies) jobs running for longer than
+EXPORT_JOB_TIMEOUT_SECONDS.
+"""
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from globalconceptBE.exports import queryset_rows, write_csv, write_xlsx
+from notification.models import Notification
+from .datasets import get_dataset
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+WRITERS = {'csv': write_csv, 'xlsx': write_xlsx}
+
+
+def start_export(user, dataset, file_type='csv', object_ids=None):
+    job = ExportJob.objects.create(user=user, dataset=dataset, file_type=file_type, object_ids=object_ids or [])
+    transaction.on_commit(lambda: _enqueue(job.pk))
+    return job
+
+
+def _enqueue(job_id):
+    from .tasks import run_export
+
+    try:
+        run_export.delay(job_id)
+    except Exception as exc:
+        logger.exception("Could not queue export job %s", job_id)
+        ExportJob.objects.filter(pk=job_id).update(
+            status='failed', error=f"Could not queue the export: {exc}", finished_at=timezone.now(),
+        )
+
+
+def _notify(job):
+    if job.status == 'done':
+        title = "Your export is ready"
+        message = f"{job.dataset} ({job.row_count} rows) is ready to download."
+    else:
+        title = "Your export failed"
+        message = f"{job.dataset} could not be exported: {job.error}"
+    Notification.objects.create(
+        user_id=job.user_id,
+        title=title,
+        message=message,
+        notification_type='system',
+        data={
+            'export_job': job.pk,
+            'status': job.status,
+            'download_url': reverse('exportjob-download', args=[job.pk]) if job.status == 'done' else None,
+        },
+    )
+
+
+def run(job_id):
+    """Write the job's file; returns the job, or None if it was already claimed."""
+    # Claim the job, so a redelivered task does not run it twice.
+    claimed = ExportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(),
+    )
+    if not claimed:
+        return None
+    job = ExportJob.objects.get(pk=job_id)
+    try:
+        dataset = get_dataset(job.dataset)
+        if dataset is None:
+            raise ValueError(f"Unknown dataset {job.dataset!r}")
+        rows = queryset_rows(dataset.queryset(job.object_ids), dataset.columns())
+        with tempfile.TemporaryFile() as handle:
+            job.row_count = WRITERS[job.file_type](handle, rows)
+            handle.seek(0)
+            name = job.dataset.replace('admin:', '').replace('.', '-')
+            job.file.save(f"{name}-{job.pk}.{job.file_type}", File(handle), save=False)
+        job.status = 'done'
+    except Exception as exc:
+        logger.exception("Export job %s failed", job_id)
+        job.status = 'failed'
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    # Only a job still running is finished here: if fail_stale_exports gave up
+    # on it meanwhile, the user was already told it failed.
+    finished = ExportJob.objects.filter(pk=job.pk, status='running').update(
+        status=job.status, error=job.error, row_count=job.row_count, file=job.file.name or '',
+        finished_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Export job %s finished after it was failed as stale", job_id)
+        if job.file:
+            job.file.delete(save=False)
+        job.refresh_from_db()
+        return job
+    _notify(job)
+    return job
+
+
+def fail_stale_exports():
+    """Fail the jobs whose worker died mid-export; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "EXPORT_JOB_TIMEOUT_SECONDS", 3600))
+    failed = 0
+    for job in ExportJob.objects.filter(status='running', started_at__lt=cutoff):
+        # Re-check the status in the UPDATE, in case the job finished meanwhile.
+        if ExportJob.objects.filter(pk=job.pk, status='running').update(
+            status='failed', error="The export did not finish in time.", finished_at=timezone.now(),
+        ):
+            job.refresh_from_db()
+            _notify(job)
+            failed += 1
+    if failed:
+        logger.warning("Failed %s stale export job(s)", failed)
+    return failed
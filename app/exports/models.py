@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import models
+
+from globalconceptBE.storage import job_file_storage
+
+
+def export_file_upload_to(instance, filename):
+    return f'exports/{instance.user_id}/{filename}'
+
+
+class ExportJob(models.Model):
+    """
+    A table export written to storage by the run_export task, for exports too
+    large to stream or in a format that cannot be streamed (XLSX).
+    """
+    FILE_TYPE_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'XLSX'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    dataset = models.CharField(max_length=100, help_text="Name in app/exports/datasets.py")
+    file_type = models.CharField(max_length=8, choices=FILE_TYPE_CHOICES, default='csv')
+    # Optional primary keys to restrict the export to (admin "export selected").
+    object_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Written on the Celery worker, downloaded from the web process: shared storage.
+    file = models.FileField(upload_to=export_file_upload_to, storage=job_file_storage, blank=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.dataset}.{self.file_type} ({self.status})"
@@ -0,0 +1,22 @@
+from celery import shared_task
+
+from app.exports import jobs
+
+
+@shared_task
+def run_export(job_id):
+    """
+    Writes an ExportJob's file to storage and notifies its owner.
+    Queued by app/exports/jobs.py::start_export.
+    """
+    job = jobs.run(job_id)
+    return job.status if job else None
+
+
+@shared_task
+def fail_stale_exports():
+    """
+    Fails export jobs left running by a worker that died.
+    Scheduled in CELERY_BEAT_SCHEDULE.
+    """
+    return jobs.fail_stale_exports()
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.http import FileResponse
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from app.views import CustomPagination
+from globalconceptBE.exports import XLSX_CONTENT_TYPE, csv_response, queryset_rows
+from .datasets import DATASETS
+from .jobs import start_export
+from .models import ExportJob
+from .serializers import ExportJobSerializer
+
+CONTENT_TYPES = {'csv': 'text/csv', 'xlsx': XLSX_CONTENT_TYPE}
+
+
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Staff exports of the datasets in app/exports/datasets.py.
+
+    GET export-jobs/datasets/<name>/ streams a CSV when the dataset is small
+    enough (EXPORT_STREAM_MAX_ROWS); larger exports and ?file_type=xlsx are
+    written by a background job instead (202 with the job), and the user is
+    notified when the file is ready at export-jobs/<id>/download/.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = CustomPagination
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    @action(detail=False, methods=['get'], url_path=r'datasets/(?P<dataset>[\w-]+)')
+    def export(self, request, dataset=None):
+        if dataset not in DATASETS:
+            return Response({'detail': f'Unknown dataset "{dataset}".'}, status=status.HTTP_404_NOT_FOUND)
+        file_type = request.query_params.get('file_type', 'csv').lower()
+        if file_type not in CONTENT_TYPES:
+            return Response({'file_type': ['Choose "csv" or "xlsx".']}, status=status.HTTP_400_BAD_REQUEST)
+
+        source = DATASETS[dataset]
+        queryset = source.queryset()
+        if file_type == 'csv' and queryset.count() <= getattr(settings, 'EXPORT_STREAM_MAX_ROWS', 50000):
+            return csv_response(queryset_rows(queryset, source.columns()), f'{dataset}.csv')
+
+        job = start_export(request.user, dataset, file_type)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'done' or not job.file:
+            return Response(
+                {'detail': 'The export is not ready.', 'status': job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=f'{job.dataset.replace("admin:", "")}.{job.file_type}',
+            content_type=CONTENT_TYPES[job.file_type],
+        )
@@ -5,9 +5,10 @@ from rest_framework import status
 from django.conf import settings
 from .models import FlightBooking
 
-AMADEUS_BASE_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-AMADEUS_AUTH_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
-AMADEUS_LOCATION_URL = "https://test.api.amadeus.com/v1/reference-data/locations"
+AMADEUS_API_BASE_URL = getattr(settings, "AMADEUS_API_BASE_URL", "https://test.api.amadeus.com")
+AMADEUS_BASE_URL = f"{AMADEUS_API_BASE_URL}/v2/shopping/flight-offers"
+AMADEUS_AUTH_URL = f"{AMADEUS_API_BASE_URL}/v1/security/oauth2/token"
+AMADEUS_LOCATION_URL = f"{AMADEUS_API_BASE_URL}/v1/reference-data/locations"
 
 def get_amadeus_access_token():
     payload = {
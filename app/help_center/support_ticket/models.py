@@ -2,13 +2,10 @@ from django.db import models
 from django.conf import settings
 
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 
 def get_default_open_status():
-    # Lazy import to avoid circular import issues
-    # Assumes 'open' is the value of TableDropDownDefinition.code or similar field identifying open status
-    return TableDropDownDefinition.objects.filter(
-        table_name='support_ticket_status', term='Open'
-    ).first()
+    return get_definition('support_ticket_status', 'Open')
 
 class SupportTicket(models.Model):
 
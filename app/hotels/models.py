@@ -1,6 +1,7 @@
 from django.db import models
 
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 
 
 class HotelBooking(models.Model):
@@ -24,13 +25,8 @@ class HotelBooking(models.Model):
     def save(self, *args, **kwargs):
         # Set default status to "Pending" if not already set
         if not self.status:
-            try:
-                self.status = TableDropDownDefinition.objects.get(
-                    table_name='hotel_reservation_status',
-                    term__iexact='Pending'
-                )
-            except TableDropDownDefinition.DoesNotExist:
-                pass  # Optionally, handle the case where "Pending" does not exist
+            # Left unset when no "Pending" definition exists
+            self.status = get_definition('hotel_reservation_status', 'Pending', iexact=True)
         super().save(*args, **kwargs)
 
     def __str__(self):
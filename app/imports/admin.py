@@ -0,0 +1,19 @@
+from django import forms
+
+from .models import ImportJob
+from .targets import available_targets
+
+
+class ImportJobForm(forms.ModelForm):
+    """Upload form for the ImportJob admin: the table and the file."""
+    target = forms.ChoiceField(choices=available_targets)
+
+    class Meta:
+        model = ImportJob
+        fields = ['target', 'file']
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
@@ -0,0 +1,160 @@
+"""
+Background import jobs.
+
+`start_import` stores the upload on an ImportJob and queues the run_import
+task after commit. The task reads the file once to count its rows, then
+again in chunks of IMPORT_CHUNK_SIZE rows; each chunk is validated and
+written in its own transaction (see globalconceptBE/imports.py), and the
+job's counters are updated after every chunk so progress can be polled.
+Rows that fail validation are skipped and reported on the job; the user who
+started the import is notified when it finishes.
+
+A worker that dies mid-import leaves its job "running"; the periodic
+fail_stale_imports task fails (and notifies) jobs running for longer than
+IMPORT_JOB_TIMEOUT_SECONDS. The chunks written before that are kept.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from globalconceptBE.imports import chunked, read_rows
+from notification.models import Notification
+from .models import ImportJob
+from .targets import get_importer
+
+logger = logging.getLogger(__name__)
+
+
+def _chunk_size():
+    return getattr(settings, 'IMPORT_CHUNK_SIZE', 1000)
+
+
+def _max_reported_errors():
+    return getattr(settings, 'IMPORT_MAX_REPORTED_ERRORS', 500)
+
+
+def start_import(user, target, file):
+    job = ImportJob(user=user, target=target)
+    job.file.save(file.name, file, save=False)
+    job.save()
+    queue_import(job)
+    return job
+
+
+def queue_import(job):
+    transaction.on_commit(lambda: _enqueue(job.pk))
+
+
+def _enqueue(job_id):
+    from .tasks import run_import
+
+    try:
+        run_import.delay(job_id)
+    except Exception as exc:
+        logger.exception("Could not queue import job %s", job_id)
+        ImportJob.objects.filter(pk=job_id).update(
+            status='failed', error=f"Could not queue the import: {exc}", finished_at=timezone.now(),
+        )
+
+
+def _notify(job):
+    if job.status == 'done':
+        title = "Your import has finished"
+        message = (
+            f"{job.target}: {job.created_count} created, {job.updated_count} updated, "
+            f"{job.error_count} row(s) skipped."
+        )
+    else:
+        title = "Your import failed"
+        message = f"{job.target} could not be imported: {job.error}"
+    Notification.objects.create(
+        user_id=job.user_id,
+        title=title,
+        message=message,
+        notification_type='system',
+        data={'import_job': job.pk, 'status': job.status},
+    )
+
+
+def _rows(job):
+    with job.file.open('rb') as handle:
+        yield from read_rows(handle, job.file.name)
+
+
+def run(job_id):
+    """Import the job's file; returns the job, or None if it was already claimed."""
+    # Claim the job, so a redelivered task does not run it twice.
+    claimed = ImportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(),
+    )
+    if not claimed:
+        return None
+    job = ImportJob.objects.get(pk=job_id)
+    try:
+        importer = get_importer(job.target)
+        if importer is None:
+            raise ValueError(f"Unknown import target {job.target!r}")
+        total = 0
+        header = None
+        for row in _rows(job):
+            header = header or list(row)
+            total += 1
+        _, ignored = importer.split_columns(header or [])
+        ImportJob.objects.filter(pk=job.pk).update(total_rows=total, ignored_columns=ignored)
+
+        reported = []
+        for chunk in chunked(_rows(job), _chunk_size()):
+            result = importer.import_chunk(chunk)
+            room = _max_reported_errors() - len(reported)
+            if room > 0 and result.errors:
+                reported += [
+                    {'row': number, 'errors': errors}
+                    for number, errors in sorted(result.errors.items())[:room]
+                ]
+            ImportJob.objects.filter(pk=job.pk).update(
+                processed_rows=F('processed_rows') + len(chunk),
+                created_count=F('created_count') + len(result.created),
+                updated_count=F('updated_count') + len(result.updated),
+                error_count=F('error_count') + len(result.errors),
+                errors=reported,
+            )
+        job.refresh_from_db()
+        job.status = 'done'
+    except Exception as exc:
+        logger.exception("Import job %s failed", job_id)
+        job.refresh_from_db()
+        job.status = 'failed'
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    # Only a job still running is finished here: if fail_stale_imports gave up
+    # on it meanwhile, the user was already told it failed.
+    finished = ImportJob.objects.filter(pk=job.pk, status='running').update(
+        status=job.status, error=job.error, finished_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Import job %s finished after it was failed as stale", job_id)
+        job.refresh_from_db()
+        return job
+    _notify(job)
+    return job
+
+
+def fail_stale_imports():
+    """Fail the jobs whose worker died mid-import; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'IMPORT_JOB_TIMEOUT_SECONDS', 3600))
+    failed = 0
+    for job in ImportJob.objects.filter(status='running', started_at__lt=cutoff):
+        # Re-check the status in the UPDATE, in case the job finished meanwhile.
+        if ImportJob.objects.filter(pk=job.pk, status='running').update(
+            status='failed', error="The import did not finish in time.", finished_at=timezone.now(),
+        ):
+            job.refresh_from_db()
+            _notify(job)
+            failed += 1
+    if failed:
+        logger.warning("Failed %s stale import job(s)", failed)
+    return failed
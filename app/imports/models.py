@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db import models
+
+from globalconceptBE.storage import job_file_storage
+
+
+def import_file_upload_to(instance, filename):
+    return f'imports/{instance.user_id}/{filename}'
+
+
+class ImportJob(models.Model):
+    """
+    A CSV/XLSX upload written into one table by the run_import task, in
+    chunks, with progress and the errors of the rows that were skipped.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='import_jobs')
+    target = models.CharField(max_length=100, help_text="Name in app/imports/targets.py")
+    # Uploaded through the web process, read by the Celery worker: shared storage.
+    file = models.FileField(upload_to=import_file_upload_to, storage=job_file_storage)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # [{"row": 12, "errors": {"column": ["message", ...]}}, ...], capped at IMPORT_MAX_REPORTED_ERRORS.
+    errors = models.JSONField(default=list, blank=True)
+    ignored_columns = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, help_text="Why the whole import failed, if it did")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.target} import ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of rows processed."""
+        if self.status == 'done':
+            return 100
+        return int(self.processed_rows * 100 / self.total_rows) if self.total_rows else 0
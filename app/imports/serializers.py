@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+from .models import ImportJob
+from .targets import available_targets
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "target",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "progress",
+            "created_count",
+            "updated_count",
+            "error_count",
+            "errors",
+            "ignored_columns",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class ImportJobCreateSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=[])
+    file = serializers.FileField()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['target'].choices = available_targets()
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(('.csv', '.xlsx')):
+            raise serializers.ValidationError("Upload a .csv or .xlsx file.")
+        return value
@@ -0,0 +1,71 @@
+"""
+The tables that can be imported, by name.
+
+Every model whose admin offers import-export (an import_export ImportMixin
+admin) can be imported as "<app_label>.<model>", e.g. "app.workvisaoffer";
+TARGETS adds importers that need more than the generic one.
+
+The generic importer writes in bulk only when that skips nothing: tables with
+their own save() or save receivers are written row by row (see
+globalconceptBE.imports.writes_row_by_row), except BULK_TARGETS.
+"""
+from django.apps import apps
+from django.contrib import admin
+from import_export.admin import ImportMixin
+
+from definition.roles.models import Roles, generate_custom_id
+from globalconceptBE.imports import ModelImporter
+
+
+class RolesImporter(ModelImporter):
+    """Names only; new roles start inactive, as with the old bulk-create view."""
+
+    def __init__(self):
+        # save() only fills custom_id, done in before_create; the permission
+        # receiver also listens to rows_imported.
+        super().__init__(Roles, fields=('name',), values={'is_active': False}, save_rows=False)
+
+    def before_create(self, objs):
+        for role in objs:
+            role.custom_id = role.custom_id or generate_custom_id()
+
+
+TARGETS = {
+    'definition.roles': RolesImporter,
+}
+
+# Tables with save receivers that are still written in bulk: each receiver
+# that does anything also listens to rows_imported.
+BULK_TARGETS = {
+    'app.workvisaoffer',
+    'app.workvisaofferrequirement',
+    'app.vacationoffer',
+}
+
+
+def _admin_importable(model):
+    model_admin = admin.site._registry.get(model)
+    return isinstance(model_admin, ImportMixin)
+
+
+def available_targets():
+    """Sorted [(name, verbose name)] of every importable table."""
+    names = set(TARGETS)
+    names.update(model._meta.label_lower for model in apps.get_models() if _admin_importable(model))
+    return sorted(
+        ((name, apps.get_model(name)._meta.verbose_name_plural.capitalize()) for name in names),
+        key=lambda item: item[1],
+    )
+
+
+def get_importer(name):
+    """A fresh importer for the named table, or None."""
+    if name in TARGETS:
+        return TARGETS[name]()
+    try:
+        model = apps.get_model(name)
+    except (LookupError, ValueError):
+        return None
+    if not _admin_importable(model):
+        return None
+    return ModelImporter(model, save_rows=False if name in BULK_TARGETS else None)
@@ -0,0 +1,22 @@
+from celery import shared_task
+
+from app.imports import jobs
+
+
+@shared_task
+def run_import(job_id):
+    """
+    Writes an ImportJob's file into its table and notifies its owner.
+    Queued by app/imports/jobs.py::start_import.
+    """
+    job = jobs.run(job_id)
+    return job.status if job else None
+
+
+@shared_task
+def fail_stale_imports():
+    """
+    Fails import jobs left running by a worker that died.
+    Scheduled in CELERY_BEAT_SCHEDULE.
+    """
+    return jobs.fail_stale_imports()
@@ -0,0 +1,37 @@
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+
+from app.views import CustomPagination
+from .jobs import start_import
+from .models import ImportJob
+from .serializers import ImportJobCreateSerializer, ImportJobSerializer
+from .targets import available_targets
+
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Staff imports of CSV/XLSX files into the tables in app/imports/targets.py.
+
+    POST import-jobs/ (multipart: target, file) stores the file and returns
+    202 with the job; a Celery worker imports it in chunks. Poll
+    import-jobs/<id>/ for progress and the per-row errors.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = CustomPagination
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = ImportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = start_import(request.user, serializer.validated_data['target'], serializer.validated_data['file'])
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def targets(self, request):
+        return Response([{'name': name, 'label': label} for name, label in available_targets()])
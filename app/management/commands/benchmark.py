@@ -0,0 +1,90 @@
+"""
+Time the hot API endpoints against a deterministic synthetic dataset.
+
+    python manage.py benchmark                          # small dataset, print timings
+    python manage.py benchmark --size full --save-baseline benchmarks/baseline.json
+    python manage.py benchmark --size full --baseline benchmarks/baseline.json
+
+The command always runs against a throwaway test database (test_<NAME>), never
+the configured one. With --baseline it exits non-zero when any endpoint's
+p50 or p95 regresses by more than --threshold.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.benchmark import fixtures, runner
+
+
+class Command(BaseCommand):
+    help = "Benchmark hot endpoints on synthetic data and compare against a JSON baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", choices=sorted(fixtures.SIZES), default="small")
+        parser.add_argument("--seed", type=int, default=1234)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="*", help="Endpoint names to run (default: all).")
+        parser.add_argument("--save-baseline", metavar="PATH", help="Write results to PATH.")
+        parser.add_argument("--baseline", metavar="PATH", help="Compare results with the baseline at PATH.")
+        parser.add_argument("--threshold", type=float, default=0.20,
+                            help="Allowed slowdown as a fraction (default 0.20 = 20%%).")
+        parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                            help="Ignore regressions smaller than this many milliseconds.")
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Keep the test database (and reuse its data on the next run).")
+
+    def handle(self, *args, **options):
+        names = {name for name, *_ in runner.ENDPOINTS}
+        unknown = set(options["only"] or ()) - names
+        if unknown:
+            raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+        baseline = runner.load(options["baseline"]) if options["baseline"] else None
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            results, dataset = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        data = runner.report(results, dataset)
+        if options["save_baseline"]:
+            runner.save(options["save_baseline"], data)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save_baseline']}"))
+
+        if baseline is not None:
+            if baseline.get("meta", {}).get("dataset", {}).get("size") != dataset["size"]:
+                raise CommandError("Baseline was recorded with a different --size.")
+            regressions = runner.compare(results, baseline, options["threshold"], options["min_delta_ms"])
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(line)
+                raise CommandError(f"{len(regressions)} benchmark regression(s).")
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def _run(self, options):
+        if fixtures.is_seeded():
+            self.stdout.write("Reusing existing benchmark data.")
+            # The kept database may have been seeded with other options (or by
+            # benchmark_ws): report what is there, not what was asked for.
+            dataset = fixtures.describe_seeded()
+        else:
+            dataset = fixtures.seed(options["size"], options["seed"], stdout=self.stdout)
+
+        from account.models import User
+
+        users = {
+            "admin": User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}"),
+            "customer": fixtures.heaviest_customer(),
+        }
+        results = runner.run(
+            users,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            only=options["only"],
+            stdout=self.stdout,
+        )
+        return results, dataset
@@ -0,0 +1,137 @@
+"""
+Load-test the Channels consumers in-process.
+
+    python manage.py benchmark_ws                                   # all scenarios, 100 sockets
+    python manage.py benchmark_ws --scenario chat --connections 1000 --room-size 10 --messages 50
+    python manage.py benchmark_ws --redis redis://localhost:6379/1  # real channel layer
+    python manage.py benchmark_ws --save results.json
+
+Like `benchmark`, it runs against a throwaway test database seeded with the
+synthetic fixtures. The in-memory channel layer is used unless --redis is given.
+"""
+import asyncio
+import contextlib
+import io
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from app.benchmark import fixtures, runner, websocket
+
+SCENARIOS = ["chat", "notifications", "study_comments"]
+
+
+class Command(BaseCommand):
+    help = "Open many WebSockets against the chat, notification and study comment consumers and report latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", nargs="*", choices=SCENARIOS, help="Scenarios to run (default: all).")
+        parser.add_argument("--connections", type=int, default=100, help="Sockets per scenario.")
+        parser.add_argument("--room-size", type=int, default=5, help="Sockets per chat/comment room.")
+        parser.add_argument("--messages", type=int, default=20, help="Messages each sender sends.")
+        parser.add_argument("--timeout", type=float, default=60.0,
+                            help="Seconds to wait for a storm to be delivered.")
+        parser.add_argument("--redis", metavar="URL", help="Use channels_redis at URL instead of the in-memory layer.")
+        parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc memory pass.")
+        parser.add_argument("--save", metavar="PATH", help="Write results as JSON to PATH.")
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["connections"] < 1 or options["room_size"] < 1 or options["messages"] < 1:
+            raise CommandError("--connections, --room-size and --messages must be positive.")
+
+        if options["redis"]:
+            layers = {"default": {
+                "BACKEND": "channels_redis.core.RedisChannelLayer",
+                "CONFIG": {"hosts": [options["redis"]], "capacity": 100_000},
+            }}
+        else:
+            layers = {"default": {
+                "BACKEND": "channels.layers.InMemoryChannelLayer",
+                "CONFIG": {"capacity": 100_000},
+            }}
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            with override_settings(CHANNEL_LAYERS=layers):
+                results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        if options["save"]:
+            runner.save(options["save"], {"options": self._summary(options), "results": results})
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['save']}"))
+
+    def _summary(self, options):
+        keys = ("connections", "room_size", "messages", "redis")
+        return {key: options[key] for key in keys}
+
+    def _run(self, options):
+        rooms = math.ceil(options["connections"] / options["room_size"])
+        if not fixtures.is_seeded():
+            fixtures.seed(counts={
+                "customers": rooms,
+                "transactions": 0,
+                "notifications": rooms * 3,
+                "messages": 0,
+                "applications": rooms,
+            }, stdout=self.stdout)
+
+        from globalconceptBE.asgi import application
+
+        results = {}
+        for name in options["scenario"] or SCENARIOS:
+            scenario = self._scenario(name, rooms)
+            if not scenario.rooms:
+                self.stderr.write(f"{name}: no rooms could be built from the fixtures, skipped.")
+                continue
+            # The consumers print every frame; keep that out of the report.
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(websocket.run_scenario(
+                    application, scenario,
+                    connections=options["connections"],
+                    room_size=options["room_size"],
+                    messages=options["messages"],
+                    timeout=options["timeout"],
+                    memory=not options["no_memory"],
+                ))
+            results[name] = result
+            self.stdout.write(websocket.format_result(name, result))
+        return results
+
+    def _scenario(self, name, rooms):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from account.models import User
+        from app.visa.study.models import StudyVisaApplication
+        from chat.models import ChatSession
+        from notification.models import Notification
+
+        def room(path, user):
+            # The consumers only accept sockets authenticated by a JWT (globalconceptBE/websocket_auth.py).
+            return {"path": f"{path}?token={AccessToken.for_user(user)}", "sender": user.pk}
+
+        bench = f"@{fixtures.EMAIL_DOMAIN}"
+        if name == "chat":
+            sessions = (
+                ChatSession.objects.filter(customer__email__endswith=bench).exclude(agent=None)
+                .select_related("customer")[:rooms]
+            )
+            return websocket.ChatScenario([room(f"/ws/chat/{s.id}/{s.customer_id}/", s.customer) for s in sessions])
+        if name == "study_comments":
+            applications = (
+                StudyVisaApplication.objects.filter(applicant__email__endswith=bench)
+                .select_related("applicant")[:rooms]
+            )
+            return websocket.StudyCommentScenario([
+                room(f"/ws/study/visa-application/{a.id}/", a.applicant) for a in applications
+            ])
+        user_ids = (
+            Notification.objects.filter(user__email__endswith=bench)
+            .values_list("user_id", flat=True).distinct()[:rooms]
+        )
+        users = User.objects.filter(pk__in=list(user_ids))
+        return websocket.NotificationScenario([room("/ws/notifications/", user) for user in users])
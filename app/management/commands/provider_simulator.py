@@ -0,0 +1,85 @@
+"""
+Run the local provider simulator (Amadeus, Flutterwave, PremiumSub/Maskawa).
+
+    python manage.py provider_simulator
+    python manage.py provider_simulator --latency lognormal:180:0.6 --latency amadeus=uniform:400:1200 \
+        --error-rate 0.02 --timeout-rate premiumsub=0.01
+
+Then start the backend with PROVIDER_SIMULATOR_URL=http://127.0.0.1:8765 so
+every provider client calls the simulator instead of the live API.
+
+--latency, --error-rate and --timeout-rate take either a bare value (all
+providers) or PROVIDER=VALUE, and can be repeated; later values win.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmark import providers
+
+
+class Command(BaseCommand):
+    help = "Serve simulated Amadeus, Flutterwave and PremiumSub/Maskawa APIs with injected latency and failures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--seed", type=int, help="Seed the latency/failure RNG for repeatable runs.")
+        parser.add_argument("--latency", action="append", default=[], metavar="[PROVIDER=]SPEC",
+                            help="ms: 120, uniform:50:300, normal:200:40 or lognormal:150:0.5 (median, sigma).")
+        parser.add_argument("--error-rate", action="append", default=[], metavar="[PROVIDER=]RATE",
+                            help="Fraction of requests answered with a provider error (0-1).")
+        parser.add_argument("--timeout-rate", action="append", default=[], metavar="[PROVIDER=]RATE",
+                            help="Fraction of requests that hang for --hang-seconds, then get a 504.")
+        parser.add_argument("--hang-seconds", type=float, default=60.0,
+                            help="How long a timed-out request hangs (longer than the client timeouts).")
+
+    def handle(self, *args, **options):
+        settings = {name: {"latency": "0", "error_rate": 0.0, "timeout_rate": 0.0} for name in providers.PROVIDERS}
+        for key in ("latency", "error_rate", "timeout_rate"):
+            for value in options[key]:
+                for name, parsed in self._parse(key, value):
+                    settings[name][key] = parsed
+
+        try:
+            profiles = {
+                name: providers.Profile(hang_seconds=options["hang_seconds"], **values)
+                for name, values in settings.items()
+            }
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        server = providers.make_server(options["host"], options["port"], profiles, seed=options["seed"])
+        url = f"http://{options['host']}:{options['port']}"
+        for name, profile in profiles.items():
+            self.stdout.write(f"{name:12} {profile.describe()}")
+        self.stdout.write(self.style.SUCCESS(f"Provider simulator listening on {url}"))
+        self.stdout.write(f"Start the backend with PROVIDER_SIMULATOR_URL={url}. Quit with CONTROL-C.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            for name, stats in server.state.stats.items():
+                self.stdout.write(
+                    f"{name:12} {stats['requests']} requests, {stats['errors']} errors, {stats['timeouts']} timeouts"
+                )
+
+    def _parse(self, key, value):
+        name, sep, raw = value.partition("=")
+        if sep:
+            name = providers.ALIASES.get(name.lower(), name.lower())
+            if name not in providers.PROVIDERS:
+                raise CommandError(f"Unknown provider {name!r}; choose from {', '.join(providers.PROVIDERS)}.")
+            names = [name]
+        else:
+            raw, names = value, providers.PROVIDERS
+        if key == "latency":
+            parsed = raw
+        else:
+            try:
+                parsed = float(raw)
+            except ValueError:
+                raise CommandError(f"--{key.replace('_', '-')} expects a number, got {raw!r}.")
+            if not 0 <= parsed <= 1:
+                raise CommandError(f"--{key.replace('_', '-')} must be between 0 and 1.")
+        return [(name, parsed) for name in names]
@@ -0,0 +1,19 @@
+"""
+Recompute the stored CV and offer term vectors used for matching.
+
+    python manage.py rebuild_match_vectors
+
+Run it after bulk imports or after changing the weights or tokenizer in
+app/cv_builder/matching.py; signals keep the vectors current otherwise.
+"""
+from django.core.management.base import BaseCommand
+
+from app.cv_builder import matching
+
+
+class Command(BaseCommand):
+    help = "Rebuild the CV-to-job matching vectors and reset the in-memory indexes."
+
+    def handle(self, *args, **options):
+        cvs, offers = matching.rebuild_vectors()
+        self.stdout.write(f"{cvs} CV vectors and {offers} offer vectors rebuilt")
@@ -0,0 +1,25 @@
+"""
+Recompute the offers' search columns.
+
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --missing-only
+
+Run it after bulk imports or after renaming terms the offers are indexed by
+(institutions, organizations, pilgrimage types); save() covers everything else.
+"""
+from django.core.management.base import BaseCommand
+
+from globalconceptBE import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search columns (and PostgreSQL indexes) of every searchable model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing-only", action="store_true", help="Only index rows never indexed before.")
+
+    def handle(self, *args, **options):
+        for model in search.searchable_models():
+            search.ensure_indexes(model)
+            count = search.reindex(model, only_missing=options["missing_only"])
+            self.stdout.write(f"{model._meta.label}: {count} rows indexed")
@@ -0,0 +1,397 @@
+"""
+Bulk airtime / data disbursement.
+
+Corporate clients send airtime or data to many recipients in one request.
+The flow is:
+  1. Parse + validate every row up front (CSV upload or JSON list).
+  2. Reserve the total amount from the wallet with a single debit.
+  3. Dispatch provider calls concurrently, capped per network provider.
+  4. Record purchases with chunked bulk_create (signals are bypassed on
+     purpose: the wallet has already been debited once for the whole batch).
+  5. Refund every failed row in one ledger entry.
+
+Per-row progress is yielded as dicts so the view can stream it back; steps
+4 and 5 complete even if the client stops reading (see BulkRun).
+"""
+import csv
+import io
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction as db_transaction
+
+from wallet.models import Wallet
+from wallet.transactions.models import WalletTransaction
+from .models import AirtimePurchase, DataPlan, DataPurchase, NetworkProvider
+from .signals import (
+    call_maskawa_api_for_airtime,
+    call_maskawa_api_for_data,
+    handle_provider_response,
+)
+
+logger = logging.getLogger(__name__)
+
+AIRTIME_MIN_AMOUNT = 50
+AIRTIME_MAX_AMOUNT = 20000
+
+
+class BulkValidationError(Exception):
+    """Raised when one or more rows of a bulk request are invalid."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid row(s)")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def read_rows(request):
+    """
+    Return the raw recipient rows from either an uploaded CSV file
+    (multipart field `file`) or a JSON body `{"recipients": [...]}`.
+    """
+    upload = request.FILES.get("file") if hasattr(request, "FILES") else None
+    if upload is not None:
+        decoded = upload.read().decode("utf-8-sig")
+        return [
+            {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            for row in csv.DictReader(io.StringIO(decoded))
+        ]
+    rows = request.data.get("recipients")
+    if not isinstance(rows, list):
+        raise BulkValidationError([{"row": None, "error": "Provide a CSV 'file' or a 'recipients' list."}])
+    return rows
+
+
+def _provider_lookup():
+    """Map both provider ids and provider codes to active NetworkProvider rows (one query)."""
+    lookup = {}
+    for provider in NetworkProvider.objects.filter(active=True):
+        lookup[str(provider.pk)] = provider
+        lookup[provider.value.strip().lower()] = provider
+    return lookup
+
+
+def _resolve_provider(row, providers):
+    key = row.get("provider_id") or row.get("provider") or ""
+    return providers.get(str(key).strip().lower())
+
+
+def _clean_phone(row):
+    phone = str(row.get("phone") or "").strip().replace(" ", "")
+    if not phone.isdigit() or not (10 <= len(phone) <= 15):
+        return None
+    return phone
+
+
+def validate_airtime_rows(rows, user):
+    """
+    Validate every row and build unsaved AirtimePurchase instances.
+    Raises BulkValidationError listing all bad rows so nothing is charged.
+    """
+    max_rows = _setting("AIRTIME_BULK_MAX_ROWS", 1000)
+    if not rows:
+        raise BulkValidationError([{"row": None, "error": "No recipients supplied."}])
+    if len(rows) > max_rows:
+        raise BulkValidationError([{"row": None, "error": f"A bulk request may contain at most {max_rows} recipients."}])
+
+    providers = _provider_lookup()
+    purchases, errors = [], []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": index, "error": "Row must be an object."})
+            continue
+        provider = _resolve_provider(row, providers)
+        phone = _clean_phone(row)
+        try:
+            amount = int(str(row.get("amount", "")).strip())
+        except (TypeError, ValueError):
+            amount = None
+
+        row_errors = []
+        if provider is None:
+            row_errors.append("Unknown or inactive provider.")
+        if phone is None:
+            row_errors.append("Phone must be 10-15 digits.")
+        if amount is None or not (AIRTIME_MIN_AMOUNT <= amount <= AIRTIME_MAX_AMOUNT):
+            row_errors.append(f"Amount must be between {AIRTIME_MIN_AMOUNT} and {AIRTIME_MAX_AMOUNT}.")
+        if row_errors:
+            errors.append({"row": index, "error": " ".join(row_errors)})
+            continue
+        purchases.append(AirtimePurchase(user=user, provider=provider, phone=phone, amount=amount))
+
+    if errors:
+        raise BulkValidationError(errors)
+    return purchases
+
+
+def validate_data_rows(rows, user):
+    """
+    Validate every row and build unsaved DataPurchase instances.
+    The amount is always taken from the plan, never from the client.
+    """
+    max_rows = _setting("AIRTIME_BULK_MAX_ROWS", 1000)
+    if not rows:
+        raise BulkValidationError([{"row": None, "error": "No recipients supplied."}])
+    if len(rows) > max_rows:
+        raise BulkValidationError([{"row": None, "error": f"A bulk request may contain at most {max_rows} recipients."}])
+
+    plan_ids = set()
+    for row in rows:
+        if isinstance(row, dict) and str(row.get("plan_id", "")).strip().isdigit():
+            plan_ids.add(int(str(row["plan_id"]).strip()))
+    plans = DataPlan.objects.select_related("provider").in_bulk(plan_ids)
+
+    purchases, errors = [], []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": index, "error": "Row must be an object."})
+            continue
+        plan_key = str(row.get("plan_id", "")).strip()
+        plan = plans.get(int(plan_key)) if plan_key.isdigit() else None
+        phone = _clean_phone(row)
+
+        row_errors = []
+        if plan is None or not plan.provider.active:
+            row_errors.append("Unknown data plan.")
+        if phone is None:
+            row_errors.append("Phone must be 10-15 digits.")
+        if row_errors:
+            errors.append({"row": index, "error": " ".join(row_errors)})
+            continue
+        purchases.append(
+            DataPurchase(user=user, provider=plan.provider, plan=plan, phone=phone, amount=plan.amount)
+        )
+
+    if errors:
+        raise BulkValidationError(errors)
+    return purchases
+
+
+def reserve_funds(user, total, kind, batch_ref, count):
+    """
+    Debit the whole batch total from the wallet in one ledger entry.
+    Raises ValidationError when the wallet is missing, inactive or short.
+    """
+    try:
+        wallet = Wallet.objects.get(user=user)
+    except Wallet.DoesNotExist:
+        raise ValidationError("Wallet does not exist for the user.")
+    if not wallet.is_active:
+        raise ValidationError("Your wallet is currently inactive. Please contact support.")
+    try:
+        with db_transaction.atomic():
+            # status='successful' makes WalletTransaction.save() debit the
+            # wallet under select_for_update; a short balance rolls back.
+            WalletTransaction.objects.create(
+                user=user,
+                wallet=wallet,
+                transaction_type="payment",
+                amount=total,
+                currency=wallet.currency or "NGN",
+                status="successful",
+                reference=batch_ref,
+                description=f"Bulk {kind} purchase for {count} recipient(s)",
+                meta={"bulk_batch": batch_ref, "kind": kind, "recipients": count},
+            )
+    except ValueError:
+        raise ValidationError(f"Insufficient wallet balance to complete this bulk {kind} purchase.")
+    return wallet
+
+
+def refund_failures(user, wallet, amount, kind, batch_ref, failed_rows):
+    """Credit every failed row back in a single refund entry."""
+    if amount <= 0:
+        return None
+    return WalletTransaction.objects.create(
+        user=user,
+        wallet=wallet,
+        transaction_type="refund",
+        amount=amount,
+        currency=wallet.currency or "NGN",
+        status="successful",
+        reference=f"REFUND-{batch_ref}",
+        description=f"Refund for {len(failed_rows)} failed bulk {kind} recipient(s)",
+        meta={"bulk_batch": batch_ref, "kind": kind, "failed_rows": failed_rows},
+    )
+
+
+def _provider_call(kind):
+    return call_maskawa_api_for_airtime if kind == "airtime" else call_maskawa_api_for_data
+
+
+def _dispatch_one(purchase, kind, api_key, semaphore):
+    """Call the provider for one unsaved purchase; never raises."""
+    label = f"{kind} purchase" if kind == "airtime" else "data plan purchase"
+    with semaphore:
+        try:
+            response = _provider_call(kind)(purchase, api_key)
+            handle_provider_response(purchase, response, label)
+        except ValidationError as exc:
+            purchase.completed = False
+            purchase.status_message = "; ".join(exc.messages)[:1024]
+        except Exception as exc:  # network / parsing errors must not kill the batch
+            logger.exception("Bulk %s dispatch failed for %s", kind, purchase.phone)
+            purchase.completed = False
+            purchase.status_message = str(exc)[:1024]
+    return purchase
+
+
+class BulkRun:
+    """
+    Dispatch every purchase concurrently; iterating yields per-row progress
+    dicts and then a summary dict.
+
+    Results are persisted with chunked bulk_create and failures are refunded
+    once at the end. That end does not depend on the caller reading
+    everything: the view streams this to the client, and when the response is
+    closed early (client gone, worker timeout) Django calls close(), which
+    still records every dispatched row and refunds the failed ones. A batch
+    closed before it started sends nothing and refunds everything.
+
+    Nor does the refund depend on the writes: a chunk the database rejects is
+    retried row by row, and a row that still cannot be written is logged with
+    what is needed to reconcile it.
+    """
+
+    NOT_SENT = "Not sent: the request was closed before dispatch."
+
+    def __init__(self, user, purchases, kind, batch_ref, wallet):
+        self.user = user
+        self.purchases = purchases
+        self.kind = kind
+        self.batch_ref = batch_ref
+        self.wallet = wallet
+        self.model = AirtimePurchase if kind == "airtime" else DataPurchase
+        self.chunk_size = _setting("AIRTIME_BULK_CHUNK_SIZE", 100)
+        self.row_of = {id(p): index for index, p in enumerate(purchases, start=1)}
+        self.pending, self.failed_rows = [], []
+        self.refund_total = Decimal("0")
+        self.succeeded = 0
+        self.started = self.finished = False
+        self._events = self._run()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        if not self.started:
+            self.started = True
+            for purchase in self.purchases:
+                purchase.completed = False
+                purchase.status_message = self.NOT_SENT
+                self._record(purchase)
+            self._finish()
+        self._events.close()
+
+    def _record(self, purchase):
+        if purchase.completed:
+            self.succeeded += 1
+        else:
+            self.refund_total += Decimal(str(purchase.amount))
+            self.failed_rows.append(self.row_of[id(purchase)])
+        self.pending.append(purchase)
+        if len(self.pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        rows, self.pending = self.pending, []
+        if not rows:
+            return
+        try:
+            with db_transaction.atomic():
+                self.model.objects.bulk_create(rows)
+            return
+        except DatabaseError:
+            logger.exception("Bulk %s %s: writing a chunk failed, retrying row by row", self.kind, self.batch_ref)
+        for purchase in rows:
+            try:
+                with db_transaction.atomic():
+                    self.model.objects.bulk_create([purchase])
+            except DatabaseError:
+                logger.exception(
+                    "Bulk %s %s: could not record row %s (phone %s, amount %s, completed %s, external_ref %s)",
+                    self.kind, self.batch_ref, self.row_of[id(purchase)], purchase.phone, purchase.amount,
+                    purchase.completed, purchase.external_ref,
+                )
+
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        try:
+            self._flush()
+        finally:
+            refund_failures(
+                self.user, self.wallet, self.refund_total, self.kind, self.batch_ref, sorted(self.failed_rows))
+            logger.info(
+                "Bulk %s %s finished: %s ok, %s failed, refunded %s",
+                self.kind, self.batch_ref, self.succeeded, len(self.failed_rows), self.refund_total,
+            )
+
+    def _run(self):
+        self.started = True
+        api_key = getattr(settings, "MASKAWA_API_KEY", None)
+        per_provider = _setting("AIRTIME_BULK_PROVIDER_CONCURRENCY", 4)
+        max_workers = _setting("AIRTIME_BULK_MAX_WORKERS", 16)
+
+        semaphores = {}
+        for purchase in self.purchases:
+            semaphores.setdefault(purchase.provider_id, threading.BoundedSemaphore(per_provider))
+
+        futures, seen = [], set()
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(self.purchases))) as pool:
+                futures = [
+                    pool.submit(_dispatch_one, p, self.kind, api_key, semaphores[p.provider_id])
+                    for p in self.purchases
+                ]
+                for future in as_completed(futures):
+                    seen.add(future)
+                    purchase = future.result()
+                    self._record(purchase)
+                    yield {
+                        "row": self.row_of[id(purchase)],
+                        "phone": purchase.phone,
+                        "amount": purchase.amount,
+                        "status": "successful" if purchase.completed else "failed",
+                        "external_ref": purchase.external_ref,
+                        "message": "" if purchase.completed else purchase.status_message,
+                    }
+        finally:
+            try:
+                # Closed mid-stream: leaving the executor waited for every call
+                # already submitted, so record the rows nobody read yet.
+                for future in futures:
+                    if future not in seen:
+                        self._record(future.result())
+            finally:
+                self._finish()
+
+        yield {
+            "summary": True,
+            "reference": self.batch_ref,
+            "total": len(self.purchases),
+            "successful": self.succeeded,
+            "failed": len(self.failed_rows),
+            "refunded_amount": str(self.refund_total),
+        }
+
+
+def run_bulk(user, purchases, kind, batch_ref, wallet):
+    """A BulkRun over `purchases`; see BulkRun."""
+    return BulkRun(user, purchases, kind, batch_ref, wallet)
+
+
+def new_batch_reference(kind):
+    return f"bulk-{kind}-{uuid.uuid4().hex[:16]}"
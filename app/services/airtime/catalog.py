@@ -0,0 +1,133 @@
+"""
+Data plan catalog: idempotent seeding and a cached read model.
+
+`sync_default_data_plans` diffs the bundled plan list against the DB and
+applies one bulk upsert, skipping all work when the content checksum matches
+the last applied version.
+
+`get_catalog` serves the providers/plans catalog from an in-process copy that
+is rebuilt only when the shared cache version key changes. Any DataPlan or
+NetworkProvider write bumps that key (see signals.py).
+"""
+import hashlib
+import json
+import logging
+import threading
+
+from django.db import transaction as db_transaction
+
+from globalconceptBE.cache_versions import bump, current_version
+
+from .models import DataPlan, DataPlanCatalogVersion, NetworkProvider
+
+logger = logging.getLogger(__name__)
+
+CATALOG_NAME = "default_data_plans"
+CATALOG_VERSION_KEY = "airtime:data_plan_catalog:version"
+UPSERT_FIELDS = ["provider", "label", "category", "data", "amount", "api_platform_id"]
+
+_local = {"version": None, "catalog": None}
+_lock = threading.Lock()
+
+
+def _checksum(plans, providers):
+    payload = {
+        "plans": plans,
+        "providers": sorted((label, pk) for label, pk in providers.items()),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def sync_default_data_plans(plans):
+    """
+    Upsert `plans` (DEFAULT_DATA_PLANS format) in a single statement.
+    Returns the number of plans written, or 0 when nothing changed.
+    """
+    providers = {
+        p.label.strip().lower(): p.pk for p in NetworkProvider.objects.only("pk", "label")
+    }
+    checksum = _checksum(plans, providers)
+    current = DataPlanCatalogVersion.objects.filter(name=CATALOG_NAME).values_list("checksum", flat=True).first()
+    if current == checksum:
+        return 0
+
+    existing = {
+        row["value"]: row
+        for row in DataPlan.objects.values("value", "provider_id", *UPSERT_FIELDS[1:])
+    }
+    changed = []
+    for plan in plans:
+        provider_id = providers.get(plan["provider_label"].strip().lower())
+        if not provider_id:
+            continue
+        wanted = {
+            "provider_id": provider_id,
+            "label": plan["label"],
+            "category": plan["category"],
+            "data": plan["data"],
+            "amount": plan["amount"],
+            "api_platform_id": plan.get("id") or 0,
+        }
+        row = existing.get(plan["value"])
+        if row and all(row[k] == v for k, v in wanted.items()):
+            continue
+        changed.append(DataPlan(value=plan["value"], **wanted))
+
+    with db_transaction.atomic():
+        if changed:
+            DataPlan.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["value"],
+                update_fields=UPSERT_FIELDS,
+            )
+        DataPlanCatalogVersion.objects.update_or_create(
+            name=CATALOG_NAME, defaults={"checksum": checksum}
+        )
+    if changed:
+        # bulk_create skips post_save, so invalidate explicitly (once committed).
+        db_transaction.on_commit(invalidate_catalog)
+        logger.info("Data plan catalog synced: %s plan(s) upserted", len(changed))
+    return len(changed)
+
+
+def invalidate_catalog():
+    """Bump the shared version so every process rebuilds its local copy."""
+    bump(CATALOG_VERSION_KEY)
+
+
+def _build_catalog():
+    from .serializers import DataPlanSerializer, NetworkProviderSerializer
+
+    plans = list(DataPlan.objects.select_related("provider").filter(provider__active=True))
+    providers, grouped = {}, {}
+    for plan in plans:
+        providers.setdefault(plan.provider_id, plan.provider)
+        grouped.setdefault(plan.provider_id, []).append(plan)
+
+    providers_data = NetworkProviderSerializer(list(providers.values()), many=True).data
+    catalog = {
+        "providers": [dict(p) for p in providers_data],
+        "plans": {
+            str(provider_id): [dict(p) for p in DataPlanSerializer(items, many=True).data]
+            for provider_id, items in grouped.items()
+        },
+    }
+    body = json.dumps(catalog, sort_keys=True, default=str).encode()
+    catalog["etag"] = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return catalog
+
+
+def get_catalog():
+    """
+    Return {"providers": [...], "plans": {provider_id: [...]}, "etag": ...}.
+    Costs one cache lookup when warm; rebuilds from the DB once per version.
+    """
+    version = current_version(CATALOG_VERSION_KEY)
+    if _local["version"] == version and _local["catalog"] is not None:
+        return _local["catalog"]
+    with _lock:
+        if _local["version"] != version or _local["catalog"] is None:
+            _local["catalog"] = _build_catalog()
+            _local["version"] = version
+        return _local["catalog"]
@@ -211,4 +211,18 @@ class DataPurchase(models.Model):
         )
 
 
+class DataPlanCatalogVersion(models.Model):
+    """
+    Checksum of the last seeded data plan catalog, so post_migrate can skip
+    re-seeding when the bundled plan list has not changed.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    checksum = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        verbose_name = "Data Plan Catalog Version"
+        verbose_name_plural = "Data Plan Catalog Versions"
+
+    def __str__(self):
+        return f"{self.name} @ {self.checksum[:12]}"
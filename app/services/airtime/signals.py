@@ -1,4 +1,4 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
 from decimal import Decimal
@@ -12,6 +12,10 @@ import json
 
 from django.db.models.signals import post_migrate
 from app.services.airtime.models import DataPlan, NetworkProvider
+from app.services.airtime.catalog import invalidate_catalog, sync_default_data_plans
+from globalconceptBE.on_commit import run_once_on_commit
+
+PREMIUMSUB_BASE_URL = f"{getattr(settings, 'PREMIUMSUB_API_BASE_URL', 'https://premiumsub.com.ng')}/api"
 
 # Updated DEFAULT_DATA_PLANS with support for api_platform_id for data plans
 DEFAULT_DATA_PLANS = [
@@ -267,25 +271,20 @@ DEFAULT_DATA_PLANS = [
 @receiver(post_migrate)
 def ensure_minimum_data_plans(sender, **kwargs):
     """
-    Ensure some example DataPlan objects exist per provider (dev/test use).
-    Set api_platform_id to the plan "id" if present.
+    Ensure the DEFAULT_DATA_PLANS catalog exists per provider (dev/test use).
+    Set api_platform_id to the plan "id" if present. The sync is a single
+    bulk upsert and is skipped entirely while the catalog checksum is unchanged.
     """
-    for plan in DEFAULT_DATA_PLANS:
-        provider_obj = NetworkProvider.objects.filter(
-            label__iexact=plan["provider_label"]).first()
-        if provider_obj:
-            DataPlan.objects.get_or_create(
-                provider=provider_obj,
-                value=plan["value"],
-                defaults={
-                    "label": plan["label"],
-                    "category": plan["category"],
-                    "data": plan["data"],
-                    "amount": plan["amount"],
-                    # Set the data platform id here
-                    "api_platform_id": plan.get("id"),
-                }
-            )
+    if sender.name != 'app':
+        return
+    sync_default_data_plans(DEFAULT_DATA_PLANS)
+
+
+@receiver([post_save, post_delete], sender=DataPlan)
+@receiver([post_save, post_delete], sender=NetworkProvider)
+def invalidate_data_plan_catalog(sender, **kwargs):
+    # After commit: a rebuild before that would cache the old plans under the new version.
+    run_once_on_commit(invalidate_catalog)
 
 
 def get_wallet_and_validate_balance(user, amount, purchase_type="purchase"):
@@ -321,7 +320,7 @@ def call_maskawa_api_for_airtime(instance, api_key):
         "airtime_type": "VTU",
     }
     payload = json.dumps(payload_dict)
-    url = "https://premiumsub.com.ng/api/topup/"
+    url = f"{PREMIUMSUB_BASE_URL}/topup/"
     headers = {
         "Authorization": f"Token {api_key}",
         "Content-Type": "application/json"
@@ -353,7 +352,7 @@ def call_maskawa_api_for_data(instance, api_key):
         raise ValidationError(
             "Cannot determine plan id for API (api_platform_id not set on DataPlan)")
 
-    url = "https://premiumsub.com.ng/api/data/"
+    url = f"{PREMIUMSUB_BASE_URL}/data/"
     # Adapt prompt structure: assign network_id and plan_id directly (not as strings), Ported_number True, no datatype/data
     # Set phone from the instance
     payload = json.dumps({
@@ -413,7 +412,7 @@ def handle_provider_response(instance, response, purchase_type="purchase"):
         raise ValidationError(
             f"Provider did not return a valid reference for this {purchase_type}.")
     instance.external_ref = provider_ref
-    instance.status_message = str(maskawa_resp)
+    instance.status_message = str(maskawa_resp)[:1024]
     instance.completed = True
 
 
@@ -9,10 +9,64 @@ from .serializers import (
     DataPlanSerializer,
     DataPurchaseSerializer,
 )
+import json
 import requests
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import action
 
+from . import bulk
+from .catalog import get_catalog
+from globalconceptBE.etags import etag_response
+
+
+class _NDJSONStream:
+    """One JSON line per event; closing the response closes `events`."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def __iter__(self):
+        for event in self.events:
+            yield json.dumps(event, default=str) + "\n"
+
+    def close(self):
+        self.events.close()
+
+
+def _bulk_purchase_response(request, kind, validate_rows):
+    """
+    Shared handler for the bulk airtime/data endpoints.
+    Validation and the wallet reservation happen before streaming starts so
+    they can still fail with a normal 400; afterwards each finished row is
+    streamed back as one JSON line (application/x-ndjson).
+    """
+    if not getattr(settings, "MASKAWA_API_KEY", None):
+        return Response(
+            {"detail": "No API key configured for Maskawa provider."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        purchases = validate_rows(bulk.read_rows(request), request.user)
+    except bulk.BulkValidationError as exc:
+        return Response({"errors": exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+    except (UnicodeDecodeError, ValueError):
+        return Response({"detail": "Could not read the uploaded file."}, status=status.HTTP_400_BAD_REQUEST)
+
+    total = sum(p.amount for p in purchases)
+    batch_ref = bulk.new_batch_reference(kind)
+    try:
+        wallet = bulk.reserve_funds(request.user, total, kind, batch_ref, len(purchases))
+    except ValidationError as exc:
+        return Response({"detail": "; ".join(exc.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+    run = bulk.run_bulk(request.user, purchases, kind, batch_ref, wallet)
+    response = StreamingHttpResponse(_NDJSONStream(run), content_type="application/x-ndjson")
+    response["X-Bulk-Reference"] = batch_ref
+    return response
+
+
 class NetworkProviderViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows network providers to be viewed.
@@ -55,6 +109,16 @@ class AirtimePurchaseViewSet(viewsets.ModelViewSet):
         headers_out = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers_out)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_purchase(self, request):
+        """
+        Send airtime to many recipients at once.
+        Body: CSV `file` (columns: provider, phone, amount) or
+        JSON {"recipients": [{"provider_id" | "provider", "phone", "amount"}, ...]}.
+        Streams one JSON line per recipient, then a summary line.
+        """
+        return _bulk_purchase_response(request, "airtime", bulk.validate_airtime_rows)
+
 
 class DataPlanViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -77,11 +141,23 @@ class DataPlanViewSet(viewsets.ReadOnlyModelViewSet):
     def providers_with_plans(self, request):
         """
         Returns a list of providers that have at least one data plan.
+        Served from the cached catalog; honours If-None-Match.
+        """
+        data = get_catalog()
+        return etag_response(request, data["providers"], data["etag"])
+
+    @action(detail=False, methods=["get"], url_path="catalog", permission_classes=[permissions.AllowAny])
+    def catalog(self, request):
+        """
+        Returns every active provider with its data plans grouped by provider id.
+        Served from the cached catalog; honours If-None-Match.
         """
-        provider_ids = DataPlan.objects.values_list("provider_id", flat=True).distinct()
-        providers = NetworkProvider.objects.filter(id__in=provider_ids, active=True)
-        serializer = NetworkProviderSerializer(providers, many=True)
-        return Response(serializer.data)
+        data = get_catalog()
+        return etag_response(
+            request,
+            {"providers": data["providers"], "plans": data["plans"]},
+            data["etag"],
+        )
 
 class DataPurchaseViewSet(viewsets.ModelViewSet):
     """
@@ -114,3 +190,13 @@ class DataPurchaseViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         headers_out = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers_out)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_purchase(self, request):
+        """
+        Send data plans to many recipients at once.
+        Body: CSV `file` (columns: plan_id, phone) or
+        JSON {"recipients": [{"plan_id", "phone"}, ...]}.
+        Streams one JSON line per recipient, then a summary line.
+        """
+        return _bulk_purchase_response(request, "data", bulk.validate_data_rows)
@@ -1,3 +1,1407 @@
-from django.test import TestCase
+"""
+Regression tests for the hot endpoints.
 
-# Create your tests here.
+QueryBudgetTests:
+Each endpoint is requested against a small synthetic dataset, the dataset is
+grown several times over, and the endpoint is requested again. The number of
+queries must be the same at both sizes (so a per-row query fails immediately)
+and must stay within the endpoint's budget.
+
+PrefetchTests: serializer-declared select/prefetch_related
+(globalconceptBE/prefetch.py) and the warning for undeclared relations.
+
+QueryMetricsTests: SQL instrumentation (globalconceptBE/query_metrics.py)
+for requests and consumer messages.
+
+OfferSearchTests: the ?q= full-text search shared by the offer viewsets, on
+the portable (non-PostgreSQL) backend.
+
+OfferFacetTests: ?facets=true counts on the work and vacation offer lists.
+
+KeysetPaginationTests: ?cursor= paging (app/views.py) through tied
+timestamps, back and forth, at page boundaries and with bad cursors.
+
+DataPlanCatalogTests: checksum-skipped seeding and the cached, ETag-served
+data plan catalog (app/services/airtime/catalog.py).
+
+BulkPurchaseTests: bulk airtime (app/services/airtime/bulk.py) reserves the
+batch total once, records every row and refunds failures, also when the
+stream is closed early.
+
+MatchingTests: CV-to-offer ranking (app/cv_builder/matching.py), with the
+vectors kept current by signals and the in-memory index following them.
+
+CVRenderTests: background CV rendering keyed by content hash
+(app/cv_builder/rendering.py), with Celery run eagerly.
+
+CVProfileUpdateTests: nested CV sections are diffed and written in bulk, in
+the same number of queries however long the CV.
+
+ExportTests: streamed CSV exports, and background export jobs for large or
+XLSX exports (app/exports).
+
+ImportTests: background import jobs (app/imports) writing CSV/XLSX uploads in
+chunks, with per-row errors and a fixed number of queries per chunk.
+
+WebSocketAuthTests: visa comment sockets authenticated by JWT at connect
+(globalconceptBE/websocket_auth.py), with messages authorized from the scope.
+
+BenchmarkDatasetTests: `benchmark --keepdb` reports the rows actually seeded.
+
+WebSocketBenchmarkTests: the benchmark_ws harness connects with tokens.
+"""
+import base64
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DataError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.client.models import Client
+from account.models import User
+from notification.models import Notification
+from wallet.models import Wallet
+from wallet.transactions.models import WalletTransaction
+from globalconceptBE.celery import app as celery_app
+from app import routings as app_routings
+from app.benchmark import fixtures, websocket as websocket_benchmark
+from app.cv_builder import matching, rendering
+from app.cv_builder.models import CVMatchVector, CVProfile, CVRender, OfferMatchVector
+from app.cv_builder.serializers import CVProfileSerializer
+from app.exports import jobs as export_jobs, tasks as export_tasks
+from app.exports.models import ExportJob
+from app.services.airtime import bulk, catalog
+from app.views import CursorOnlyPagination, KeysetPagination
+from app.services.airtime.models import AirtimePurchase, DataPlan, NetworkProvider
+from app.services.airtime.signals import handle_provider_response
+from app.hotels.models import HotelBooking
+from app.imports import jobs as import_jobs, tasks as import_tasks
+from app.imports.models import ImportJob
+from app.imports.targets import get_importer
+from app.management.commands import benchmark_ws
+from app.visa.pilgrimage.offer.models import PilgrimageVisaApplication, PilgrimageVisaApplicationComment
+from app.visa.study.institutions.models import CourseOfStudy, Institution, ProgramType
+from app.visa.study.models import StudyVisaApplication, StudyVisaApplicationComment
+from app.visa.study.offers.models import StudyVisaOffer
+from app.visa.vacation.offer.models import VacationOffer, VacationVisaApplication, VacationVisaApplicationComment
+from app.visa.work.offers.models import (
+    WorkVisaApplication,
+    WorkVisaApplicationComment,
+    WorkVisaOffer,
+    WorkVisaOfferRequirement,
+)
+from app.visa.work.organization.models import WorkOrganization
+from definition.models import TableDropDownDefinition
+from definition.roles.models import Roles
+from globalconceptBE.exports import write_csv, write_xlsx
+from globalconceptBE import query_metrics
+from globalconceptBE.imports import chunked
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin, optimize_queryset, related_paths
+from globalconceptBE.websocket_auth import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED, ROOM_SOURCES, JWTAuthMiddleware
+
+# The small dataset fits on one page of every list; the growth fills pages.
+SMALL = {"customers": 3, "transactions": 6, "notifications": 5, "messages": 5, "applications": 3}
+GROWTH = {"customers": 6, "transactions": 150, "notifications": 45, "messages": 45, "applications": 30}
+
+# (application model, comment model, comment list url name)
+COMMENT_ROUTES = [
+    (StudyVisaApplication, StudyVisaApplicationComment,
+     "studyvisaapplicationcomment-study-visa-application-comments-by-visa-id"),
+    (WorkVisaApplication, WorkVisaApplicationComment,
+     "workvisaapplicationcomment-work-visa-application-comments-by-visa-id"),
+    (VacationVisaApplication, VacationVisaApplicationComment,
+     "vacationvisaapplicationcomment-vacation-visa-application-comments-by-visa-id"),
+    (PilgrimageVisaApplication, PilgrimageVisaApplicationComment,
+     "pilgrimageapplicationcomment-pilgrimage-visa-application-comments-by-visa-id"),
+]
+
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts=SMALL, seed_value=1)
+        cls.admin = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").order_by("id").first()
+
+    def setUp(self):
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+        self.customer_client = APIClient()
+        self.customer_client.force_authenticate(self.customer)
+
+    def _grow(self):
+        # New rows are spread over every bench client, the fixed customer included.
+        fixtures.seed(counts=GROWTH, seed_value=2)
+
+    def _count(self, client, url):
+        # Warm the per-process caches (definition registry etc.) first.
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, f"{url}: {response.status_code}")
+        return len(queries)
+
+    def assertQueryBudget(self, client, url, budget):
+        before = self._count(client, url)
+        self._grow()
+        after = self._count(client, url)
+        self.assertEqual(
+            before, after,
+            f"{url} issued {before} queries on the small dataset and {after} on the larger one",
+        )
+        self.assertLessEqual(after, budget, f"{url} issued {after} queries (budget {budget})")
+
+    def test_customer_dashboard(self):
+        self.assertQueryBudget(self.customer_client, reverse("customer_dashboard"), 0)
+
+    def test_admin_dashboard_analytics(self):
+        self.assertQueryBudget(self.admin_client, reverse("admin_dashboard_analytics"), 83)
+
+    def test_user_list(self):
+        self.assertQueryBudget(self.admin_client, reverse("user-list"), 3)
+
+    def test_wallet_transactions_customer(self):
+        self.assertQueryBudget(self.customer_client, reverse("wallet-transaction-list"), 2)
+
+    def test_wallet_transactions_admin(self):
+        self.assertQueryBudget(self.admin_client, reverse("wallet-transaction-list"), 2)
+
+    def test_study_applications(self):
+        self.assertQueryBudget(self.admin_client, reverse("studyvisaapplication-list"), 2)
+
+    def test_work_applications(self):
+        self.assertQueryBudget(self.admin_client, reverse("workvisaapplication-list"), 4)
+
+    def test_vacation_applications(self):
+        self.assertQueryBudget(self.admin_client, reverse("vacationapplication-list"), 2)
+
+    def test_pilgrimage_applications(self):
+        self.assertQueryBudget(self.admin_client, reverse("pilgrimageapplication-list"), 3)
+
+    def test_comment_lists_by_application(self):
+        for application_model, comment_model, url_name in COMMENT_ROUTES:
+            with self.subTest(url_name=url_name):
+                application = application_model.objects.order_by("pk").first()
+                url = reverse(url_name, kwargs={"visa_application_id": application.pk})
+                self._add_comments(comment_model, application, 3)
+                before = self._count(self.admin_client, url)
+                self._add_comments(comment_model, application, 27)
+                after = self._count(self.admin_client, url)
+                self.assertEqual(before, after, f"{url}: {before} vs {after} queries")
+                self.assertLessEqual(after, 2, f"{url} issued {after} queries (budget 2)")
+
+    def _add_comments(self, comment_model, application, count):
+        comment_model.objects.bulk_create([
+            comment_model(
+                visa_application=application,
+                applicant=self.customer if i % 2 else None,
+                admin=None if i % 2 else self.admin,
+                text=f"Comment {i}",
+            )
+            for i in range(count)
+        ])
+
+
+class _InstitutionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Institution
+        fields = ["id", "name", "program_types"]
+        prefetch_related = ("program_types",)
+
+
+class _CommentSerializer(serializers.ModelSerializer):
+    applicant_email = serializers.CharField(source="applicant.email", read_only=True)
+
+    class Meta:
+        model = StudyVisaApplicationComment
+        fields = ["id", "text", "applicant_email"]
+
+
+class _ApplicationSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
+    institution = _InstitutionSerializer(read_only=True)
+    comments = _CommentSerializer(many=True, read_only=True)
+    offer_title = serializers.CharField(source="study_visa_offer.offer_title", read_only=True)
+    offer_institution = serializers.CharField(source="study_visa_offer.institution.name", read_only=True)
+    passport_number = serializers.CharField(write_only=True)
+
+    class Meta:
+        model = StudyVisaApplication
+        fields = ["id", "status", "institution", "comments", "offer_title", "offer_institution", "passport_number"]
+        select_related = ("applicant",)
+
+
+class PrefetchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 2, "transactions": 0, "notifications": 0, "messages": 0, "applications": 4})
+        program = ProgramType.objects.create(name="Masters")
+        institution = Institution.objects.create(name="Aalto University", country="FI", city="Espoo")
+        institution.program_types.add(program)
+        course = CourseOfStudy.objects.create(name="Data Science", institution=institution, program_type=program)
+        offer = StudyVisaOffer.objects.create(
+            institution=institution, course_of_study=course, program_type=program, offer_title="Data Science MSc")
+        StudyVisaApplication.objects.update(institution=institution, study_visa_offer=offer)
+        StudyVisaApplicationComment.objects.bulk_create(
+            StudyVisaApplicationComment(visa_application=application, applicant_id=application.applicant_id, text="hi")
+            for application in StudyVisaApplication.objects.all() for _ in range(2)
+        )
+
+    def test_paths_merge_meta_nested_and_dotted_sources(self):
+        select, prefetch = related_paths(_ApplicationSerializer)
+        self.assertEqual(select, ("applicant", "institution", "study_visa_offer", "study_visa_offer__institution"))
+        self.assertEqual(prefetch, ("institution__program_types", "comments", "comments__applicant"))
+
+    def test_optimized_list_queries_do_not_grow_with_rows(self):
+        queryset = optimize_queryset(StudyVisaApplication.objects.order_by("id"), _ApplicationSerializer)
+
+        def queries(rows):
+            with CaptureQueriesContext(connection) as captured:
+                data = _ApplicationSerializer(queryset[:rows], many=True).data
+            self.assertEqual(len(data), rows)
+            return len(captured)
+
+        self.assertEqual(queries(1), queries(4))
+
+    @override_settings(PREFETCH_WARNINGS=True)
+    def test_undeclared_relations_are_logged_once(self):
+        with self.assertLogs("globalconceptBE.prefetch", "WARNING") as logs:
+            _ApplicationSerializer(StudyVisaApplication.objects.all(), many=True).data
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("_ApplicationSerializer", logs.output[0])
+
+        with self.assertNoLogs("globalconceptBE.prefetch", "WARNING"):
+            _ApplicationSerializer(
+                optimize_queryset(StudyVisaApplication.objects.all(), _ApplicationSerializer), many=True).data
+
+
+class QueryMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 6, "notifications": 0, "messages": 0, "applications": 1})
+        cls.admin = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse("wallet-transaction-list")
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            query_metrics.fingerprint("SELECT * FROM t WHERE a = 'x''y' AND b = 12.5\n AND c IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)",
+        )
+        self.assertEqual(query_metrics.fingerprint('SELECT "t"."id" FROM "t" WHERE "t"."id" = 7'),
+                         query_metrics.fingerprint('SELECT "t"."id" FROM "t" WHERE "t"."id" = 42'))
+
+    def test_only_queries_inside_a_recorder_are_counted(self):
+        query_metrics.install()
+        query_metrics.install()
+        self.assertEqual(connection.execute_wrappers.count(query_metrics._execute_wrapper), 1)
+        User.objects.count()
+        with query_metrics.QueryRecorder("test") as recorder:
+            for _ in range(3):
+                User.objects.filter(pk=self.admin.pk).exists()
+        User.objects.count()
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates(3), [(next(iter(recorder.fingerprints)), 3)])
+
+    def test_headers_for_staff_who_ask_only(self):
+        self.client.force_authenticate(self.admin)
+        self.assertNotIn("X-DB-Queries", self.client.get(self.url))
+        response = self.client.get(self.url, HTTP_X_DEBUG_SQL="1")
+        self.assertGreater(int(response["X-DB-Queries"]), 0)
+        self.assertIn(f'desc="{response["X-DB-Queries"]} queries"', response["Server-Timing"])
+
+        self.client.force_authenticate(self.customer)
+        self.assertNotIn("X-DB-Queries", self.client.get(self.url, HTTP_X_DEBUG_SQL="1"))
+
+    @override_settings(SQL_INSTRUMENTATION=True, SQL_SLOW_REQUEST_MS=0, SQL_NPLUSONE_THRESHOLD=1)
+    def test_instrumentation_on_logs_slow_requests_and_repeats(self):
+        self.client.force_authenticate(self.customer)
+        with self.assertLogs("globalconceptBE.query_metrics", "WARNING") as logs:
+            response = self.client.get(self.url)
+        self.assertIn("X-DB-Queries", response)
+        self.assertTrue(any("Slow GET wallet-transaction-list" in line for line in logs.output))
+        self.assertTrue(any("Possible N+1 in GET wallet-transaction-list" in line for line in logs.output))
+
+    @override_settings(SQL_INSTRUMENTATION=True)
+    def test_consumer_messages_count_queries_from_sync_threads(self):
+        from globalconceptBE.asgi import application
+
+        visa_application = WorkVisaApplication.objects.select_related("client").first()
+
+        async def run():
+            path = f"/ws/work/visa-application/{visa_application.pk}/?token={AccessToken.for_user(visa_application.client)}"
+            communicator = WebsocketCommunicator(application, path)
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.receive_json_from()
+            await communicator.send_json_to({"action": "send_comment", "text": "Hello"})
+            await communicator.receive_json_from()
+            await communicator.disconnect()
+
+        with self.assertLogs("globalconceptBE.query_metrics", "DEBUG") as logs:
+            async_to_sync(run)()
+        received = [line for line in logs.output if "WorkVisaCommentConsumer.websocket.receive:" in line]
+        self.assertEqual(len(received), 1)
+        self.assertNotIn(": 0 queries", received[0])
+
+
+class OfferSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.safari = VacationOffer.objects.create(
+            title="Serengeti Safari", description="Game drives and a balloon ride", destination="TZ",
+            start_date="2025-01-01", end_date="2025-01-08", price=900,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _search(self, url_name, q):
+        response = self.client.get(reverse(url_name), {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_matches_every_word_across_fields(self):
+        self.assertEqual(self._search("vacation-offer-list", "safari balloon"), [self.safari.pk])
+        self.assertEqual(self._search("vacation-offer-list", "safari bench"), [])
+
+    def test_matches_country_name(self):
+        self.assertEqual(self._search("vacation-offer-list", "tanzania"), [self.safari.pk])
+
+    def test_save_refreshes_document(self):
+        self.safari.title = "Kilimanjaro Trek"
+        self.safari.save()
+        self.assertEqual(self._search("vacation-offer-list", "safari"), [])
+        self.assertEqual(self._search("vacation-offer-list", "kilimanjaro"), [self.safari.pk])
+
+    def test_work_offers_support_q(self):
+        response = self.client.get(reverse("workvisaoffers-list"), {"q": "bench organization"})
+        self.assertEqual(response.json()["count"], 20)
+        self.assertEqual(self._search("workvisaoffers-list", "no-such-job"), [])
+
+    def test_legacy_search_param_still_works(self):
+        response = self.client.get(reverse("vacation-offer-list"), {"search": "serengeti"})
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.safari.pk])
+
+
+class OfferFacetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = APIClient()
+
+    def _facets(self, url_name, **params):
+        response = self.client.get(reverse(url_name), {"facets": "true", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["facets"]
+
+    def test_counts_follow_the_filter_set(self):
+        facets = self._facets("workvisaoffers-list")
+        self.assertEqual(facets["country"], [{"value": "GB", "label": "United Kingdom", "count": 20}])
+        self.assertEqual(facets["salary"], [
+            {"value": "1000-2500", "label": "1000-2500", "min": 1000, "max": 2500, "count": 20},
+        ])
+        filtered = self._facets("workvisaoffers-list", job_title="Bench Job 7")
+        self.assertEqual(filtered["job_title"], [{"value": "Bench Job 7", "label": "Bench Job 7", "count": 1}])
+
+    def test_vacation_bands_and_limit(self):
+        facets = self._facets("vacation-offer-list", limit=3)
+        self.assertEqual(sum(row["count"] for row in facets["price"]), 20)
+        self.assertEqual(facets["destination"][0]["label"], "United Arab Emirates")
+
+    def test_cached_until_an_offer_changes(self):
+        url = reverse("workvisaoffers-list")
+        self._facets("workvisaoffers-list")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {"facets": "true"})
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(url)
+        self.assertEqual(len(ctx), len(plain))
+
+        offer = WorkVisaOffer.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.country = "CA"
+            offer.save()
+        countries = {row["value"]: row["count"] for row in self._facets("workvisaoffers-list")["country"]}
+        self.assertEqual(countries, {"GB": 19, "CA": 1})
+
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        user = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+        Notification.objects.filter(user=user).delete()
+        Notification.objects.bulk_create(
+            Notification(user=user, title=f"n{number}", message="", notification_type="system") for number in range(37)
+        )
+        # Most rows share a timestamp, so pages split inside ties on created_at.
+        rows = Notification.objects.filter(user=user)
+        tied = timezone.now()
+        rows.filter(pk__in=list(rows.order_by("id").values_list("pk", flat=True)[5:])).update(created_at=tied)
+        cls.queryset = rows
+        cls.ordered = list(rows.order_by("-created_at", "-id").values_list("pk", flat=True))
+
+    def _page(self, params, pagination_class=KeysetPagination, queryset=None):
+        request = Request(APIRequestFactory().get("/notifications/", params))
+        pager = pagination_class()
+        rows = pager.paginate_queryset(self.queryset if queryset is None else queryset, request, view=None)
+        return pager, rows
+
+    @staticmethod
+    def _cursor(link):
+        return parse_qs(urlsplit(link).query)["cursor"][0]
+
+    def test_walks_every_row_once_across_ties(self):
+        pager, rows = self._page({"cursor": ""})
+        self.assertIsNone(pager.get_previous_link())
+        seen, sizes = [], []
+        while True:
+            seen += [row.pk for row in rows]
+            sizes.append(len(rows))
+            link = pager.get_next_link()
+            if link is None:
+                break
+            pager, rows = self._page({"cursor": self._cursor(link)})
+        self.assertEqual(sizes, [15, 15, 7])
+        self.assertEqual(seen, self.ordered)
+
+    def test_previous_link_returns_the_page_before(self):
+        _, first = self._page({"cursor": ""})
+        pager, _ = self._page({"cursor": ""})
+        pager, second = self._page({"cursor": self._cursor(pager.get_next_link())})
+        pager, third = self._page({"cursor": self._cursor(pager.get_next_link())})
+        self.assertIsNone(pager.get_next_link())
+
+        pager, back = self._page({"cursor": self._cursor(pager.get_previous_link())})
+        self.assertEqual([row.pk for row in back], [row.pk for row in second])
+        self.assertIsNotNone(pager.get_next_link())
+        pager, back = self._page({"cursor": self._cursor(pager.get_previous_link())})
+        self.assertEqual([row.pk for row in back], [row.pk for row in first])
+        self.assertIsNone(pager.get_previous_link())
+
+    def test_a_full_last_page_has_no_next_link(self):
+        queryset = self.queryset.filter(pk__in=self.ordered[:30])
+        pager, _ = self._page({"cursor": ""}, queryset=queryset)
+        pager, rows = self._page({"cursor": self._cursor(pager.get_next_link())}, queryset=queryset)
+        self.assertEqual(len(rows), 15)
+        self.assertIsNone(pager.get_next_link())
+
+    def test_invalid_cursor_is_a_404(self):
+        short = base64.urlsafe_b64encode(json.dumps({"p": ["2026-01-01T00:00:00Z"], "r": 0}).encode()).decode()
+        for cursor in ("not-a-cursor", short):
+            with self.assertRaises(NotFound, msg=cursor):
+                self._page({"cursor": cursor})
+
+    def test_without_a_cursor(self):
+        pager, rows = self._page({})
+        self.assertEqual((pager.page.paginator.count, len(rows)), (37, 15))
+        self.assertIsNone(self._page({}, CursorOnlyPagination)[1])
+        pager, rows = self._page({"cursor": ""}, queryset=self.queryset.order_by("-id")[:5])
+        self.assertEqual((pager.cursor_mode, pager.page.paginator.count), (False, 5))
+
+
+class DataPlanCatalogTests(TestCase):
+
+    PLANS = [
+        {"id": 9001, "provider_label": "TestNet", "value": "testnet_1gb", "label": "1GB Daily",
+         "category": "daily", "data": "1GB", "amount": 300},
+        {"id": 9002, "provider_label": "TestNet", "value": "testnet_5gb", "label": "5GB Weekly",
+         "category": "weekly", "data": "5GB", "amount": 1200},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = NetworkProvider.objects.create(value="testnet", label="TestNet")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_sync_skips_an_unchanged_catalog(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(catalog.sync_default_data_plans(self.PLANS), 2)
+        # Provider ids and the stored checksum only.
+        with self.assertNumQueries(2):
+            self.assertEqual(catalog.sync_default_data_plans(self.PLANS), 0)
+
+        changed = [dict(self.PLANS[0], amount=350), self.PLANS[1]]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(catalog.sync_default_data_plans(changed), 1)
+        self.assertEqual(DataPlan.objects.get(value="testnet_1gb").amount, 350)
+
+    def test_warm_catalog_does_no_queries_and_honours_etag(self):
+        url = reverse("airtime-data-plans-catalog")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual((second.status_code, second["ETag"]), (304, first["ETag"]))
+
+    def test_plan_write_rebuilds_after_commit(self):
+        url = reverse("airtime-data-plans-catalog")
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks() as callbacks:
+            DataPlan.objects.create(
+                provider=self.provider, value="testnet_10gb", label="10GB", category="monthly", data="10GB", amount=2500)
+            # Not committed yet, so the catalog is not rebuilt (and re-cached) early.
+            self.assertEqual(catalog.get_catalog()["etag"], etag)
+        for callback in callbacks:
+            callback()
+        response = self.client.get(url)
+        self.assertNotEqual(response["ETag"], etag)
+        labels = [plan["label"] for plan in response.json()["plans"][str(self.provider.pk)]]
+        self.assertIn("10GB", labels)
+
+
+
+class _ProviderResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def _fake_airtime_api(purchase, api_key):
+    """Numbers ending in 0 fail at the provider; the rest succeed."""
+    if purchase.phone.endswith("0"):
+        return _ProviderResponse({"status": "failed", "message": "Invalid number"})
+    return _ProviderResponse({"status": "success", "reference": f"ref-{purchase.phone}"})
+
+
+@override_settings(MASKAWA_API_KEY="test-key", AIRTIME_BULK_CHUNK_SIZE=2)
+@mock.patch("app.services.airtime.bulk._provider_call", lambda kind: _fake_airtime_api)
+class BulkPurchaseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").get()
+        cls.wallet, _ = Wallet.objects.get_or_create(user=cls.customer)
+        cls.provider = NetworkProvider.objects.create(value="mtn-bulk-test", label="MTN (bulk test)")
+
+    def setUp(self):
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=Decimal("1000"), is_active=True)
+
+    def _rows(self, *phones):
+        return [{"provider_id": self.provider.pk, "phone": phone, "amount": 100} for phone in phones]
+
+    def _start(self, *phones):
+        purchases = bulk.validate_airtime_rows(self._rows(*phones), self.customer)
+        batch_ref = bulk.new_batch_reference("airtime")
+        wallet = bulk.reserve_funds(self.customer, sum(p.amount for p in purchases), "airtime", batch_ref, len(purchases))
+        return bulk.run_bulk(self.customer, purchases, "airtime", batch_ref, wallet), batch_ref
+
+    def _balance(self):
+        return Wallet.objects.get(pk=self.wallet.pk).balance
+
+    def test_reserve_debits_the_total_once(self):
+        run, batch_ref = self._start("08030000001", "08030000002")
+        self.assertEqual(self._balance(), Decimal("800"))
+        self.assertEqual(WalletTransaction.objects.get(reference=batch_ref).amount, Decimal("200"))
+        run.close()
+
+    def test_short_balance_is_rejected_before_anything_is_sent(self):
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=Decimal("150"))
+        with self.assertRaises(ValidationError):
+            self._start("08030000001", "08030000002")
+        self.assertEqual(self._balance(), Decimal("150"))
+        self.assertFalse(WalletTransaction.objects.filter(user=self.customer).exists())
+
+    def test_failed_rows_are_refunded_in_one_entry(self):
+        run, batch_ref = self._start("08030000001", "08030000010", "08030000002")
+        events = list(run)
+        self.assertEqual(events[-1], {
+            "summary": True, "reference": batch_ref, "total": 3, "successful": 2, "failed": 1,
+            "refunded_amount": "100",
+        })
+        self.assertEqual({e["row"]: e["status"] for e in events[:-1]}, {1: "successful", 2: "failed", 3: "successful"})
+        self.assertEqual(self._balance(), Decimal("800"))
+        refund = WalletTransaction.objects.get(reference=f"REFUND-{batch_ref}")
+        self.assertEqual((refund.amount, refund.meta["failed_rows"]), (Decimal("100"), [2]))
+        self.assertEqual(AirtimePurchase.objects.filter(user=self.customer, completed=True).count(), 2)
+
+    def test_closing_mid_stream_still_records_and_refunds(self):
+        run, batch_ref = self._start("08030000001", "08030000010", "08030000020", "08030000002")
+        next(run)
+        run.close()
+        self.assertEqual(AirtimePurchase.objects.filter(user=self.customer).count(), 4)
+        self.assertEqual(WalletTransaction.objects.get(reference=f"REFUND-{batch_ref}").amount, Decimal("200"))
+        self.assertEqual(self._balance(), Decimal("800"))
+
+    def test_rows_the_database_rejects_do_not_block_the_refund(self):
+        real_bulk_create = AirtimePurchase.objects.bulk_create
+
+        def bulk_create(rows, *args, **kwargs):
+            if any(row.phone == "08030000002" for row in rows):
+                raise DataError("value too long for type character varying(1024)")
+            return real_bulk_create(rows, *args, **kwargs)
+
+        run, batch_ref = self._start("08030000001", "08030000010", "08030000002")
+        with mock.patch.object(AirtimePurchase.objects, "bulk_create", bulk_create), \
+                self.assertLogs("app.services.airtime.bulk", "ERROR") as logs:
+            events = list(run)
+        self.assertEqual(events[-1]["failed"], 1)
+        self.assertEqual(WalletTransaction.objects.get(reference=f"REFUND-{batch_ref}").amount, Decimal("100"))
+        self.assertEqual(self._balance(), Decimal("800"))
+        self.assertEqual(
+            set(AirtimePurchase.objects.filter(user=self.customer).values_list("phone", flat=True)),
+            {"08030000001", "08030000010"},
+        )
+        self.assertTrue(any("08030000002" in line and "ref-08030000002" in line for line in logs.output))
+
+    def test_long_provider_responses_are_truncated(self):
+        purchase = AirtimePurchase(phone="08030000001", amount=100)
+        handle_provider_response(
+            purchase, _ProviderResponse({"status": "success", "reference": "ref-1", "detail": "x" * 2000}), "airtime")
+        self.assertEqual((purchase.completed, len(purchase.status_message)), (True, 1024))
+
+    def test_closing_before_start_refunds_everything(self):
+        run, batch_ref = self._start("08030000001", "08030000002")
+        run.close()
+        self.assertEqual(self._balance(), Decimal("1000"))
+        self.assertEqual(
+            set(AirtimePurchase.objects.filter(user=self.customer).values_list("status_message", flat=True)),
+            {bulk.BulkRun.NOT_SENT},
+        )
+        self.assertEqual(list(run), [])
+
+    def test_endpoint_streams_rows_and_closing_the_response_finishes(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        url = reverse("airtime-purchases-bulk-purchase")
+        response = client.post(url, {"recipients": self._rows("08030000001", "08030000010")}, format="json")
+        self.assertEqual(response.status_code, 200)
+        lines = [line for line in b"".join(response.streaming_content).decode().splitlines() if line]
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"summary": true', lines[-1])
+        response.close()
+        self.assertEqual(self._balance(), Decimal("900"))
+
+        response = client.post(url, {"recipients": self._rows("08030000003")}, format="json")
+        # The client went away before reading anything.
+        response.close()
+        self.assertEqual(self._balance(), Decimal("900"))
+        self.assertTrue(WalletTransaction.objects.filter(reference=f"REFUND-{response['X-Bulk-Reference']}").exists())
+
+
+class EagerTasksMixin:
+    """Run Celery tasks inline (saving a CV queues its render) with media in a temp dir."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+        cls.was_eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+
+    @classmethod
+    def tearDownClass(cls):
+        celery_app.conf.task_always_eager = cls.was_eager
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+
+EMPTY_CV_SECTIONS = {
+    "education": [], "experience": [], "certifications": [], "languages": [], "publications": [],
+}
+
+
+class MatchingTests(EagerTasksMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 3, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.admin = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.customers = list(Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").order_by("id"))
+        cls.organization = WorkOrganization.objects.get(name="Bench Organization")
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        matching._indexes.clear()
+        self.client = APIClient()
+
+    def _cv(self, user, summary, skills):
+        serializer = CVProfileSerializer(data={
+            **EMPTY_CV_SECTIONS,
+            "user": user.pk, "summary": summary, "skills": [{"skill": skill} for skill in skills],
+        })
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            return serializer.save()
+
+    def _offer(self, title, requirements):
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = WorkVisaOffer.objects.create(
+                organization=self.organization, job_title=title, country="GB", salary=2000,
+            )
+            for description in requirements:
+                WorkVisaOfferRequirement.objects.create(offer=offer, description=description, is_mandatory=True)
+        return offer
+
+    def test_ranks_candidates_for_an_offer(self):
+        nurse = self._cv(self.customers[0], "Registered nurse on a surgical ward", ["Patient care", "Wound dressing"])
+        welder = self._cv(self.customers[1], "Pipe welder", ["TIG welding", "Blueprint reading"])
+        offer = self._offer("Staff Nurse", ["Patient care on surgical ward"])
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse("workvisaoffers-matches", args=[offer.pk]))
+        self.assertEqual(response.status_code, 200)
+        ranked = [row["cv"] for row in response.json()["results"]]
+        self.assertEqual(ranked, [nurse.pk])
+        self.assertNotIn(welder.pk, ranked)
+
+    def test_matches_are_staff_only(self):
+        offer = self._offer("Staff Nurse", [])
+        self.client.force_authenticate(self.customers[0])
+        response = self.client.get(reverse("workvisaoffers-matches", args=[offer.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def _vector_queries(self, skills):
+        with CaptureQueriesContext(connection) as queries:
+            self._cv(self.customers[0], "Chef", skills)
+        return [query for query in queries if "cvmatchvector" in query["sql"]]
+
+    def test_nested_writes_refresh_the_vector_once(self):
+        bare = self._vector_queries([])
+        self.assertTrue(bare)
+        self.assertEqual(len(self._vector_queries(["Pastry", "Grill", "Sauces"])), len(bare))
+
+    def test_index_follows_updates(self):
+        self._offer("Welder", ["TIG welding"])
+        cv = self._cv(self.customers[0], "Pipe welder", ["TIG welding"])
+        cook = self._offer("Line Cook", ["Grill and sauces"])
+
+        self.client.force_authenticate(self.customers[0])
+        url = reverse("cvprofile-matching-offers", args=[cv.pk])
+        self.assertNotEqual(self.client.get(url).json()["results"][0]["offer"], cook.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cv.skills.all().delete()
+            cv.skills.create(skill="Grill and sauces")
+            cv.summary = "Line cook"
+            cv.save()
+        self.assertTrue(CVMatchVector.objects.get(cv=cv).terms.get("grill"))
+        self.assertEqual(self.client.get(url).json()["results"][0]["offer"], cook.pk)
+
+    def test_other_users_cannot_see_a_cvs_matches(self):
+        cv = self._cv(self.customers[0], "Pipe welder", ["TIG welding"])
+        self.client.force_authenticate(self.customers[1])
+        response = self.client.get(reverse("cvprofile-matching-offers", args=[cv.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(CVProfile.objects.filter(pk=cv.pk).exists())
+
+
+class CVRenderTests(EagerTasksMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.owner = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        serializer = CVProfileSerializer(data={
+            **EMPTY_CV_SECTIONS,
+            "user": self.owner.pk, "summary": "Pipe welder (TIG, MIG)",
+            "skills": [{"skill": "TIG welding"}],
+            "languages": [{"name": "English", "proficiency": "Fluent"}],
+        })
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv = serializer.save()
+        self.cv.refresh_from_db()
+
+    def _download(self, file_type="pdf", **headers):
+        return self.client.get(reverse("cvprofile-download", args=[self.cv.pk, file_type]), headers=headers)
+
+    def test_renders_both_formats_on_save(self):
+        self.assertEqual(len(self.cv.render_hash), 64)
+        renders = CVRender.objects.filter(cv=self.cv, content_hash=self.cv.render_hash)
+        self.assertEqual(sorted(renders.values_list("format", flat=True)), ["docx", "pdf"])
+
+        response = self._download("pdf")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF-1.4"))
+        self.assertEqual(response["ETag"], f'"{self.cv.render_hash}-pdf"')
+
+        docx = b"".join(self._download("docx").streaming_content)
+        with zipfile.ZipFile(io.BytesIO(docx)) as package:
+            self.assertIn("TIG welding", package.read("word/document.xml").decode())
+
+    def test_files_use_the_shared_job_storage(self):
+        # Written on the worker, read by the web process.
+        self.assertIs(CVRender._meta.get_field("file").storage, storages["job_files"])
+
+    def test_if_none_match_is_answered_without_the_file(self):
+        etag = self._download()["ETag"]
+        response = self._download(If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_cv_is_not_rendered_again(self):
+        before = set(CVRender.objects.values_list("pk", flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.save()
+        self.assertEqual(set(CVRender.objects.values_list("pk", flat=True)), before)
+
+    def test_changes_render_new_files_and_drop_old_ones(self):
+        old_etag = self._download()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.languages.create(name="French", proficiency="Basic")
+        self.cv.refresh_from_db()
+        self.assertEqual(set(CVRender.objects.values_list("content_hash", flat=True)), {self.cv.render_hash})
+
+        response = self._download(If_None_Match=old_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], old_etag)
+
+    def test_owner_name_change_rerenders(self):
+        old_hash = self.cv.render_hash
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.last_name = "Renamed"
+            self.owner.save()
+        self.cv.refresh_from_db()
+        self.assertNotEqual(self.cv.render_hash, old_hash)
+
+    def test_missing_render_is_queued_not_rendered_inline(self):
+        CVRender.objects.all().delete()
+        # Already queued: the download must neither render nor queue again.
+        cache.set(rendering.RENDER_QUEUED_KEY.format(cv_id=self.cv.pk, content_hash=self.cv.render_hash), True)
+        response = self._download()
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(CVRender.objects.exists())
+
+
+# Query budget for a full CV update (PUT) that creates, changes and removes
+# rows in every section, response included.
+CV_UPDATE_BUDGET = 45
+
+
+def _cv_sections(size, tag="v1"):
+    return {
+        "education": [
+            {"institution": f"University {i}", "degree": "BSc", "field": f"Field {i}", "start_year": "2010"}
+            for i in range(size)
+        ],
+        "experience": [
+            {"organization": f"Company {i}", "position": f"Role {i}", "start_month": "May", "start_year": "2015"}
+            for i in range(size)
+        ],
+        "certifications": [{"name": f"Cert {i}", "issue_year": "2018"} for i in range(size)],
+        "skills": [{"skill": f"Skill {i} {tag}"} for i in range(size)],
+        "languages": [{"name": f"Language {i}", "proficiency": "Basic"} for i in range(size)],
+        "publications": [{"title": f"Paper {i}"} for i in range(size)],
+    }
+
+
+class CVProfileUpdateTests(EagerTasksMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.owner = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def _create(self, size):
+        response = self.client.post(
+            reverse("cvprofile-list"), {"summary": "Welder", **_cv_sections(size)}, format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def _edit(self, cv):
+        """Change the first item, drop the second and add one, in every section."""
+        payload = {"summary": "Senior welder"}
+        for name in CVProfileSerializer.SECTIONS:
+            items = [dict(item) for item in cv[name]]
+            first = items[0]
+            key = next(field for field in first if field != "id" and isinstance(first[field], str) and first[field])
+            first[key] = f"{first[key]} (edited)"
+            new = {field: value for field, value in items[-1].items() if field != "id"}
+            payload[name] = [first] + items[2:] + [new]
+        return payload
+
+    def _put(self, cv, payload):
+        return self.client.put(reverse("cvprofile-detail", args=[cv["id"]]), payload, format="json")
+
+    def _count(self, size):
+        cv = self._create(size)
+        payload = self._edit(cv)
+        with CaptureQueriesContext(connection) as queries:
+            response = self._put(cv, payload)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        for name in CVProfileSerializer.SECTIONS:
+            self.assertEqual(len(body[name]), size, name)
+            self.assertTrue(any("(edited)" in str(item) for item in body[name]), name)
+        return len(queries)
+
+    def test_update_query_budget(self):
+        small, large = self._count(3), self._count(30)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, CV_UPDATE_BUDGET)
+
+    def test_resubmitting_without_ids_writes_nothing(self):
+        cv = self._create(4)
+        payload = {"summary": cv["summary"]}
+        for name in CVProfileSerializer.SECTIONS:
+            payload[name] = [{key: value for key, value in item.items() if key != "id"} for item in cv[name]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self._put(cv, payload)
+        writes = [
+            query["sql"] for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE")) and '"app_cvprofile"' not in query["sql"]
+        ]
+        self.assertEqual(writes, [])
+        self.assertEqual(response.json()["skills"], cv["skills"])
+
+    def test_partial_update_keeps_sections_left_out(self):
+        cv = self._create(2)
+        response = self.client.patch(
+            reverse("cvprofile-detail", args=[cv["id"]]),
+            {"skills": [cv["skills"][0]]}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(response.json()["skills"]), 1)
+        self.assertEqual(response.json()["education"], cv["education"])
+
+
+class ExportTests(EagerTasksMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 2, "transactions": 0, "notifications": 0, "messages": 0, "applications": 3})
+        cls.admin = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _url(self, dataset):
+        return reverse("exportjob-export", args=[dataset])
+
+    def test_small_csv_is_streamed(self):
+        response = self.client.get(self._url("work-visa-applications"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), WorkVisaApplication.objects.count() + 1)
+        self.assertIn("client_email", lines[0].split(","))
+        self.assertFalse(ExportJob.objects.exists())
+
+    @override_settings(EXPORT_STREAM_MAX_ROWS=1)
+    def test_large_csv_becomes_a_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self._url("work-visa-applications"))
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.json()["id"])
+        self.assertEqual((job.status, job.row_count), ("done", WorkVisaApplication.objects.count()))
+
+        download = self.client.get(reverse("exportjob-download", args=[job.pk]))
+        lines = b"".join(download.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), job.row_count + 1)
+
+    def test_xlsx_job_writes_a_workbook_and_notifies(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self._url("work-visa-applications"), {"file_type": "xlsx"})
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.json()["id"])
+        self.assertEqual(job.status, "done")
+        with job.file.open("rb") as handle, zipfile.ZipFile(handle) as package:
+            sheet = package.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row "), job.row_count + 1)
+
+        notification = Notification.objects.filter(user=self.admin).latest("id")
+        self.assertEqual(notification.data["export_job"], job.pk)
+        self.assertEqual(self.client.get(notification.data["download_url"]).status_code, 200)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self._url("wallet-transactions")).status_code, 403)
+
+    def test_admin_action_exports_the_selection_in_the_background(self):
+        self.client.force_login(self.admin)
+        selected = list(WorkVisaApplication.objects.values_list("pk", flat=True)[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:app_workvisaapplication_changelist"),
+                {"action": "export_csv_in_background", "_selected_action": selected},
+            )
+        self.assertEqual(response.status_code, 302)
+        job = ExportJob.objects.get()
+        self.assertEqual((job.dataset, job.status, job.row_count), ("admin:app.workvisaapplication", "done", 2))
+
+    def test_files_use_the_shared_job_storage(self):
+        self.assertIs(ExportJob._meta.get_field("file").storage, storages["job_files"])
+
+    @override_settings(EXPORT_JOB_TIMEOUT_SECONDS=60)
+    def test_stale_running_jobs_are_failed_and_notified(self):
+        now = timezone.now()
+        stale = ExportJob.objects.create(
+            user=self.admin, dataset="work-visa-applications", status="running",
+            started_at=now - timedelta(seconds=120))
+        recent = ExportJob.objects.create(
+            user=self.admin, dataset="work-visa-applications", status="running", started_at=now)
+
+        self.assertEqual(export_tasks.fail_stale_exports.delay().get(), 1)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((stale.status, recent.status), ("failed", "running"))
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(Notification.objects.filter(user=self.admin).latest("id").data["export_job"], stale.pk)
+        self.assertEqual(export_jobs.fail_stale_exports(), 0)
+
+    @override_settings(EXPORT_STREAM_MAX_ROWS=1)
+    def test_a_job_failed_as_stale_is_not_finished_again(self):
+        real_get = ExportJob.objects.get
+
+        def get_after_stale_sweep(*args, **kwargs):
+            # The sweep runs while the worker is still writing the file.
+            job = real_get(*args, **kwargs)
+            ExportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+            self.assertEqual(export_jobs.fail_stale_exports(), 1)
+            return job
+
+        with mock.patch.object(ExportJob.objects, "get", get_after_stale_sweep), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self._url("work-visa-applications"))
+        job = real_get(pk=response.json()["id"])
+        self.assertEqual((job.status, job.file.name), ("failed", ""))
+        notices = Notification.objects.filter(user=self.admin, data__export_job=job.pk)
+        self.assertEqual([notice.data["status"] for notice in notices], ["failed"])
+
+
+class ImportTests(EagerTasksMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.admin = User.objects.get(email=f"admin@{fixtures.EMAIL_DOMAIN}")
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").first()
+        cls.program = ProgramType.objects.create(name="Masters")
+        cls.institution = Institution.objects.create(name="Aalto University", country="FI", city="Espoo")
+        cls.course = CourseOfStudy.objects.create(
+            name="Data Science", institution=cls.institution, program_type=cls.program)
+        cls.organization = WorkOrganization.objects.create(name="Nordic Builders", country="NO")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _upload(self, target, rows, file_type="csv"):
+        handle = io.BytesIO()
+        (write_csv if file_type == "csv" else write_xlsx)(handle, rows)
+        upload = SimpleUploadedFile(f"upload.{file_type}", handle.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("importjob-list"), {"target": target, "file": upload})
+        self.assertEqual(response.status_code, 202, response.content)
+        return ImportJob.objects.get(pk=response.json()["id"])
+
+    def test_csv_creates_and_updates_rows_and_reports_row_errors(self):
+        existing = StudyVisaOffer.objects.create(
+            institution=self.institution, course_of_study=self.course, program_type=self.program,
+            offer_title="Old title")
+        header = ["id", "institution", "course_of_study", "program_type", "offer_title", "tuition_fee",
+                  "status", "is_active", "notes"]
+        rows = [
+            header,
+            ["", "Aalto University", "Data Science", "Masters", "Data Science MSc", "12000.50", "open", "yes", ""],
+            [existing.pk, self.institution.pk, "Data Science", "Masters", "New title", "", "", "no", ""],
+            ["", "Unknown University", "Data Science", "Masters", "Nowhere", "", "", "", ""],
+            ["", "Aalto University", "Data Science", "Masters", "Bad fee", "lots", "", "", ""],
+        ]
+        with override_settings(IMPORT_CHUNK_SIZE=2):
+            job = self._upload("app.studyvisaoffer", rows)
+
+        self.assertEqual(job.status, "done")
+        self.assertEqual(
+            (job.total_rows, job.processed_rows, job.created_count, job.updated_count, job.error_count),
+            (4, 4, 1, 1, 2),
+        )
+        self.assertEqual(job.ignored_columns, ["notes"])
+        self.assertEqual([error["row"] for error in job.errors], [4, 5])
+        self.assertIn("institution", job.errors[0]["errors"])
+        self.assertIn("tuition_fee", job.errors[1]["errors"])
+
+        created = StudyVisaOffer.objects.get(offer_title="Data Science MSc")
+        self.assertEqual((created.status.table_name, created.status.term.lower()), ("study_visa_offer_status", "open"))
+        self.assertEqual(str(created.tuition_fee), "12000.50")
+        self.assertIn("aalto", created.search_text)
+        existing.refresh_from_db()
+        self.assertEqual((existing.offer_title, existing.is_active), ("New title", False))
+
+        notification = Notification.objects.filter(user=self.admin).latest("id")
+        self.assertEqual(notification.data, {"import_job": job.pk, "status": "done"})
+
+    def test_xlsx_import_refreshes_offer_match_vectors(self):
+        rows = [["organization", "job_title", "country", "job_description"]] + [
+            ["Nordic Builders", f"Welder {number}", "NO", "MIG and TIG welding"] for number in range(3)
+        ]
+        job = self._upload("app.workvisaoffer", rows, file_type="xlsx")
+        self.assertEqual((job.status, job.created_count, job.error_count), ("done", 3, 0))
+        offers = WorkVisaOffer.objects.filter(organization=self.organization)
+        self.assertEqual(OfferMatchVector.objects.filter(offer__in=offers).count(), 3)
+        self.assertIn("welding", OfferMatchVector.objects.filter(offer__in=offers).first().terms)
+
+    def test_queries_per_chunk_do_not_grow_with_rows(self):
+        def chunk_queries(size):
+            rows = [
+                {"organization": "Nordic Builders", "job_title": f"Role {size}-{n}", "country": "NO"}
+                for n in range(size)
+            ]
+            chunk = next(chunked(rows, size))
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                result = get_importer("app.workvisaoffer").import_chunk(chunk)
+            self.assertEqual((len(result.created), result.errors), (size, {}))
+            return len(queries)
+
+        self.assertEqual(chunk_queries(3), chunk_queries(15))
+
+    def test_tables_with_save_logic_are_written_row_by_row(self):
+        self.assertFalse(get_importer("app.amenity").save_rows)
+        self.assertFalse(get_importer("app.workvisaoffer").save_rows)
+        self.assertFalse(get_importer("definition.roles").save_rows)
+        for name in ("app.hotelbooking", "app.investment", "app.workvisaapplication", "app.studyvisaapplication",
+                     "app.vacationvisaapplication", "app.pilgrimagevisaapplication", "app.dataplan"):
+            self.assertTrue(get_importer(name).save_rows, name)
+
+    def test_row_by_row_import_runs_save(self):
+        pending, _ = TableDropDownDefinition.objects.get_or_create(table_name="hotel_reservation_status", term="Pending")
+        rows = [["destination", "check_in", "check_out"], ["LOS", "2026-01-10", "2026-01-12"], ["ABV", "soon", ""]]
+        job = self._upload("app.hotelbooking", rows)
+        self.assertEqual((job.status, job.created_count, job.error_count), ("done", 1, 1))
+        self.assertEqual(HotelBooking.objects.get(destination="LOS").status_id, pending.pk)
+
+    def test_files_use_the_shared_job_storage(self):
+        self.assertIs(ImportJob._meta.get_field("file").storage, storages["job_files"])
+
+    @override_settings(IMPORT_JOB_TIMEOUT_SECONDS=60)
+    def test_stale_running_jobs_are_failed_and_notified(self):
+        now = timezone.now()
+        upload = SimpleUploadedFile("upload.csv", b"name\nx\n")
+        stale = ImportJob.objects.create(
+            user=self.admin, target="definition.roles", file=upload, status="running",
+            started_at=now - timedelta(seconds=120))
+        recent = ImportJob.objects.create(
+            user=self.admin, target="definition.roles", file=upload, status="running", started_at=now)
+
+        self.assertEqual(import_tasks.fail_stale_imports.delay().get(), 1)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((stale.status, recent.status), ("failed", "running"))
+        self.assertEqual(Notification.objects.filter(user=self.admin).latest("id").data,
+                         {"import_job": stale.pk, "status": "failed"})
+
+        # A worker that was only slow does not finish the job again.
+        def importer_after_stale_sweep(target):
+            ImportJob.objects.filter(pk=stale.pk).update(status="failed")
+            return get_importer(target)
+
+        ImportJob.objects.filter(pk=stale.pk).update(status="pending")
+        with mock.patch.object(import_jobs, "get_importer", importer_after_stale_sweep):
+            import_jobs.run(stale.pk)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "failed")
+        self.assertEqual(Notification.objects.filter(data__import_job=stale.pk).count(), 1)
+
+    def test_roles_import_creates_inactive_roles(self):
+        Roles.objects.create(name="Existing")
+        job = self._upload("definition.roles", [["name", "is_active"], ["Auditor", "TRUE"], ["Existing", "TRUE"]])
+        self.assertEqual((job.created_count, job.error_count, job.ignored_columns), (1, 1, ["is_active"]))
+        role = Roles.objects.get(name="Auditor")
+        self.assertFalse(role.is_active)
+        self.assertTrue(role.custom_id)
+
+    def test_unknown_target_and_file_type_are_rejected(self):
+        upload = SimpleUploadedFile("upload.txt", b"name\nx\n")
+        response = self.client.post(reverse("importjob-list"), {"target": "definition.roles", "file": upload})
+        self.assertEqual(response.status_code, 400)
+        upload = SimpleUploadedFile("upload.csv", b"name\nx\n")
+        response = self.client.post(reverse("importjob-list"), {"target": "definition.tabledropdowndefinition", "file": upload})
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(reverse("importjob-list")).status_code, 403)
+
+    def test_admin_upload_starts_a_job(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse("admin:app_importjob_add")).status_code, 200)
+        upload = SimpleUploadedFile("roles.csv", b"name\nReviewer\n")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:app_importjob_add"), {"target": "definition.roles", "file": upload})
+        self.assertEqual(response.status_code, 302)
+        job = ImportJob.objects.get()
+        self.assertEqual((job.user, job.status, job.created_count), (self.admin, "done", 1))
+        self.assertEqual(self.client.get(reverse("admin:app_importjob_change", args=[job.pk])).status_code, 200)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class WebSocketAuthTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 2, "transactions": 0, "notifications": 0, "messages": 0, "applications": 1})
+        cls.application = WorkVisaApplication.objects.select_related("client").first()
+        cls.owner = cls.application.client
+        cls.outsider = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").exclude(pk=cls.owner.pk).first()
+
+    def setUp(self):
+        cache.clear()
+        self.application_ws = JWTAuthMiddleware(URLRouter(app_routings.websocket_urlpatterns))
+
+    def _communicator(self, user=None):
+        path = f"/ws/work/visa-application/{self.application.pk}/"
+        if user is not None:
+            path += f"?token={AccessToken.for_user(user)}"
+        return WebsocketCommunicator(self.application_ws, path)
+
+    def _connect(self, user=None):
+        async def run():
+            communicator = self._communicator(user)
+            connected, code = await communicator.connect()
+            if connected:
+                await communicator.disconnect()
+            return connected, code
+        return async_to_sync(run)()
+
+    def test_missing_or_invalid_token_is_refused(self):
+        self.assertEqual(self._connect(), (False, CLOSE_UNAUTHENTICATED))
+
+        async def run():
+            path = f"/ws/work/visa-application/{self.application.pk}/?token=not-a-token"
+            return await WebsocketCommunicator(self.application_ws, path).connect()
+        self.assertEqual(async_to_sync(run)(), (False, CLOSE_UNAUTHENTICATED))
+
+    def test_non_participant_is_refused(self):
+        self.assertEqual(self._connect(self.outsider), (False, CLOSE_FORBIDDEN))
+
+    def test_applicant_comments_without_authorization_queries(self):
+        async def run():
+            communicator = self._communicator(self.owner)
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            self.assertEqual((await communicator.receive_json_from())["type"], "connection_successful")
+            await communicator.send_json_to({"action": "send_comment", "text": "hi", "user_id": self.outsider.pk})
+            forged = await communicator.receive_json_from()
+            await communicator.send_json_to({"action": "send_comment", "text": "Hello"})
+            posted = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return forged, posted
+
+        with CaptureQueriesContext(connection) as queries:
+            forged, posted = async_to_sync(run)()
+        self.assertEqual(forged, {"error": "Not authorized."})
+        self.assertEqual((posted["action"], posted["text"]), ("new_comment", "Hello"))
+        comment = WorkVisaApplicationComment.objects.get()
+        self.assertEqual((comment.visa_application_id, comment.applicant_id), (self.application.pk, self.owner.pk))
+        # The application table is read once, for the rooms at connect, and not per message.
+        application_table = WorkVisaApplication._meta.db_table
+        self.assertEqual(len([q for q in queries.captured_queries if f'FROM "{application_table}"' in q["sql"]]), 1)
+
+    def test_rooms_are_read_only_for_the_route_kind(self):
+        from globalconceptBE.asgi import application
+
+        tables = {label: apps.get_model(label)._meta.db_table for label, _ in ROOM_SOURCES.values()}
+
+        def room_tables(path, user):
+            async def run():
+                communicator = WebsocketCommunicator(application, f"{path}?token={AccessToken.for_user(user)}")
+                connected, _ = await communicator.connect()
+                if connected:
+                    await communicator.disconnect()
+            with CaptureQueriesContext(connection) as queries:
+                async_to_sync(run)()
+            return {label for label, table in tables.items()
+                    if any(f'FROM "{table}"' in q["sql"] for q in queries.captured_queries)}
+
+        self.assertEqual(room_tables(f"/ws/work/visa-application/{self.application.pk}/", self.owner),
+                         {"app.WorkVisaApplication"})
+        self.assertEqual(room_tables("/ws/notifications/", self.owner), set())
+
+
+class BenchmarkDatasetTests(TestCase):
+
+    def test_reused_data_is_described_by_its_row_counts(self):
+        counts = {"customers": 3, "transactions": 7, "notifications": 4, "messages": 5, "applications": 2}
+        fixtures.seed(counts=counts)
+        self.assertEqual(fixtures.describe_seeded(), {"size": "custom", "seed": None, **counts})
+        fixtures.seed(counts=counts)
+        self.assertEqual(fixtures.describe_seeded(), {"size": "custom", "seed": None,
+                                                      **{key: n * 2 for key, n in counts.items()}})
+        with mock.patch.dict(fixtures.SIZES, {"tiny": {key: n * 2 for key, n in counts.items()}}):
+            self.assertEqual(fixtures.describe_seeded()["size"], "tiny")
+
+
+class WebSocketBenchmarkTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 2, "transactions": 0, "notifications": 4, "messages": 0, "applications": 2})
+
+    def test_harness_connects_with_tokens(self):
+        from globalconceptBE.asgi import application
+
+        for name in ("study_comments", "notifications"):
+            scenario = benchmark_ws.Command()._scenario(name, rooms=1)
+            self.assertTrue(scenario.rooms, name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = async_to_sync(websocket_benchmark.run_scenario)(
+                    application, scenario, connections=2, room_size=2, messages=2, timeout=10, memory=False)
+            self.assertEqual((result["connections"], result["refused"]), (2, 0), name)
+            self.assertEqual(result["delivered"], result["expected_deliveries"], name)
@@ -52,6 +52,10 @@ from app.citizenship.investment.views import (
 # --- Import CVProfileViewSet for CV builder API ---
 from app.cv_builder.views import CVProfileViewSet
 
+# --- Import export and import job viewsets ---
+from app.exports.views import ExportJobViewSet
+from app.imports.views import ImportJobViewSet
+
 # --- Import Airtime API viewsets ---
 from app.services.airtime.views import (
     NetworkProviderViewSet,
@@ -113,6 +117,10 @@ router.register(r'support-ticket', SupportTicketViewSet, basename='supportticket
 # --- Register CV Builder endpoints ---
 router.register(r'cv-profiles', CVProfileViewSet, basename='cvprofile')
 
+# --- Register Export endpoints ---
+router.register(r'export-jobs', ExportJobViewSet, basename='exportjob')
+router.register(r'import-jobs', ImportJobViewSet, basename='importjob')
+
 # --- Register Airtime API endpoints ---
 router.register(r'airtime-network-providers', NetworkProviderViewSet, basename='airtime-network-providers')
 router.register(r'airtime-purchases', AirtimePurchaseViewSet, basename='airtime-purchases')
@@ -1,8 +1,15 @@
 from django.shortcuts import render
 
 # Create your views here.
+import base64
+import json
+from functools import reduce
+
+from django.db.models import Q
 from rest_framework import status, viewsets, generics, pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(pagination.PageNumberPagination):
@@ -36,4 +43,130 @@ class CustomPagination(pagination.PageNumberPagination):
             'page_size': self.page_size,
             'current_page': self.page.number,
             'results': data
-        })
\ No newline at end of file
+        })
+
+
+class KeysetPagination(CustomPagination):
+    """
+    CustomPagination with an opt-in keyset (cursor) mode.
+
+    Without `?cursor=` the response is the usual page-number payload. Passing
+    `?cursor=` (empty for the first page) switches to keyset paging: rows are
+    ordered by the view's `cursor_ordering` (default `-created_at, -id`) and
+    each page filters on the last row's values instead of using OFFSET, and no
+    COUNT(*) is issued, so deep pages cost the same as the first one. The
+    ordering fields must be non-null and end with a unique field, and should
+    be backed by a composite index on the model.
+
+    Sliced querysets (e.g. `?limit=`) always use page-number mode.
+    """
+    cursor_query_param = 'cursor'
+    default_cursor_ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            and not queryset.query.is_sliced
+        )
+        if not self.cursor_mode:
+            return self.paginate_without_cursor(queryset, request, view=view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.default_cursor_ordering))
+        self.fields = [queryset.model._meta.get_field(f.lstrip('-')) for f in self.ordering]
+
+        position, reverse = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        ordering = tuple(self._flip(f) for f in self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, ordering))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.rows = rows
+        return rows
+
+    def paginate_without_cursor(self, queryset, request, view=None):
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.rows:
+            return None
+        return self._link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.rows:
+            return None
+        return self._link(self.rows[0], reverse=True)
+
+    def _link(self, row, reverse):
+        values = [field.value_to_string(row) for field in self.fields]
+        token = base64.urlsafe_b64encode(
+            json.dumps({'p': values, 'r': int(reverse)}).encode()
+        ).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, token):
+        """Return (position values, reverse) for `token`; (None, False) for the first page."""
+        if not token:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            values = data['p']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+            return position, bool(data.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _after(position, ordering):
+        """
+        Rows strictly after `position` in `ordering`:
+        (a > x) OR (a = x AND b > y) OR ..., with < for descending fields.
+        """
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): position[i] for i, f in enumerate(ordering[:index])}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(lambda a, b: a | b, clauses)
+
+
+class CursorOnlyPagination(KeysetPagination):
+    """
+    KeysetPagination for endpoints that historically returned a plain list:
+    without `?cursor=` the full unpaginated list is still returned.
+    """
+
+    def paginate_without_cursor(self, queryset, request, view=None):
+        return None
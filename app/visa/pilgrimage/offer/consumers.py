@@ -1,17 +1,19 @@
 import logging
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import PilgrimageVisaApplicationComment, PilgrimageVisaApplication
+from globalconceptBE.query_metrics import QueryMetricsConsumerMixin
+from .models import PilgrimageVisaApplicationComment
 from .serializers import PilgrimageVisaApplicationCommentSerializer
-from account.client.models import Client
+from globalconceptBE.websocket_auth import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED, can_join, scope_user_id
 
 logger = logging.getLogger("visa.Pilgrimage.websocket")
 
-class PilgrimageVisaCommentConsumer(AsyncJsonWebsocketConsumer):
+class PilgrimageVisaCommentConsumer(QueryMetricsConsumerMixin, AsyncJsonWebsocketConsumer):
     """
     WebSocket consumer for real-time comments (chat-like) on PilgrimageVisaApplication.
     Each application has its own "room", named by application id.
-    Instead of using Django's user in scope, expects frontend to provide user_id with each action.
+    The user comes from the JWT validated at connect (globalconceptBE/websocket_auth.py),
+    which also lists the applications they may comment on.
     """
 
     async def connect(self):
@@ -23,19 +25,14 @@ class PilgrimageVisaCommentConsumer(AsyncJsonWebsocketConsumer):
 
         self.room_group_name = f'Pilgrimage_visa_application_{self.application_id}'
 
-        try:
-            application = await self._get_application(self.application_id)
-        except Exception as exc:
-            logger.warning("Application lookup error: %s", exc)
-            await self.close()
+        if scope_user_id(self.scope) is None:
+            await self.close(code=CLOSE_UNAUTHENTICATED)
             return
 
-        if application is None:
-            await self.close()
+        if not can_join(self.scope, "pilgrimage", self.application_id):
+            await self.close(code=CLOSE_FORBIDDEN)
             return
 
-        self.application = application
-
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
@@ -67,41 +64,29 @@ class PilgrimageVisaCommentConsumer(AsyncJsonWebsocketConsumer):
             {
               'action': 'send_comment',
               'text': 'comment text',
-              'user_id': <user_id>,    # (required)
+              'user_id': <user_id>,    # (optional; must be the authenticated user)
               'attachment': <optional>
             }
         """
         action = content.get("action")
         if action == "send_comment":
             text = (content.get("text") or "").strip()
-            user_id = content.get("user_id")
-            if not user_id:
-                await self.send_json({"error": "user_id must be provided."})
+            user_id = scope_user_id(self.scope)
+            claimed_user_id = content.get("user_id")
+            if claimed_user_id is not None and str(claimed_user_id) != str(user_id):
+                await self.send_json({"error": "Not authorized."})
                 return
 
             if not text:
                 await self.send_json({"error": "Comment cannot be empty."})
                 return
 
-            try:
-                application = await self._get_application(self.application_id)
-            except Exception as exc:
-                logger.warning("Application lookup error in receive_json: %s", exc)
-                await self.send_json({'error': "Application not found."})
-                return
-
-            if application is None:
-                await self.send_json({'error': "Application not found."})
-                return
-
-            # Only applicant can comment (admin not checked since User model is removed)
-            applicant, admin = await self._lookup_applicant_or_admin(user_id, application)
-
-            if applicant is None and admin is None:
+            # Only the applicant can comment (admin not checked since User model is removed)
+            if not can_join(self.scope, "pilgrimage", self.application_id):
                 await self.send_json({"error": "Not authorized."})
                 return
 
-            comment = await self._create_comment(application, applicant, admin, text)
+            comment = await self._create_comment(user_id, text)
             if comment is None:
                 await self.send_json({"error": "Could not save comment."})
                 return
@@ -123,37 +108,11 @@ class PilgrimageVisaCommentConsumer(AsyncJsonWebsocketConsumer):
         await self.send_json(event["message"])
 
     @database_sync_to_async
-    def _get_application(self, application_id):
-        try:
-            return PilgrimageVisaApplication.objects.select_related('applicant').get(id=application_id)
-        except PilgrimageVisaApplication.DoesNotExist:
-            return None
-
-    @database_sync_to_async
-    def _lookup_applicant_or_admin(self, user_id, application):
-        """
-        Return (applicant, admin) such that only one is not None.
-        Only the correct application.applicant is allowed.
-        """
-        try:
-            if application.applicant_id and str(application.applicant_id) == str(user_id):
-                try:
-                    applicant = Client.objects.get(id=user_id)
-                    return (applicant, None)
-                except Client.DoesNotExist:
-                    return (None, None)
-            return (None, None)
-        except Exception as exc:
-            logger.warning(f"_lookup_applicant_or_admin error: {exc}")
-            return (None, None)
-
-    @database_sync_to_async
-    def _create_comment(self, application, applicant, admin, text):
+    def _create_comment(self, applicant_id, text):
         try:
             return PilgrimageVisaApplicationComment.objects.create(
-                visa_application=application,
-                applicant=applicant,
-                admin=admin,
+                visa_application_id=self.application_id,
+                applicant_id=applicant_id,
                 text=text
             )
         except Exception as exc:
@@ -1,12 +1,20 @@
 from django.db import models
 from django_countries.fields import CountryField
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 from account.client.models import Client  # For applicant ForeignKey
 from django.conf import settings
 from cloudinary.models import CloudinaryField
+from globalconceptBE.search import SearchDocumentModel
 from globalconceptBE.validators import validate_image_file, validate_document_file, validate_attachment_file
 
-class PilgrimageOffer(models.Model):
+class PilgrimageOffer(SearchDocumentModel):
+    search_fields = (
+        ('title', 'A'), ('destination__name', 'A'), ('city', 'B'),
+        ('pilgrimage_type__term', 'B'), ('sponsorship__term', 'B'),
+        ('sponsor_name', 'C'), ('destination', 'C'), ('description', 'C'),
+    )
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     pilgrimage_type = models.ForeignKey(
@@ -149,6 +157,10 @@ class PilgrimageVisaApplication(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['applicant', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         # Use Client's true name if available via properties or fallback, for better client name display
@@ -196,11 +208,7 @@ class PilgrimageVisaApplication(models.Model):
         # Make default application status "Draft", if not already set
         if self.status is None:
             try:
-                self.status = TableDropDownDefinition.objects.filter(
-                    table_name='pilgrimage_application_status',
-                    is_active=True,
-                    term="Draft"
-                ).first()
+                self.status = get_definition('pilgrimage_application_status', "Draft", is_active=True)
             except Exception:
                 pass
         super().save(*args, **kwargs)
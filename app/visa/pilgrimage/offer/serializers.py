@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from .models import (
     PilgrimageOffer,
     PilgrimageOfferIncludedItem,
@@ -20,13 +21,14 @@ class PilgrimageOfferImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image', 'caption']
 
 # Pilgrimage Visa Application Comment Serializer
-class PilgrimageVisaApplicationCommentSerializer(serializers.ModelSerializer):
+class PilgrimageVisaApplicationCommentSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     sender_type = serializers.CharField(read_only=True)
     sender_display = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = PilgrimageVisaApplicationComment
+        select_related = ('applicant', 'admin')
         fields = [
             "id",
             "visa_application",
@@ -68,7 +70,7 @@ class PilgrimageVisaApplicationCommentSerializer(serializers.ModelSerializer):
         return {"type": "unknown"}
 
 # Pilgrimage Offer Serializer
-class PilgrimageOfferSerializer(serializers.ModelSerializer):
+class PilgrimageOfferSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     included_items = PilgrimageOfferIncludedItemSerializer(many=True, read_only=True)
     images = PilgrimageOfferImageSerializer(many=True, read_only=True)
     pilgrimage_type_display = serializers.SerializerMethodField()
@@ -76,6 +78,7 @@ class PilgrimageOfferSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PilgrimageOffer
+        select_related = ('pilgrimage_type', 'sponsorship')
         fields = [
             'id',
             'title',
@@ -117,7 +120,7 @@ class PilgrimageOfferSerializer(serializers.ModelSerializer):
         return obj.sponsorship_display
 
 # Visa Application Serializer
-class PilgrimageVisaApplicationSerializer(serializers.ModelSerializer):
+class PilgrimageVisaApplicationSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     offer_title = serializers.CharField(source="offer.title", read_only=True)
     destination = serializers.CharField(source="offer.destination", read_only=True)
     applicant_name = serializers.SerializerMethodField()
@@ -130,6 +133,7 @@ class PilgrimageVisaApplicationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PilgrimageVisaApplication
+        select_related = ('applicant', 'status')
         fields = [
             "id",
             "offer",
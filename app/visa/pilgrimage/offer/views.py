@@ -1,7 +1,9 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework import permissions
-from app.views import CustomPagination
+from app.views import CustomPagination, KeysetPagination
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
+from globalconceptBE.search import search
 from .models import PilgrimageOffer, PilgrimageVisaApplication, PilgrimageVisaApplicationComment
 from .serializers import (
     PilgrimageOfferSerializer,
@@ -12,7 +14,7 @@ from rest_framework.decorators import action
 from django.db.models import Q
 from django.core.exceptions import FieldError
 
-class PilgrimageOfferViewSet(viewsets.ModelViewSet):
+class PilgrimageOfferViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = PilgrimageOffer.objects.all()
     serializer_class = PilgrimageOfferSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -23,7 +25,7 @@ class PilgrimageOfferViewSet(viewsets.ModelViewSet):
         Optionally restricts the returned pilgrimage offers by filtering against
         query parameters in the URL. Supports filtering by destination, pilgrimage_type,
         sponsorship, city, is_active, price range, created_at date range. Also supports
-        free-text search (search), and ?limit= query param for limiting results.
+        full-text search (?q=, or the older ?search=), and ?limit= query param for limiting results.
         """
         queryset = super().get_queryset()
         params = self.request.query_params
@@ -35,7 +37,7 @@ class PilgrimageOfferViewSet(viewsets.ModelViewSet):
         is_active = params.get('is_active')
         min_price = params.get('min_price')
         max_price = params.get('max_price')
-        search_term = params.get('search')
+        search_term = params.get('q') or params.get('search')
         limit = params.get('limit')
         start_date = params.get('start_date')
         end_date = params.get('end_date')
@@ -78,20 +80,8 @@ class PilgrimageOfferViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(start_date__gte=start_date)
         if end_date:
             queryset = queryset.filter(end_date__lte=end_date)
-        # Full-text or partial search across multiple fields
-        if search_term:
-            search_q = Q()
-            search_q |= Q(title__icontains=search_term)
-            search_q |= Q(description__icontains=search_term)
-            search_q |= Q(destination__icontains=search_term)
-            search_q |= Q(city__icontains=search_term)
-            search_q |= Q(pilgrimage_type__term__icontains=search_term)
-            search_q |= Q(sponsorship__term__icontains=search_term)
-            search_q |= Q(sponsor_name__icontains=search_term)
-            try:
-                queryset = queryset.filter(search_q)
-            except FieldError:
-                pass
+        # Ranked full-text search (see globalconceptBE/search.py)
+        queryset = search(queryset, search_term)
 
         if limit is not None:
             try:
@@ -102,11 +92,11 @@ class PilgrimageOfferViewSet(viewsets.ModelViewSet):
                 pass  # Ignore invalid limit values
         return queryset
 
-class PilgrimageVisaApplicationViewSet(viewsets.ModelViewSet):
+class PilgrimageVisaApplicationViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = PilgrimageVisaApplication.objects.all()
     serializer_class = PilgrimageVisaApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -210,7 +200,7 @@ class PilgrimageVisaApplicationViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
-class PilgrimageVisaApplicationCommentViewSet(viewsets.ModelViewSet):
+class PilgrimageVisaApplicationCommentViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     ViewSet for CRUD operations on PilgrimageVisaApplicationComment.
     Auto-assigns applicant/admin sender roles based on the current user.
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.visa.vacation.offer.models import VacationOffer
+from app.visa.work.offers.models import WorkVisaOffer
+from globalconceptBE.facets import invalidate_facets
+from globalconceptBE.imports import rows_imported
+
+
+@receiver([post_save, post_delete, rows_imported], sender=WorkVisaOffer)
+@receiver([post_save, post_delete, rows_imported], sender=VacationOffer)
+def invalidate_offer_facets(sender, **kwargs):
+    """Drop the cached facet counts of the offer listing once the write commits."""
+    transaction.on_commit(lambda: invalidate_facets(sender))
@@ -1,17 +1,19 @@
 import logging
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import StudyVisaApplicationComment, StudyVisaApplication
+from globalconceptBE.query_metrics import QueryMetricsConsumerMixin
+from .models import StudyVisaApplicationComment
 from .serializers import StudyVisaApplicationCommentSerializer
-from account.client.models import Client
+from globalconceptBE.websocket_auth import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED, can_join, scope_user_id
 
 logger = logging.getLogger("visa.study.websocket")
 
-class StudyVisaCommentConsumer(AsyncJsonWebsocketConsumer):
+class StudyVisaCommentConsumer(QueryMetricsConsumerMixin, AsyncJsonWebsocketConsumer):
     """
     WebSocket consumer for real-time comments (chat-like) on StudyVisaApplication.
     Each application has its own "room", named by application id.
-    Expects frontend to provide user_id with each action.
+    The user comes from the JWT validated at connect (globalconceptBE/websocket_auth.py),
+    which also lists the applications they may comment on.
     """
 
     async def connect(self):
@@ -41,22 +43,17 @@ class StudyVisaCommentConsumer(AsyncJsonWebsocketConsumer):
 
         self.room_group_name = f'Study_visa_application_{self.application_id}'
 
-        try:
-            application = await self._get_application(self.application_id)
-        except Exception as exc:
-            # file_context_0: Log "Application lookup error during connect:" with exc
-            logger.warning(f"Application lookup error during connect: {exc}")
-            await self.close(code=4004)
+        if scope_user_id(self.scope) is None:
+            logger.warning(f"Unauthenticated websocket for application {self.application_id}")
+            await self.close(code=CLOSE_UNAUTHENTICATED)
             return
 
-        if application is None:
-            logger.warning(f"Application with id {self.application_id} not found.")
-            await self.close(code=4005)
+        if not can_join(self.scope, "study", self.application_id):
+            logger.warning(f"User {scope_user_id(self.scope)} may not join application {self.application_id}")
+            await self.close(code=CLOSE_FORBIDDEN)
             return
 
-        self.application = application
-
-        # Accept the connection early; user_id will be checked per message
+        # Every message is authorized from the scope; no lookups per message
         try:
             await self.channel_layer.group_add(
                 self.room_group_name,
@@ -95,7 +92,7 @@ class StudyVisaCommentConsumer(AsyncJsonWebsocketConsumer):
             {
               'action': 'send_comment',
               'text': 'comment text',
-              'user_id': <user_id>,    # (required)
+              'user_id': <user_id>,    # (optional; must be the authenticated user)
               'attachment': <optional>
             }
         """
@@ -104,36 +101,24 @@ class StudyVisaCommentConsumer(AsyncJsonWebsocketConsumer):
         # Only support send_comment for now
         if action == "send_comment":
             text = (content.get("text") or "").strip()
-            user_id = content.get("user_id")
+            user_id = scope_user_id(self.scope)
 
             logger.info(f"Received request to create comment: user_id={user_id}, text={text!r}")
 
-            if not user_id:
-                await self.send_json({"error": "user_id must be provided."})
+            claimed_user_id = content.get("user_id")
+            if claimed_user_id is not None and str(claimed_user_id) != str(user_id):
+                await self.send_json({"error": "Not authorized."})
                 return
 
             if not text:
                 await self.send_json({"error": "Comment cannot be empty."})
                 return
 
-            # Lookup latest application every time, in case it changed or was deleted
-            try:
-                application = await self._get_application(self.application_id)
-            except Exception as exc:
-                logger.warning("Application lookup error in receive_json: %s", exc)
-                await self.send_json({'error': "Application not found."})
-                return
-
-            if application is None:
-                await self.send_json({'error': "Application not found."})
-                return
-
-            applicant, admin = await self._lookup_applicant_or_admin(user_id, application)
-            if applicant is None and admin is None:
+            if not can_join(self.scope, "study", self.application_id):
                 await self.send_json({"error": "Not authorized."})
                 return
 
-            comment = await self._create_comment(application, applicant, admin, text)
+            comment = await self._create_comment(user_id, text)
             if comment is None:
                 await self.send_json({"error": "Could not save comment."})
                 return
@@ -165,41 +150,11 @@ class StudyVisaCommentConsumer(AsyncJsonWebsocketConsumer):
         await self.send_json(event["message"])
 
     @database_sync_to_async
-    def _get_application(self, application_id):
-        try:
-            # 'applicant' is not a valid related field; use 'client'
-            return StudyVisaApplication.objects.select_related("applicant").get(id=application_id)
-        except StudyVisaApplication.DoesNotExist:
-            return None
-
-    @database_sync_to_async
-    def _lookup_applicant_or_admin(self, user_id, application):
-        """
-        Return (applicant, admin) such that only one is not None.
-        Only the correct application applicant (client) is allowed.
-        """
-        # Only allow commenting if user is the applicant for this application, or staff/admin in future
-        try:
-            # 'applicant' is not a field, should check against 'applicant_id'
-            if application.applicant_id and str(application.applicant_id) == str(user_id):
-                try:
-                    applicant = Client.objects.get(id=user_id)
-                    return (applicant, None)
-                except Client.DoesNotExist:
-                    return (None, None)
-            # You may add admin-type support here later, if needed
-            return (None, None)
-        except Exception as exc:
-            logger.warning(f"_lookup_applicant_or_admin error: {exc}")
-            return (None, None)
-
-    @database_sync_to_async
-    def _create_comment(self, application, applicant, admin, text):
+    def _create_comment(self, applicant_id, text):
         try:
             return StudyVisaApplicationComment.objects.create(
-                visa_application=application,
-                applicant=applicant,
-                admin=admin,
+                visa_application_id=self.application_id,
+                applicant_id=applicant_id,
                 text=text
             )
         except Exception as exc:
@@ -4,21 +4,29 @@ from account.client.models import Client
 from app.visa.study.institutions.models import Institution, CourseOfStudy, ProgramType
 from django_countries.fields import CountryField
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 from app.visa.study.offers.models import StudyVisaOffer
 
 from cloudinary.models import CloudinaryField
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
 from globalconceptBE.validators import validate_image_file, validate_document_file, validate_attachment_file
 
 # Helper for file upload paths
 def upload_to(instance, filename, prefix):
     return f'study_visa/{instance.id or "temp"}/{prefix}/{filename}'
 
-class StudyVisaApplication(models.Model):
+class StudyVisaApplication(DirtyFieldsMixin, models.Model):
     """
     Represents a study visa application. Applicants can either apply directly to an institution
     or apply for a StudyVisaOffer (which may be a special program, scholarship, or bundled offer).
     If 'study_visa_offer' is set, the application is for that offer; otherwise, it's a direct application to an institution.
     """
+    # Compared on save by the status log and the notification signals.
+    tracked_fields = (
+        'status', 'is_submitted', 'institution', 'course_of_study',
+        'program_type', 'study_visa_offer',
+    )
+
     # 1️⃣ Personal Information
     applicant = models.ForeignKey('account.Client', on_delete=models.CASCADE, related_name='visa_applicants')
     # If the user is applying for a StudyVisaOffer, this is set; otherwise, it's null.
@@ -122,7 +130,13 @@ class StudyVisaApplication(models.Model):
         default=None  # Will be set in save()
     )
     notes = models.TextField(blank=True, null=True)
-    
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-application_date', '-id']),
+            models.Index(fields=['applicant', '-application_date', '-id']),
+        ]
+
     @property
     def institution_name(self):
         return self.institution.name if self.institution else None
@@ -211,30 +225,11 @@ class StudyVisaApplication(models.Model):
                 self.program_type = offer.program_type
 
         # Determine status based on completeness
-        try:
-            completed_status = TableDropDownDefinition.objects.get(
-                term='Completed',
-                table_name='study_visa_status'
-            )
-        except TableDropDownDefinition.DoesNotExist:
-            completed_status = None
-
-        try:
-            draft_status = TableDropDownDefinition.objects.get(
-                term='Draft',
-                table_name='study_visa_status'
-            )
-        except TableDropDownDefinition.DoesNotExist:
-            draft_status = None
+        completed_status = get_definition('study_visa_status', 'Completed')
+        draft_status = get_definition('study_visa_status', 'Draft')
 
         # Track status change
-        old_status_id = None
-        if self.pk:
-            try:
-                old = StudyVisaApplication.objects.get(pk=self.pk)
-                old_status_id = old.status_id
-            except StudyVisaApplication.DoesNotExist:
-                old_status_id = None
+        old_status_id = self.previous('status')
 
         if self.all_required_fields_filled():
             if completed_status:
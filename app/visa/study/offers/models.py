@@ -2,13 +2,21 @@ from django.db import models
 from app.visa.study.institutions.models import Institution, CourseOfStudy, ProgramType
 from django_countries.fields import CountryField
 from definition.models import TableDropDownDefinition
+from globalconceptBE.search import SearchDocumentModel
 
 
 
-class StudyVisaOffer(models.Model):
+class StudyVisaOffer(SearchDocumentModel):
     """
     Represents a study visa offer available to applicants, including its requirements.
     """
+    search_fields = (
+        ('offer_title', 'A'), ('institution__name', 'A'),
+        ('course_of_study__name', 'B'), ('program_type__name', 'B'), ('country__name', 'B'),
+        ('country', 'C'), ('description', 'C'),
+        ('minimum_qualification', 'D'), ('other_requirements', 'D'),
+    )
+
     institution = models.ForeignKey(
         Institution,
         on_delete=models.CASCADE,
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from app.visa.study.offers.models import StudyVisaOffer, StudyVisaOfferRequirement
 
 class StudyVisaOfferRequirementSerializer(serializers.ModelSerializer):
@@ -11,7 +12,7 @@ class StudyVisaOfferRequirementSerializer(serializers.ModelSerializer):
             'notes',
         ]
 
-class StudyVisaOfferSerializer(serializers.ModelSerializer):
+class StudyVisaOfferSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     requirements = StudyVisaOfferRequirementSerializer(many=True, read_only=True)
     institution_name = serializers.CharField(source='institution.name', read_only=True)
     course_of_study_name = serializers.CharField(source='course_of_study.name', read_only=True)
@@ -20,6 +21,7 @@ class StudyVisaOfferSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = StudyVisaOffer
+        select_related = ('status',)
         fields = [
             'id',
             'institution',
@@ -2,12 +2,11 @@ from rest_framework import viewsets, permissions
 from app.visa.study.offers.models import StudyVisaOffer
 from app.visa.study.offers.serializers import StudyVisaOfferSerializer
 from app.views import CustomPagination
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
+from globalconceptBE.search import search
 
-from django.db.models import Q
-from django.core.exceptions import FieldError
 
-
-class StudyVisaOfferViewSet(viewsets.ModelViewSet):
+class StudyVisaOfferViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows Study Visa Offers to be viewed or edited.
     """
@@ -22,7 +21,7 @@ class StudyVisaOfferViewSet(viewsets.ModelViewSet):
         query parameters in the URL. 
         Supports filtering by country, institution, is_active, status,
         institution_name (case-insensitive, partial), program_type (by pk or name), course_of_study (by pk or name),
-        and free-text search ('search') over institution name, country, offer_title, description, and other text fields.
+        and ranked full-text search (?q=, or the older ?search=) over institution name, country, offer_title, description, and other text fields.
         Supports 'limit' param for limiting results.
         """
         queryset = super().get_queryset()
@@ -37,7 +36,7 @@ class StudyVisaOfferViewSet(viewsets.ModelViewSet):
         is_active = params.get('is_active')
         status = params.get('status')
         limit = params.get('limit')
-        search_term = params.get('search')
+        search_term = params.get('q') or params.get('search')
 
         # country is a CountryField, string-based
         if country:
@@ -93,25 +92,8 @@ class StudyVisaOfferViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 queryset = queryset.filter(status__name__icontains=status)
 
-        # Search logic (fix: do NOT use ForeignKey__name__icontains where 'name' is not a field on the related model!)
-        if search_term:
-            search_q = Q()
-            # Only include valid target fields (see model definition)
-            search_q |= Q(institution__name__icontains=search_term)
-            search_q |= Q(course_of_study__name__icontains=search_term)
-            search_q |= Q(program_type__name__icontains=search_term)
-            search_q |= Q(country__icontains=search_term)
-            search_q |= Q(offer_title__icontains=search_term)
-            search_q |= Q(description__icontains=search_term)
-            search_q |= Q(minimum_qualification__icontains=search_term)
-            search_q |= Q(other_requirements__icontains=search_term)
-            # Only add status__name__icontains if the related TableDropDownDefinition really has a 'name' field
-            # This is safe per model context.
-            try:
-                queryset = queryset.filter(search_q)
-            except FieldError:
-                # This guards against the unsupported lookup: skip the broken filter if fails.
-                pass
+        # Ranked full-text search (see globalconceptBE/search.py)
+        queryset = search(queryset, search_term)
 
         # Limiting results if limit is given
         if limit is not None:
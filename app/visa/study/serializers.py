@@ -1,14 +1,16 @@
 from rest_framework import serializers
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from .models import StudyVisaApplication, StudyVisaApplicationComment
 
 
-class StudyVisaApplicationSerializer(serializers.ModelSerializer):
+class StudyVisaApplicationSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     country = serializers.SerializerMethodField()
     # country = serializers.SerializerMethodField(source="country_str", read_only=True)
     destination_country = serializers.SerializerMethodField()
 
     class Meta:
         model = StudyVisaApplication
+        select_related = ('status', 'institution', 'course_of_study', 'program_type', 'study_visa_offer__institution')
         fields = [
             'id',
             # 1️⃣ Personal Information
@@ -93,13 +95,14 @@ class StudyVisaApplicationSerializer(serializers.ModelSerializer):
 
 
 # Work Visa Application Comment Serializer
-class StudyVisaApplicationCommentSerializer(serializers.ModelSerializer):
+class StudyVisaApplicationCommentSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     sender_type = serializers.CharField(read_only=True)
     sender_display = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = StudyVisaApplicationComment
+        select_related = ('applicant', 'admin')
         fields = [
             "id",
             "visa_application",
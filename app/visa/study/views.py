@@ -3,7 +3,8 @@ from django.db import models
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework import viewsets
 from rest_framework.response import Response
-from app.views import CustomPagination
+from app.views import CustomPagination, KeysetPagination
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
 from app.visa.study.serializers import StudyVisaApplicationCommentSerializer, StudyVisaApplicationSerializer
 from .models import StudyVisaApplication, StudyVisaApplicationComment
 from rest_framework.permissions import IsAuthenticated
@@ -11,10 +12,11 @@ from rest_framework import status
 from rest_framework.decorators import action
 
 
-class StudyVisaApplicationViewSet(viewsets.ModelViewSet):
+class StudyVisaApplicationViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = StudyVisaApplication.objects.all().order_by('-application_date')
     serializer_class = StudyVisaApplicationSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-application_date', '-id')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -82,7 +84,7 @@ class StudyVisaApplicationViewSet(viewsets.ModelViewSet):
             )
 
 
-class StudyVisaApplicationCommentViewSet(viewsets.ModelViewSet):
+class StudyVisaApplicationCommentViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling comments on Study Visa Applications.
     Allows list/create for /api/app/study-visa-application-comments/ or via application-specific route
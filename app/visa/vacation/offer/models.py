@@ -2,12 +2,19 @@ from django.conf import settings
 from django.db import models
 from django_countries.fields import CountryField
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 from account.client.models import Client  # For applicant ForeignKey
 
 from cloudinary.models import CloudinaryField  # Added for Cloudinary file/image fields
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
+from globalconceptBE.search import SearchDocumentModel
 from globalconceptBE.validators import validate_image_file, validate_document_file, validate_attachment_file
 
-class VacationOffer(models.Model):
+class VacationOffer(SearchDocumentModel):
+    search_fields = (
+        ('title', 'A'), ('destination__name', 'A'), ('destination', 'C'), ('description', 'C'),
+    )
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     destination = CountryField()
@@ -51,7 +58,7 @@ class VacationOfferImage(models.Model):
 def vacation_identification_document_upload_to(instance, filename):
     return f'vacation_application/{instance.id or "temp"}/identification_document/{filename}'
 
-class VacationVisaApplication(models.Model):
+class VacationVisaApplication(DirtyFieldsMixin, models.Model):
     """
     Represents a user's application for a vacation offer.
     Only fields unique to the application (not duplicated from the Offer model) are included here.
@@ -61,6 +68,9 @@ class VacationVisaApplication(models.Model):
       3. Document Uploads (identification_document)
       4. Emergency Contact (emergency_contact_name, emergency_contact_phone, emergency_contact_relationship)
     """
+    # Compared on save by the notification signals.
+    tracked_fields = ('status',)
+
     offer = models.ForeignKey(
         VacationOffer,
         null=False,
@@ -113,6 +123,10 @@ class VacationVisaApplication(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['applicant', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         display_name = None
@@ -133,11 +147,7 @@ class VacationVisaApplication(models.Model):
         # Make default application status "Draft", if not already set
         if self.status is None:
             try:
-                self.status = TableDropDownDefinition.objects.filter(
-                    table_name='vacation_application_status',
-                    is_active=True,
-                    term="Draft"
-                ).first()
+                self.status = get_definition('vacation_application_status', "Draft", is_active=True)
             except Exception:
                 pass
         super().save(*args, **kwargs)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from .models import (
     VacationOffer,
     VacationOfferIncludedItem,
@@ -30,7 +31,7 @@ class VacationOfferImageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id']
 
-class VacationOfferSerializer(CountryFieldMixin, serializers.ModelSerializer):
+class VacationOfferSerializer(PrefetchCheckedSerializerMixin, CountryFieldMixin, serializers.ModelSerializer):
     included_items = VacationOfferIncludedItemSerializer(many=True, read_only=True)
     images = VacationOfferImageSerializer(many=True, read_only=True)
 
@@ -58,7 +59,7 @@ class VacationOfferSerializer(CountryFieldMixin, serializers.ModelSerializer):
 
 # ---- Vacation Visa Application Serializer ----
 
-class VacationVisaApplicationSerializer(CountryFieldMixin, serializers.ModelSerializer):
+class VacationVisaApplicationSerializer(PrefetchCheckedSerializerMixin, CountryFieldMixin, serializers.ModelSerializer):
     # Display applicant info and offer info if required
     applicant = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
     offer = serializers.PrimaryKeyRelatedField(queryset=VacationOffer.objects.all())
@@ -75,6 +76,7 @@ class VacationVisaApplicationSerializer(CountryFieldMixin, serializers.ModelSeri
 
     class Meta:
         model = VacationVisaApplication
+        select_related = ('offer', 'applicant', 'status')
         fields = [
             'id',
             'offer',
@@ -140,13 +142,14 @@ class VacationVisaApplicationSerializer(CountryFieldMixin, serializers.ModelSeri
 
 
 # Work Visa Application Comment Serializer
-class VacationVisaApplicationCommentSerializer(serializers.ModelSerializer):
+class VacationVisaApplicationCommentSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     sender_type = serializers.CharField(read_only=True)
     sender_display = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = VacationVisaApplicationComment
+        select_related = ('applicant', 'admin')
         fields = [
             "id",
             "visa_application",
@@ -15,23 +15,31 @@ from .serializers import (
     VacationVisaApplicationSerializer,
 )
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from app.views import CustomPagination
+from app.views import CustomPagination, KeysetPagination
+from globalconceptBE.facets import CountryFacet, Facet, FacetedListMixin, RangeFacet
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
+from globalconceptBE.search import search
 from rest_framework.decorators import action
-from django.db.models import Q
-from django.core.exceptions import FieldError
 
 
-class VacationOfferViewSet(viewsets.ModelViewSet):
+class VacationOfferViewSet(FacetedListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = VacationOffer.objects.all().order_by('-created_at')
     serializer_class = VacationOfferSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = CustomPagination
+    # ?facets=true adds counts for the filter chips (see globalconceptBE/facets.py)
+    facets = {
+        'destination': CountryFacet('destination'),
+        'price': RangeFacet('price', [500, 1000, 2500, 5000]),
+        'hotel_stars': Facet('hotel_stars'),
+        'is_active': Facet('is_active'),
+    }
 
     def get_queryset(self):
         """
         Optionally filter VacationOffers by query params:
         destination, hotel_stars, is_active, min_price, max_price,
-        date range, search, and supports limit.
+        date range, full-text search (?q=, or the older ?search=), and supports limit.
         """
         queryset = super().get_queryset()
         params = self.request.query_params
@@ -41,7 +49,7 @@ class VacationOfferViewSet(viewsets.ModelViewSet):
         is_active = params.get('is_active')
         min_price = params.get('min_price')
         max_price = params.get('max_price')
-        search_term = params.get('search')
+        search_term = params.get('q') or params.get('search')
         limit = params.get('limit')
         start_date = params.get('start_date')
         end_date = params.get('end_date')
@@ -76,17 +84,8 @@ class VacationOfferViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(end_date__lte=end_date)
 
-        if search_term:
-            search_q = (
-                Q(title__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(destination__icontains=search_term)
-            )
-            # Do not try searching for hotel_stars if it's not a char field
-            try:
-                queryset = queryset.filter(search_q)
-            except FieldError:
-                pass
+        # Ranked full-text search (see globalconceptBE/search.py)
+        queryset = search(queryset, search_term)
 
         if limit is not None:
             try:
@@ -112,11 +111,11 @@ class VacationOfferImageViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
 
 
-class VacationVisaApplicationViewSet(viewsets.ModelViewSet):
+class VacationVisaApplicationViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = VacationVisaApplication.objects.all().order_by('-created_at')
     serializer_class = VacationVisaApplicationSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -180,7 +179,7 @@ class VacationVisaApplicationViewSet(viewsets.ModelViewSet):
 
 
 
-class VacationVisaApplicationCommentViewSet(viewsets.ModelViewSet):
+class VacationVisaApplicationCommentViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling comments on Study Visa Applications.
     Allows list/create for /api/app/vacation-visa-application-comments/ or via application-specific route
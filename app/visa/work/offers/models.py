@@ -3,18 +3,19 @@ from django_countries.fields import CountryField
 from app.visa.work.organization.models import WorkOrganization
 from account.client.models import Client
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition_id
 from django.conf import settings
 from cloudinary.models import CloudinaryField
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
+from globalconceptBE.search import SearchDocumentModel
 from globalconceptBE.validators import validate_image_file, validate_document_file, validate_attachment_file
 
 
 def get_default_work_visa_status():
     try:
-        return TableDropDownDefinition.objects.get(
-            term="Draft",
-            table_name="work_visa_application_statuses",
-            is_system_defined=True
-        ).id
+        return get_definition_id(
+            "work_visa_application_statuses", "Draft", is_system_defined=True
+        )
     except Exception:
         return None
 
@@ -46,10 +47,15 @@ class WorkVisaOfferRequirement(models.Model):
         return f"{self.description} ({'Mandatory' if self.is_mandatory else 'Optional'})"
 
 
-class WorkVisaOffer(models.Model):
+class WorkVisaOffer(SearchDocumentModel):
     """
     Model to store job offers for work visa applications.
     """
+    search_fields = (
+        ('job_title', 'A'), ('organization__name', 'B'), ('country__name', 'B'),
+        ('city', 'B'), ('country', 'C'), ('job_description', 'C'),
+    )
+
     organization = models.ForeignKey(
         WorkOrganization,
         on_delete=models.CASCADE,
@@ -123,12 +129,15 @@ def application_comment_attachment_upload_to(instance, filename):
     return f'work_visa/{visa_app_id}/comments/{comment_id}/{filename}'
 
 
-class WorkVisaApplication(models.Model):
+class WorkVisaApplication(DirtyFieldsMixin, models.Model):
     """
     Model to store a client's application for a specific work visa job offer.
     The application can collect both job-related and visa-related info.
     The 'country' (nationality) is automatically filled from the client model's country.
     """
+    # Compared on save by the notification signals.
+    tracked_fields = ('status',)
+
     client = models.ForeignKey(
         Client,
         on_delete=models.CASCADE,
@@ -363,6 +372,10 @@ class WorkVisaApplication(models.Model):
         verbose_name = "Work Visa Application"
         verbose_name_plural = "Work Visa Applications"
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at', '-id']),
+            models.Index(fields=['client', '-submitted_at', '-id']),
+        ]
 
     def __str__(self):
         return f"Application of {self.client} for {self.offer}"
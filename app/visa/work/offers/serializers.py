@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from app.visa.work.offers.models import (
     WorkVisaApplicationComment,
     WorkVisaOffer,
@@ -23,7 +24,7 @@ class WorkVisaOfferRequirementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class WorkVisaOfferSerializer(serializers.ModelSerializer):
+class WorkVisaOfferSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     organization = WorkOrganizationSerializer(read_only=True)
     organization_id = serializers.PrimaryKeyRelatedField(
         queryset=WorkVisaOffer._meta.get_field('organization').remote_field.model.objects.all(),
@@ -56,13 +57,14 @@ class WorkVisaOfferSerializer(serializers.ModelSerializer):
 
 
 # Work Visa Application Comment Serializer
-class WorkVisaApplicationCommentSerializer(serializers.ModelSerializer):
+class WorkVisaApplicationCommentSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     sender_type = serializers.CharField(read_only=True)
     sender_display = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = WorkVisaApplicationComment
+        select_related = ('applicant', 'admin')
         fields = [
             "id",
             "visa_application",
@@ -101,7 +103,7 @@ class WorkVisaApplicationCommentSerializer(serializers.ModelSerializer):
         return getattr(obj, "sender_display", {"type": "unknown"})
 
 
-class WorkVisaApplicationSerializer(serializers.ModelSerializer):
+class WorkVisaApplicationSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     offer = WorkVisaOfferSerializer(read_only=True)
     offer_id = serializers.PrimaryKeyRelatedField(
         queryset=WorkVisaOffer.objects.all(),
@@ -123,6 +125,7 @@ class WorkVisaApplicationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = WorkVisaApplication
+        select_related = ('status',)
         fields = [
             'id',
             'client',                     # FK
@@ -1,7 +1,12 @@
 from rest_framework.decorators import action
 from rest_framework import viewsets
 from rest_framework import permissions
-from app.views import CustomPagination
+from app.cv_builder import matching
+from app.cv_builder.models import CVProfile
+from app.views import CustomPagination, KeysetPagination
+from globalconceptBE.facets import CountryFacet, Facet, FacetedListMixin, RangeFacet
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
+from globalconceptBE.search import search
 from app.visa.work.offers.models import (
     CVSubmission,
     WorkVisaOffer,
@@ -22,18 +27,91 @@ from rest_framework.exceptions import ValidationError
 from rest_framework import status
 
 
-class WorkVisaOfferViewSet(viewsets.ModelViewSet):
+class WorkVisaOfferViewSet(FacetedListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = WorkVisaOffer.objects.all()
     serializer_class = WorkVisaOfferSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = CustomPagination
+    # ?facets=true adds counts for the filter chips (see globalconceptBE/facets.py)
+    facets = {
+        'country': CountryFacet('country'),
+        'job_title': Facet('job_title'),
+        'salary': RangeFacet('salary', [1000, 2500, 5000, 10000]),
+        'is_active': Facet('is_active'),
+    }
 
+    def get_queryset(self):
+        """
+        Optionally filter WorkVisaOffers by query params:
+        country, job_title, is_active, min_salary, max_salary, and
+        ranked full-text search with ?q= (see globalconceptBE/search.py).
+        """
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        country = params.get('country')
+        job_title = params.get('job_title')
+        is_active = params.get('is_active')
+        min_salary = params.get('min_salary')
+        max_salary = params.get('max_salary')
 
-class WorkVisaApplicationViewSet(viewsets.ModelViewSet):
+        if country:
+            queryset = queryset.filter(country__iexact=country)
+        if job_title:
+            queryset = queryset.filter(job_title__iexact=job_title)
+        if is_active is not None:
+            is_active_val = str(is_active).strip().lower()
+            if is_active_val in {'true', '1', 'yes', 'on'}:
+                queryset = queryset.filter(is_active=True)
+            elif is_active_val in {'false', '0', 'no', 'off'}:
+                queryset = queryset.filter(is_active=False)
+        if min_salary:
+            try:
+                queryset = queryset.filter(salary__gte=float(min_salary))
+            except (ValueError, TypeError):
+                pass
+        if max_salary:
+            try:
+                queryset = queryset.filter(salary__lt=float(max_salary))
+            except (ValueError, TypeError):
+                pass
+
+        return search(queryset, params.get('q'))
+
+    @action(detail=True, methods=['get'], url_path='matches', permission_classes=[permissions.IsAdminUser])
+    def matches(self, request, pk=None):
+        """
+        Staff only: the CVs that best match this offer, best first.
+        ?limit= sets how many (default 10, at most 100).
+        """
+        offer = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except (ValueError, TypeError):
+            limit = 10
+        ranked = matching.top_candidates(offer, limit)
+        profiles = CVProfile.objects.select_related('user').in_bulk([cv_id for cv_id, _ in ranked])
+        results = []
+        for cv_id, score in ranked:
+            profile = profiles.get(cv_id)
+            if profile is None:
+                continue
+            results.append({
+                'cv': cv_id,
+                'user': profile.user_id,
+                'name': profile.user.full_name,
+                'email': profile.user.email,
+                'score': score,
+            })
+        return Response({'offer': offer.pk, 'results': results})
+
+
+class WorkVisaApplicationViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = WorkVisaApplication.objects.all()
     serializer_class = WorkVisaApplicationSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-submitted_at', '-id')
 
     def get_queryset(self):
         """
@@ -111,7 +189,7 @@ class WorkVisaApplicationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class WorkVisaApplicationCommentViewSet(viewsets.ModelViewSet):
+class WorkVisaApplicationCommentViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling comments on Work Visa Applications.
     Allows list/create for /api/app/work-visa-application-comments/ or via application-specific route
@@ -3,10 +3,12 @@ import logging
 import asyncio
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from globalconceptBE.query_metrics import QueryMetricsConsumerMixin
+from globalconceptBE.websocket_auth import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED, can_join, scope_user_id
 
 logger = logging.getLogger("chat.websocket")
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(QueryMetricsConsumerMixin, AsyncWebsocketConsumer):
     """
     React-friendly ChatConsumer for customer <-> agent live chat.
     Accepts and responds to modern event-based commands in message payloads:
@@ -17,7 +19,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
         """
-        Accepts if proper chat_id & user_id in URL.
+        Accepts if proper chat_id & user_id in URL, the user_id is the one
+        authenticated by the token, and they take part in the chat.
         """
         self.chat_id = self.scope['url_route']['kwargs'].get("chat_id", None)
         self.user_id = self.scope['url_route']['kwargs'].get("user_id", None)
@@ -25,6 +28,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
+        if str(scope_user_id(self.scope)) != str(self.user_id):
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
+        if not can_join(self.scope, "chat", self.chat_id):
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
+
         self.room_group_name = f"chat_{self.chat_id}"
 
         try:
@@ -193,17 +204,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def create_message(self, chat_session, sender_id, recipient_id, sender_type, text, attachment):
-        from django.contrib.auth import get_user_model
         from chat.models import Message
-        User = get_user_model()
-        sender = User.objects.get(pk=sender_id)
-        recipient = User.objects.get(pk=recipient_id)
         if not isinstance(text, str):
             text = str(text)
+        # The sender is the socket's user, already loaded by JWTAuthMiddleware.
         msg_kwargs = dict(
             chat_session=chat_session,
-            sender=sender,
-            recipient=recipient,
+            sender=self.scope["user"],
+            recipient_id=recipient_id,
             sender_type=sender_type,
             message=text
         )
@@ -264,6 +272,10 @@ class ChatSessionListConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
+        if str(scope_user_id(self.scope)) != str(self.user_id):
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
         self.room_group_name = f"user_chats_{self.user_id}"
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
@@ -331,11 +343,9 @@ class ChatSessionListConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_user_chat_sessions(self, user_id):
-        from django.contrib.auth import get_user_model
         from chat.models import ChatSession
         from django.db import models
 
-        User = get_user_model()
         qs = ChatSession.objects.filter(
             models.Q(customer_id=user_id) | models.Q(agent_id=user_id)
         ).select_related("agent", "customer")
@@ -344,7 +354,7 @@ class ChatSessionListConsumer(AsyncWebsocketConsumer):
             agent_name = getattr(sess.agent, "full_name", "Unassigned") if sess.agent else "Unassigned"
             last_msg_dt = sess.last_message_at()
             try:
-                unread_count = sess.unread_count_for_user(User.objects.get(pk=user_id))
+                unread_count = sess.unread_count_for_user(self.scope["user"])
             except Exception:
                 unread_count = 0
             result.append({
@@ -104,3 +104,6 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['chat_session', 'timestamp', 'id']),
+        ]
@@ -9,6 +9,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 
+from app.views import CursorOnlyPagination
+
 
 class ChatSessionViewSet(viewsets.ModelViewSet):
     """
@@ -32,6 +34,9 @@ class MessageViewSet(viewsets.ModelViewSet):
     queryset = Message.objects.all().order_by('timestamp')
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Plain list by default; ?cursor= pages through long histories.
+    pagination_class = CursorOnlyPagination
+    cursor_ordering = ('timestamp', 'id')
 
     def get_queryset(self):
         user = self.request.user
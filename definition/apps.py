@@ -6,6 +6,7 @@ class DefinitionConfig(AppConfig):
     name = 'definition'
 
     def ready(self):
+        import definition.signals
         import definition.permissions.signal
         import definition.roles.superadmin_signals
         import definition.gender.signals
@@ -0,0 +1,100 @@
+"""
+Effective permissions of staff users.
+
+A user's permissions are the UserPermissions of every module of their role
+plus their own extra_permissions. `get_effective_permissions(user)` returns
+them as a frozenset of names, so a permission class is a set lookup:
+
+    return "view staffs" in get_effective_permissions(request.user)
+
+`get_effective_role(user)` gives the name of the user's role the same way.
+
+The set is cached per user and role under two version keys: a global one,
+bumped whenever roles, modules, permissions or their links change, and one
+per user, bumped when the user's extra_permissions change (see
+definition/permissions/signal.py). Changing a user's role changes the key
+by itself. The result is also kept on the user object (which lives for one
+request), so the second check in a request does not even read the cache.
+
+Queryset `.update()` / bulk writes do not fire signals - call `invalidate()`
+after those.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from globalconceptBE.cache_versions import bump, current_versions
+from definition.roles.models import Roles
+from .models import UserPermissions
+
+PERMISSIONS_VERSION_KEY = "definition:permissions:version"
+USER_PERMISSIONS_VERSION_KEY = "definition:permissions:version:user:{user_id}"
+USER_PERMISSIONS_KEY = "definition:permissions:user:{user_id}:{role_id}:{version}:{user_version}"
+
+# Attribute the resolved permissions are memoised under on the user object.
+_MEMO = "_effective_permissions"
+
+EffectivePermissions = namedtuple("EffectivePermissions", ["role", "permissions"])
+NO_PERMISSIONS = EffectivePermissions(None, frozenset())
+
+
+def invalidate():
+    """Every user's permissions are recomputed on their next check."""
+    bump(PERMISSIONS_VERSION_KEY)
+
+
+def invalidate_user(user_id):
+    """One user's permissions are recomputed on their next check."""
+    bump(USER_PERMISSIONS_VERSION_KEY.format(user_id=user_id))
+
+
+def compute_permissions(user):
+    """EffectivePermissions of `user` (role name, permission names), from the database."""
+    names = set(
+        UserPermissions.objects.filter(extra_user_permissions=user.pk).values_list("name", flat=True)
+    )
+    role = None
+    if user.role_id is not None:
+        role = Roles.objects.filter(pk=user.role_id).values_list("name", flat=True).first()
+        names.update(
+            UserPermissions.objects.filter(modules__roles=user.role_id).values_list("name", flat=True)
+        )
+    return EffectivePermissions(role, frozenset(names))
+
+
+def resolve(user):
+    """EffectivePermissions of `user`, cached; NO_PERMISSIONS for anonymous users."""
+    if not getattr(user, "is_authenticated", False):
+        return NO_PERMISSIONS
+    memo = getattr(user, _MEMO, None)
+    if memo is not None and memo[0] == user.role_id:
+        return memo[1]
+    version, user_version = current_versions(
+        PERMISSIONS_VERSION_KEY, USER_PERMISSIONS_VERSION_KEY.format(user_id=user.pk)
+    )
+    key = USER_PERMISSIONS_KEY.format(
+        user_id=user.pk, role_id=user.role_id, version=version, user_version=user_version,
+    )
+    effective = cache.get(key)
+    if effective is None:
+        effective = compute_permissions(user)
+        cache.set(key, effective, getattr(settings, "EFFECTIVE_PERMISSIONS_CACHE_SECONDS", 3600))
+    effective = EffectivePermissions(*effective)
+    setattr(user, _MEMO, (user.role_id, effective))
+    return effective
+
+
+def get_effective_permissions(user):
+    """frozenset of the permission names `user` holds."""
+    return resolve(user).permissions
+
+
+def get_effective_role(user):
+    """Name of `user`'s role, or None."""
+    return resolve(user).role
+
+
+def has_permissions(user, *names):
+    """True if `user` holds every one of `names`."""
+    return get_effective_permissions(user).issuperset(names)
@@ -1,8 +1,12 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.dispatch import receiver
 import os
 from .models import Modules, UserPermissions
-from django.db import IntegrityError
+from .effective import invalidate, invalidate_user
+from account.models import User
+from definition.roles.models import Roles
+from django.db import IntegrityError, transaction
+from globalconceptBE.imports import rows_imported
 
 @receiver(post_migrate)
 def create_system_defined_entries(sender, **kwargs):
@@ -41,3 +45,34 @@ def create_system_defined_permission_modules_entries(sender, **kwargs):
                 except IntegrityError:
                     pass
 
+
+@receiver([post_save, post_delete], sender=UserPermissions)
+@receiver([post_save, post_delete], sender=Modules)
+@receiver([post_save, post_delete, rows_imported], sender=Roles)
+@receiver(m2m_changed, sender=Modules.permissions.through)
+@receiver(m2m_changed, sender=Roles.modules.through)
+def invalidate_effective_permissions(sender, action=None, **kwargs):
+    """Roles, modules and their permissions are shared: every user recomputes."""
+    if action is None or action.startswith('post_'):
+        _invalidate_now_and_on_commit(invalidate)
+
+
+@receiver(m2m_changed, sender=User.extra_permissions.through)
+def invalidate_user_effective_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        _invalidate_now_and_on_commit(invalidate_user, instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            _invalidate_now_and_on_commit(invalidate_user, user_id)
+    else:
+        # permission.extra_user_permissions.clear(): the users are not listed.
+        _invalidate_now_and_on_commit(invalidate)
+
+
+def _invalidate_now_and_on_commit(func, *args):
+    # Now, so later checks in this transaction see the change; and again once
+    # committed, in case another request re-cached the old set in between.
+    func(*args)
+    transaction.on_commit(lambda: func(*args))
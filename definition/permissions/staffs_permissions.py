@@ -1,71 +1,40 @@
 from rest_framework import permissions
 
-class CanCreateStaffs(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
+from .effective import get_effective_permissions
 
-        required_permissions = ['create staffs']
 
-        if user.role is not None and (
-            user.role.permissions.filter(name__in=required_permissions).exists()
-            or any(perm.name in required_permissions for perm in user.extra_permissions.all())
-        ):
-            return True
+class StaffPermission(permissions.BasePermission):
+    """
+    Allows users with a role who hold every one of `required_permissions`,
+    through their role's modules or their extra permissions. The user's
+    permissions are resolved once and cached (see effective.py).
+    """
+    required_permissions = []
 
-        return False
-    
-class CanUpdateStaffs(permissions.BasePermission):
     def has_permission(self, request, view):
         user = request.user
 
-        required_permissions = ['update staffs']
+        if not user.is_authenticated or user.role_id is None:
+            return False
 
-        if user.role is not None and (
-            user.role.permissions.filter(name__in=required_permissions).exists()
-            or any(perm.name in required_permissions for perm in user.extra_permissions.all())
-        ):
-            return True
+        return get_effective_permissions(user).issuperset(self.required_permissions)
 
-        return False
 
-class CanDeleteStaffs(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
+class CanCreateStaffs(StaffPermission):
+    required_permissions = ['create staffs']
 
-        required_permissions = ['delete staffs']
 
-        if user.role is not None and (
-            user.role.permissions.filter(name__in=required_permissions).exists()
-            or any(perm.name in required_permissions for perm in user.extra_permissions.all())
-        ):
-            return True
+class CanUpdateStaffs(StaffPermission):
+    required_permissions = ['update staffs']
 
-        return False
-    
-class CanViewStaffs(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
-
-        required_permissions = ['view staffs']
 
-        if user.role is not None and (
-            user.role.permissions.filter(name__in=required_permissions).exists()
-            or any(perm.name in required_permissions for perm in user.extra_permissions.all())
-        ):
-            return True
+class CanDeleteStaffs(StaffPermission):
+    required_permissions = ['delete staffs']
 
-        return False
-    
-class CanResetStaffPassword(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
 
-        required_permissions = ['can reset staff password']
+class CanViewStaffs(StaffPermission):
+    required_permissions = ['view staffs']
 
-        if user.role is not None and (
-            user.role.permissions.filter(name__in=required_permissions).exists()
-            or any(perm.name in required_permissions for perm in user.extra_permissions.all())
-        ):
-            return True
 
-        return False
\ No newline at end of file
+class CanResetStaffPassword(StaffPermission):
+    required_permissions = ['can reset staff password']
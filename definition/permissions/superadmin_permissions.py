@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from .effective import get_effective_role
+
 
 class CanCreateSuperAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -9,8 +11,9 @@ class CanCreateSuperAdmin(permissions.BasePermission):
         if not user.is_authenticated:
             raise PermissionDenied("User is not authenticated.")
 
-        if user.role.name != "superadmin":
+        # The role is created as "SuperAdmin" (roles/superadmin_signals.py).
+        role = get_effective_role(user)
+        if role is None or role.lower() != "superadmin":
             raise PermissionDenied("Only super admin users can access this route.")
 
         return True
-
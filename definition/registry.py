@@ -0,0 +1,128 @@
+"""
+In-process registry of TableDropDownDefinition rows.
+
+Statuses and types are resolved by (table_name, term) on almost every save,
+so the whole table is loaded once per process and indexed by id and by
+(table_name, lowercased term). Terms match exactly unless `iexact=True`, as
+with the `term=` / `term__iexact=` filters the call sites used before. Each process compares its copy against a
+shared cache version key; any save/delete of a definition bumps that key
+(see definition/signals.py) and every worker reloads on its next lookup.
+
+`get_bootstrap` serves every active definition grouped by table_name, built
+once per registry version with a content-hash ETag.
+
+Queryset `.update()` / bulk writes do not fire signals - call `invalidate()`
+after those.
+"""
+import copy
+import hashlib
+import json
+import threading
+
+from globalconceptBE.cache_versions import bump, current_version
+
+from .models import TableDropDownDefinition
+
+REGISTRY_VERSION_KEY = "definition:registry:version"
+
+_local = {"version": None, "by_id": None, "by_term": None, "bootstrap": None}
+_lock = threading.Lock()
+
+
+def invalidate():
+    """Bump the shared version so every process reloads its local copy."""
+    bump(REGISTRY_VERSION_KEY)
+
+
+def _load():
+    by_id, by_term = {}, {}
+    for definition in TableDropDownDefinition.objects.order_by("id"):
+        by_id[definition.pk] = definition
+        key = (definition.table_name, definition.term.lower())
+        by_term.setdefault(key, []).append(definition)
+    return by_id, by_term
+
+
+def _indexes():
+    version = current_version(REGISTRY_VERSION_KEY)
+    if _local["version"] != version or _local["by_id"] is None:
+        with _lock:
+            if _local["version"] != version or _local["by_id"] is None:
+                _local["by_id"], _local["by_term"] = _load()
+                _local["bootstrap"] = None
+                _local["version"] = version
+    return _local["by_id"], _local["by_term"]
+
+
+def get_definition(table_name, term, iexact=False, **filters):
+    """
+    Return the first definition (lowest id) in `table_name` whose term matches
+    (case-insensitively with `iexact=True`), or None. Extra keyword filters
+    compare attributes, e.g. `is_active=True` or `is_system_defined=True`.
+
+    A copy is returned, so callers may assign it to a FK or mutate it without
+    affecting the shared registry.
+    """
+    _, by_term = _indexes()
+    for definition in by_term.get((table_name, term.lower()), ()):
+        if not iexact and definition.term != term:
+            continue
+        if all(getattr(definition, name) == value for name, value in filters.items()):
+            return copy.copy(definition)
+    return None
+
+
+def get_definition_id(table_name, term, iexact=False, **filters):
+    definition = get_definition(table_name, term, iexact=iexact, **filters)
+    return definition.pk if definition else None
+
+
+def get_definition_by_id(pk):
+    """Return a copy of the definition with primary key `pk`, or None."""
+    if pk is None:
+        return None
+    by_id, _ = _indexes()
+    definition = by_id.get(pk)
+    return copy.copy(definition) if definition else None
+
+
+def get_definitions(table_name, **filters):
+    """Return copies of every definition in `table_name`, ordered by id."""
+    _, by_term = _indexes()
+    found = [
+        definition
+        for (name, _term), definitions in by_term.items() if name == table_name
+        for definition in definitions
+        if all(getattr(definition, attr) == value for attr, value in filters.items())
+    ]
+    return [copy.copy(d) for d in sorted(found, key=lambda d: d.pk)]
+
+
+def _build_bootstrap(by_id):
+    from .serializers import TableDropDownDefinitionSerializer
+
+    active = [d for d in by_id.values() if d.is_active]
+    active.sort(key=lambda d: (d.table_name, d.pk))
+    grouped = {}
+    for row in TableDropDownDefinitionSerializer(active, many=True).data:
+        grouped.setdefault(row["table_name"], []).append(dict(row))
+    body = json.dumps(grouped, sort_keys=True, default=str).encode()
+    return {
+        "definitions": grouped,
+        "etag": '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+    }
+
+
+def get_bootstrap():
+    """
+    Return {"definitions": {table_name: [...]}, "etag": ...} for every active
+    definition. Shares the registry load, so it costs no query when warm.
+    """
+    by_id, _ = _indexes()
+    bootstrap = _local["bootstrap"]
+    if bootstrap is None or _local["by_id"] is not by_id:
+        bootstrap = _build_bootstrap(by_id)
+        with _lock:
+            if _local["by_id"] is by_id:
+                _local["bootstrap"] = bootstrap
+    return bootstrap
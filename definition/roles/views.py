@@ -10,9 +10,9 @@ from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnl
 from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.http import HttpResponse
-import csv
-from django.db.models.fields.files import FieldFile
+from globalconceptBE.exports import csv_response, model_columns, queryset_rows
+from app.imports.jobs import start_import
+from app.imports.serializers import ImportJobSerializer
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -85,68 +85,13 @@ class RoleViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], url_path='export-csv')
     def export_csv(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="Roles.csv"'
-
-        # Create a CSV writer
-        writer = csv.writer(response)
-
-        model = Roles
-        fields = [field.name for field in model._meta.fields]
-
-        writer.writerow(fields)
-
-        orgs = model.objects.all()
-        for obj in orgs:
-            row = []
-            for field in fields:
-                value = getattr(obj, field)
-                if isinstance(value, FieldFile):  
-                    value = value.url if value and hasattr(value, 'url') else ''
-                row.append(value)
-            writer.writerow(row)
-
-        return response
+        # Streamed in chunks (see globalconceptBE/exports.py); large or XLSX
+        # exports go through the export jobs in app/exports instead.
+        return csv_response(queryset_rows(Roles.objects.order_by('pk'), model_columns(Roles)), 'Roles.csv')
     
     @action(detail=False, methods=['post'], url_path='bulk-create')
     def bulk_create(self, request):
-        if 'file' not in request.FILES:
-            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
-
-        file = request.FILES['file']
-        decoded_file = file.read().decode('utf-8').splitlines()
-        reader = csv.DictReader(decoded_file)
-
-        created_groups = []
-        errors = []
-
-        def normalize(value):
-            return value.strip().lower() if value else None
-
-        for row in reader:
-            if not row.get('name'):
-                errors.append({'row': row, 'error': 'Name is required'})
-                continue
-
-            row_data = {
-                'name': row['name'],
-                'is_active': False,
-            }
-
-            serializer = BaseRoleSerializer(data=row_data)
-            if serializer.is_valid():
-                drug = serializer.save()
-                created_groups.append(drug)
-            else:
-                errors.append({'row': row, 'error': serializer.errors})
-
-        if errors:
-            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response(
-            {'message': f'{len(created_groups)} Role(s) created successfully'},
-            status=status.HTTP_201_CREATED
-        )
+        return _start_roles_import(request)
     
 
 
@@ -170,69 +115,32 @@ class RoleDownloadCSVView(APIView):
     #permission_classes = [IsAuthenticated] 
 
     def get(self, request, *args, **kwargs):
-        
-        response = HttpResponse(
-            content_type="text/csv",
-            headers={"Content-Disposition": 'attachment; filename="roles.csv"'},
-        )
-
-        writer = csv.writer(response)
-        
-        # Write the header row
-        writer.writerow([
-            "name", "is_active",
-        ])
-        
-        # Optionally, you can add example data rows
+        # The header row, then a few example rows
         example_data = [
-            [ "Human Resources", True],
-            [ "role test", True],
-            [ "role test", True],
+            ["name", "is_active"],
+            ["Human Resources", True],
+            ["role test", True],
+            ["role test", True],
         ]
-        
-        for row in example_data:
-            writer.writerow(row)
-
-        return response 
+        return csv_response(example_data, 'roles.csv')
 
 
 class RoleBulkCreateView(APIView):
     def post(self, request, *args, **kwargs):
-        if 'file' not in request.FILES:
-            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
-
-        file = request.FILES['file']
-        decoded_file = file.read().decode('utf-8').splitlines()
-        reader = csv.DictReader(decoded_file)
-
-        created_groups = []
-        errors = []
-
-        def normalize(value):
-            return value.strip().lower() if value else None
-
-        for row in reader:
-            if not row.get('name'):
-                errors.append({'row': row, 'error': 'Name is required'})
-                continue
-
-            row_data = {
-                'name': row['name'],
-                'is_active': False,
-            }
-
-            serializer = BaseRoleSerializer(data=row_data)
-            if serializer.is_valid():
-                drug = serializer.save()
-                created_groups.append(drug)
-            else:
-                errors.append({'row': row, 'error': serializer.errors})
-
-        if errors:
-            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response(
-            {'message': f'{len(created_groups)} Role(s) created successfully'},
-            status=status.HTTP_201_CREATED
-        )
-    
+        return _start_roles_import(request)
+
+
+def _start_roles_import(request):
+    """
+    Roles are imported by a background job (app/imports): the file is stored,
+    the response gives the job, and the user is notified with the counts when
+    it finishes. Staff can follow progress and per-row errors at
+    import-jobs/<id>/.
+    """
+    if 'file' not in request.FILES:
+        return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+    file = request.FILES['file']
+    if not file.name.lower().endswith(('.csv', '.xlsx')):
+        return Response({'error': 'Upload a .csv or .xlsx file'}, status=status.HTTP_400_BAD_REQUEST)
+    job = start_import(request.user, 'definition.roles', file)
+    return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from definition.models import TableDropDownDefinition
+from definition.registry import invalidate
+from globalconceptBE.on_commit import run_once_on_commit
+
+
+@receiver(post_save, sender=TableDropDownDefinition)
+@receiver(post_delete, sender=TableDropDownDefinition)
+def invalidate_definition_registry(sender, **kwargs):
+    """
+    Any definition write makes every process reload the registry, once the
+    write is committed: a reload before that would cache the old rows under
+    the new version.
+    """
+    run_once_on_commit(invalidate)
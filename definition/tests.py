@@ -1,3 +1,85 @@
+"""
+RegistryTests: the in-process definition registry (definition/registry.py),
+its term matching and its invalidation once definition writes commit.
+
+BootstrapTests: the definitions bootstrap endpoint and its If-None-Match
+handling (globalconceptBE/etags.py).
+"""
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from definition import registry
+from definition.models import TableDropDownDefinition
+
+
+class RegistryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.open = TableDropDownDefinition.objects.create(table_name="registry_test", term="Open")
+        cls.closed = TableDropDownDefinition.objects.create(table_name="registry_test", term="Closed", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_terms_match_exactly_unless_iexact(self):
+        self.assertEqual(registry.get_definition("registry_test", "Open").pk, self.open.pk)
+        self.assertIsNone(registry.get_definition("registry_test", "open"))
+        self.assertEqual(registry.get_definition("registry_test", "open", iexact=True).pk, self.open.pk)
+        self.assertIsNone(registry.get_definition("other_table", "Open", iexact=True))
+
+    def test_filters_and_listing(self):
+        self.assertIsNone(registry.get_definition("registry_test", "Closed", is_active=True))
+        self.assertEqual(registry.get_definition_id("registry_test", "Closed"), self.closed.pk)
+        self.assertEqual(
+            [d.pk for d in registry.get_definitions("registry_test")], [self.open.pk, self.closed.pk])
+        self.assertEqual(registry.get_definition_by_id(self.open.pk).term, "Open")
+
+    def test_warm_lookups_do_no_queries(self):
+        registry.get_definition("registry_test", "Open")
+        with self.assertNumQueries(0):
+            registry.get_definition("registry_test", "Open")
+            registry.get_definition_by_id(self.closed.pk)
+            registry.get_bootstrap()
+
+    def test_returns_copies(self):
+        registry.get_definition("registry_test", "Open").term = "Changed"
+        self.assertEqual(registry.get_definition_by_id(self.open.pk).term, "Open")
+
+    def test_write_reloads_the_registry_after_commit(self):
+        self.assertIsNone(registry.get_definition("registry_test", "Pending"))
+        with self.captureOnCommitCallbacks() as callbacks:
+            TableDropDownDefinition.objects.create(table_name="registry_test", term="Pending")
+            # Not committed yet: the registry is not reloaded (and re-cached) early.
+            self.assertIsNone(registry.get_definition("registry_test", "Pending"))
+        for callback in callbacks:
+            callback()
+        self.assertIsNotNone(registry.get_definition("registry_test", "Pending"))
+
+    def test_bootstrap_lists_active_definitions(self):
+        terms = [row["term"] for row in registry.get_bootstrap()["definitions"]["registry_test"]]
+        self.assertEqual(terms, ["Open"])
+
+
+class BootstrapTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        TableDropDownDefinition.objects.create(table_name="registry_test", term="Open")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse("definition-bootstrap")
 
-# Create your tests here.
+    def test_matching_etag_gets_a_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([row["term"] for row in first.json()["registry_test"]], ["Open"])
+        etag = first["ETag"]
+        for header in (etag, f'"stale", {etag}', f"W/{etag}", "*"):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual((response.status_code, response["ETag"]), (304, etag), header)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
@@ -6,6 +6,8 @@ from rest_framework.decorators import action  # ✅ Needed for @action
 
 from definition.serializers import TableDropDownDefinitionSerializer
 from .models import TableDropDownDefinition
+from .registry import get_bootstrap
+from globalconceptBE.etags import etag_response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
@@ -33,7 +35,7 @@ class TableDropDownDefinitionViewSet(viewsets.ModelViewSet):
     lookup_field = 'id'
 
     def get_permissions(self):
-        if self.action == 'get_by_table_name':
+        if self.action in ('get_by_table_name', 'bootstrap'):
             return [AllowAny()]
         return [IsAuthenticated()]
 
@@ -51,3 +53,13 @@ class TableDropDownDefinitionViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(filtered_qs, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='bootstrap')
+    def bootstrap(self, request):
+        """
+        Every active definition grouped by table_name, in one response.
+        Replaces the per-table calls on app load; honours If-None-Match so a
+        warm client gets a 304.
+        """
+        data = get_bootstrap()
+        return etag_response(request, data["definitions"], data["etag"])
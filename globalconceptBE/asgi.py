@@ -23,14 +23,20 @@ import notification.routing
 import chat.routing
 from app import routings as app_routings  # import the module, not directly the list
 
+from globalconceptBE.websocket_auth import JWTAuthMiddleware
+
 # ✅ Step 4: Combine all websocket patterns safely
+# JWTAuthMiddleware validates ?token= once per connection and puts the user and
+# the rooms they may join in the scope (see globalconceptBE/websocket_auth.py).
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            notification.routing.websocket_urlpatterns +
-            chat.routing.websocket_urlpatterns +
-            app_routings.websocket_urlpatterns
+        JWTAuthMiddleware(
+            URLRouter(
+                notification.routing.websocket_urlpatterns +
+                chat.routing.websocket_urlpatterns +
+                app_routings.websocket_urlpatterns
+            )
         )
     ),
 })
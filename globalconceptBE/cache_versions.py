@@ -0,0 +1,37 @@
+"""
+Version keys for cached read models.
+
+A cached value is stored under a key that includes the current version of
+what it was built from, and invalidating it just bumps that version:
+
+    data_key = f"dashboard:{user_id}:{current_version(version_key)}"
+    ...
+    bump(version_key)       # every process rebuilds on its next read
+
+Old entries are never read again and expire on their own. Versions are
+random and stored without expiry, so two processes never agree on a version
+by accident.
+"""
+import uuid
+
+from django.core.cache import cache
+
+
+def bump(key):
+    """Give `key` a new version; values cached under the old one go unread."""
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def current_versions(*keys):
+    """The current version of every key, in order, creating missing ones."""
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # add() keeps the first writer's value if several workers race here.
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def current_version(key):
+    return current_versions(key)[0]
@@ -0,0 +1,89 @@
+"""
+Dirty-field tracking for models.
+
+`DirtyFieldsMixin` snapshots the tracked field values when a row is loaded
+(`from_db`) and again after every save or `refresh_from_db`, so save() and
+pre_save/post_save receivers can ask what changed without re-reading the row:
+
+    class StudyVisaApplication(DirtyFieldsMixin, models.Model):
+        tracked_fields = ("status", "is_submitted")
+
+    if application.has_changed("status"):
+        old_status_id = application.previous("status")
+
+The snapshot is refreshed at the end of save(), after post_save has been
+sent, so post_save receivers still see the values the row had before the
+save. Compare through the snapshot before calling super().save() in a
+model's own save().
+
+Fields are given by name or attname ("status" or "status_id"); values are
+attnames' raw values, i.e. the primary key for a foreign key. Only a field
+that was deferred when the row was loaded costs a query, once.
+"""
+from django.db.models.constants import LOOKUP_SEP
+
+
+class DirtyFieldsMixin:
+    # Field names to snapshot; None tracks every concrete field.
+    tracked_fields = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls):
+        attnames = cls.__dict__.get("_dirty_attnames")
+        if attnames is None:
+            if cls.tracked_fields is None:
+                attnames = tuple(field.attname for field in cls._meta.concrete_fields)
+            else:
+                attnames = tuple(cls._meta.get_field(name).attname for name in cls.tracked_fields)
+            cls._dirty_attnames = attnames
+        return attnames
+
+    def _attname(self, field):
+        if LOOKUP_SEP in field:
+            raise ValueError(f"Cannot track a related lookup: {field!r}")
+        return self._meta.get_field(field).attname
+
+    def _take_snapshot(self, fields=None):
+        snapshot = self.__dict__.setdefault("_dirty_snapshot", {})
+        attnames = self._tracked_attnames()
+        if fields is not None:
+            wanted = {self._attname(name) for name in fields}
+            attnames = [attname for attname in attnames if attname in wanted]
+        for attname in attnames:
+            # Deferred fields are missing from __dict__; previous() loads them.
+            if attname in self.__dict__:
+                snapshot[attname] = self.__dict__[attname]
+
+    def previous(self, field):
+        """The value `field` had when the row was loaded or last saved (None for a new row)."""
+        attname = self._attname(field)
+        if self._state.adding:
+            return None
+        snapshot = self.__dict__.setdefault("_dirty_snapshot", {})
+        if attname not in snapshot:
+            snapshot[attname] = (
+                type(self)._base_manager.using(self._state.db)
+                .filter(pk=self.pk).values_list(attname, flat=True).first()
+            )
+        return snapshot[attname]
+
+    def has_changed(self, field):
+        """Whether `field` differs from its loaded value (from None for a new row)."""
+        return getattr(self, self._attname(field)) != self.previous(field)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # post_save runs with adding=False; keep previous() at None for it.
+            self._dirty_snapshot = dict.fromkeys(self._tracked_attnames())
+        super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields)
@@ -0,0 +1,38 @@
+"""
+ETag / If-None-Match handling for endpoints that serve versioned content.
+
+    return etag_response(request, data["definitions"], data["etag"])
+
+answers 304 with no body when the client already holds `etag` and the
+payload otherwise, both carrying the ETag. Views that build a different kind
+of response (a file, a 202) use `not_modified` and `with_etag` directly.
+"""
+from rest_framework import status
+from rest_framework.response import Response
+
+# Shared caches may keep the response but must revalidate before reuse.
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def _client_etags(request):
+    header = request.headers.get("If-None-Match", "")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def with_etag(response, etag, cache_control=REVALIDATE):
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(request, etag, cache_control=REVALIDATE):
+    """A 304 response if the client already holds `etag`, else None."""
+    tags = _client_etags(request)
+    if etag in tags or "*" in tags:
+        return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag, cache_control)
+    return None
+
+
+def etag_response(request, payload, etag, cache_control=REVALIDATE):
+    """Return 304 when the client already holds `etag`, else the payload."""
+    return not_modified(request, etag, cache_control) or with_etag(Response(payload), etag, cache_control)
@@ -0,0 +1,157 @@
+"""
+Facet counts for list endpoints.
+
+A viewset lists its facets and mixes in `FacetedListMixin`:
+
+    class VacationOfferViewSet(FacetedListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
+        facets = {
+            "destination": CountryFacet("destination"),
+            "price": RangeFacet("price", [500, 1000, 2500]),
+            "is_active": Facet("is_active"),
+        }
+
+`GET ...?facets=true` then returns the usual page plus a "facets" object:
+for every facet, the values present in the current filter set (everything
+from get_queryset/filter_queryset, pagination aside) with their row counts,
+one grouped query per facet. Range facets also give the bounds of each band
+so the client can turn a chip into min/max filters.
+
+Results are cached per filter fingerprint (the query string without paging
+parameters) under a per-model version; `invalidate_facets(model)` bumps the
+version and is called from the model's save/delete signals.
+"""
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Value, When
+from django_countries import countries
+
+from globalconceptBE.cache_versions import bump, current_version
+
+FACETS_VERSION_KEY = "facets:version:{label}"
+FACETS_DATA_KEY = "facets:{label}:{version}:{fingerprint}"
+
+# Query parameters that page through a result set without changing it.
+PAGING_PARAMS = {"page", "page_size", "facets"}
+
+TRUE_VALUES = {"true", "1", "yes", "on"}
+
+
+def invalidate_facets(model):
+    bump(FACETS_VERSION_KEY.format(label=model._meta.label_lower))
+
+
+def _json_value(value):
+    return str(value) if isinstance(value, Decimal) else value
+
+
+class Facet:
+    """Counts per distinct value of a model field."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def label(self, value):
+        return value
+
+    def counts(self, queryset):
+        rows = (
+            queryset.order_by()
+            .values(self.field)
+            .annotate(count=Count("pk"))
+            .order_by("-count", self.field)
+        )
+        return [
+            {"value": _json_value(row[self.field]), "label": self.label(row[self.field]), "count": row["count"]}
+            for row in rows
+        ]
+
+
+class CountryFacet(Facet):
+    def label(self, value):
+        return countries.name(value) if value else None
+
+
+class RangeFacet(Facet):
+    """Counts per band of a numeric field; `bounds` are the band edges in ascending order."""
+
+    def __init__(self, field, bounds):
+        super().__init__(field)
+        self.bounds = list(bounds)
+
+    def _bands(self):
+        edges = [None] + self.bounds + [None]
+        return list(zip(edges, edges[1:]))
+
+    def counts(self, queryset):
+        bands = self._bands()
+        whens = [
+            When(**{f"{self.field}__lt": upper}, then=Value(index))
+            for index, (_, upper) in enumerate(bands) if upper is not None
+        ]
+        rows = (
+            queryset.order_by()
+            .filter(**{f"{self.field}__isnull": False})
+            .annotate(_band=Case(*whens, default=Value(len(bands) - 1), output_field=IntegerField()))
+            .values("_band")
+            .annotate(count=Count("pk"))
+        )
+        found = {row["_band"]: row["count"] for row in rows}
+        result = []
+        for index, (lower, upper) in enumerate(bands):
+            if index not in found:
+                continue
+            if lower is None:
+                label = f"under {upper}"
+            elif upper is None:
+                label = f"{lower}+"
+            else:
+                label = f"{lower}-{upper}"
+            result.append({"value": label, "label": label, "min": lower, "max": upper, "count": found[index]})
+        return result
+
+
+class FacetedListMixin:
+    """Viewset mixin: add facet counts to list responses when ?facets=true."""
+
+    facets = {}
+    facets_param = "facets"
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        wanted = str(request.query_params.get(self.facets_param, "")).strip().lower() in TRUE_VALUES
+        if wanted and isinstance(response.data, dict):
+            response.data["facets"] = self.get_facets()
+        return response
+
+    def _facet_fingerprint(self):
+        params = sorted(
+            (key, value)
+            for key, values in self.request.query_params.lists() if key not in PAGING_PARAMS
+            for value in values
+        )
+        return hashlib.sha256(repr(params).encode()).hexdigest()
+
+    def get_facets(self):
+        model = self.get_queryset().model
+        key = FACETS_DATA_KEY.format(
+            label=model._meta.label_lower,
+            version=current_version(FACETS_VERSION_KEY.format(label=model._meta.label_lower)),
+            fingerprint=self._facet_fingerprint(),
+        )
+        data = cache.get(key)
+        if data is None:
+            data = self.compute_facets()
+            cache.set(key, data, getattr(settings, "OFFER_FACETS_CACHE_SECONDS", 300))
+        return data
+
+    def compute_facets(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if queryset.query.is_sliced:
+            # ?limit= narrows the page, not the filter set the facets describe.
+            queryset = queryset._chain()
+            queryset.query.clear_limits()
+        queryset = queryset.prefetch_related(None).select_related(None)
+        return {name: facet.counts(queryset) for name, facet in self.facets.items()}
@@ -0,0 +1,465 @@
+"""
+Chunked table imports.
+
+`read_rows(fileobj, filename)` yields one dict per data row (header -> text)
+from a CSV or XLSX upload without loading the whole file. Values are strings
+with surrounding whitespace removed; empty cells are "". XLSX files are read
+with the standard library (the first worksheet, shared and inline strings,
+numbers and booleans); formulas give their cached value.
+
+`ModelImporter(model)` turns those rows into rows of `model`, a chunk at a
+time, for the background import jobs in app/imports:
+
+    importer = ModelImporter(WorkVisaOffer)
+    for chunk in chunked(read_rows(upload, upload.name), 1000):
+        result = importer.import_chunk(chunk)
+
+Columns are field names (or attnames, "status_id"). Rows with an `id` of an
+existing row update the columns present in the file; other rows are
+created. Per chunk, foreign keys are resolved with one query per column
+(TableDropDownDefinition from the in-process registry, no query at all),
+existing rows are loaded with one query, and the valid rows are written
+with one bulk_create and one bulk_update. Invalid rows are reported by row
+number and skipped; they do not stop the rest of the chunk.
+
+bulk_create/bulk_update do not call save() or send model signals. The
+importer refreshes search columns itself and sends `rows_imported` after
+each chunk commits, for receivers that would otherwise listen to post_save.
+Models with any other save() or with pre_save/post_save receivers are written
+row by row with save() instead (see `writes_row_by_row`), unless the caller
+passes save_rows=False because it covers them another way.
+"""
+import csv
+import io
+import json
+import posixpath
+import zipfile
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import Signal
+from django.utils import timezone
+
+from globalconceptBE.search import SearchDocumentModel, reindex
+
+# Sent with sender=model, created=[pk, ...], updated=[pk, ...] once a chunk commits.
+rows_imported = Signal()
+
+TRUE_VALUES = {"true", "1", "yes", "y", "on"}
+FALSE_VALUES = {"false", "0", "no", "n", "off"}
+
+# Fields tried, in order, to find a related row by a value that is not its id.
+NATURAL_KEYS = ("name", "title", "term", "code", "email", "custom_id")
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+class UnsupportedFile(ValueError):
+    pass
+
+
+def read_rows(fileobj, filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "csv":
+        return read_csv(fileobj)
+    if extension == "xlsx":
+        return read_xlsx(fileobj)
+    raise UnsupportedFile(f"Unsupported file type {extension!r}; upload a .csv or .xlsx file.")
+
+
+def _records(rows):
+    header = None
+    for row in rows:
+        if header is None:
+            header = [str(cell).strip() for cell in row]
+            continue
+        values = [str(cell).strip() if cell is not None else "" for cell in row]
+        if not any(values):
+            continue
+        values += [""] * (len(header) - len(values))
+        yield {name: value for name, value in zip(header, values) if name}
+
+
+def read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from _records(csv.reader(text))
+    finally:
+        text.detach()
+
+
+def _column_index(ref):
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def _first_sheet(package):
+    """Path of the first worksheet, following the workbook relationships."""
+    names = set(package.namelist())
+    try:
+        with package.open("xl/workbook.xml") as workbook:
+            sheet = next(
+                element for _, element in iterparse(workbook) if element.tag == f"{_MAIN_NS}sheet"
+            )
+        rel_id = sheet.get(f"{_REL_NS}id")
+        with package.open("xl/_rels/workbook.xml.rels") as rels:
+            for _, element in iterparse(rels):
+                if element.tag == f"{_PACKAGE_REL_NS}Relationship" and element.get("Id") == rel_id:
+                    target = element.get("Target").lstrip("/")
+                    path = target if target.startswith("xl/") else posixpath.join("xl", target)
+                    if path in names:
+                        return path
+    except (KeyError, StopIteration):
+        pass
+    if "xl/worksheets/sheet1.xml" in names:
+        return "xl/worksheets/sheet1.xml"
+    raise UnsupportedFile("The workbook has no worksheet.")
+
+
+def _shared_strings(package):
+    if "xl/sharedStrings.xml" not in package.namelist():
+        return []
+    strings = []
+    with package.open("xl/sharedStrings.xml") as handle:
+        for _, element in iterparse(handle):
+            if element.tag == f"{_MAIN_NS}si":
+                strings.append("".join(node.text or "" for node in element.iter(f"{_MAIN_NS}t")))
+                element.clear()
+    return strings
+
+
+def _xlsx_rows(package):
+    strings = _shared_strings(package)
+    with package.open(_first_sheet(package)) as handle:
+        for _, element in iterparse(handle):
+            if element.tag != f"{_MAIN_NS}row":
+                continue
+            row = []
+            for cell in element.iter(f"{_MAIN_NS}c"):
+                ref = cell.get("r")
+                if ref:
+                    row += [""] * (_column_index(ref) - len(row))
+                kind = cell.get("t")
+                value = cell.find(f"{_MAIN_NS}v")
+                if kind == "inlineStr":
+                    text = "".join(node.text or "" for node in cell.iter(f"{_MAIN_NS}t"))
+                elif value is None or value.text is None:
+                    text = ""
+                elif kind == "s":
+                    text = strings[int(value.text)]
+                elif kind == "b":
+                    text = "TRUE" if value.text == "1" else "FALSE"
+                else:
+                    text = value.text
+                    if kind is None and text.endswith(".0"):
+                        text = text[:-2]
+                row.append(text)
+            element.clear()
+            yield row
+
+
+def read_xlsx(fileobj):
+    try:
+        package = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise UnsupportedFile("The file is not a valid .xlsx workbook.")
+    with package:
+        yield from _records(_xlsx_rows(package))
+
+
+def chunked(iterable, size):
+    """Lists of up to `size` (row number, row) pairs; data rows start at 2."""
+    rows = enumerate(iterable, start=2)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ChunkResult:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        # {row number: {column: [messages]}}
+        self.errors = {}
+
+    def add_error(self, number, column, message):
+        self.errors.setdefault(number, {}).setdefault(column, []).append(str(message))
+
+
+def _messages(error):
+    return error.messages if isinstance(error, ValidationError) else [str(error)]
+
+
+def writes_row_by_row(model):
+    """True if bulk writes would skip work that `model`'s save() or signal receivers do."""
+    if model._meta.parents:
+        # Multi-table inheritance cannot be bulk inserted.
+        return True
+    # SearchDocumentModel.save only fills the search columns, which the importer reindexes.
+    if model.save not in (models.Model.save, SearchDocumentModel.save):
+        return True
+    return pre_save.has_listeners(model) or post_save.has_listeners(model)
+
+
+class ModelImporter:
+    """
+    Writes rows of text into `model`.
+
+    `fields` limits the columns that are read (default: every editable
+    concrete field but `exclude`); `values` are set on every created row.
+    `save_rows` writes each row with save() rather than in bulk; by default
+    it is `writes_row_by_row(model)`.
+    """
+
+    def __init__(self, model, fields=None, exclude=("password",), values=None, save_rows=None):
+        self.model = model
+        self.values = values or {}
+        self.save_rows = writes_row_by_row(model) if save_rows is None else save_rows
+        self.fields = {}
+        for field in model._meta.concrete_fields:
+            if field.name in exclude or (fields is not None and field.name not in fields):
+                continue
+            if field.primary_key and field.name == "id":
+                continue
+            if not field.editable or getattr(field, "parent_link", False):
+                continue
+            self.fields[field.name] = field
+            if field.attname != field.name:
+                self.fields[field.attname] = field
+        self._related = {}
+
+    def split_columns(self, header):
+        """(columns that will be read, columns that will be ignored)."""
+        known = [column for column in header if column == "id" or column in self.fields]
+        return known, [column for column in header if column not in known]
+
+    # ---- values -------------------------------------------------------------
+
+    def _to_python(self, field, value):
+        if value == "":
+            if field.null:
+                return None
+            if field.has_default():
+                return field.get_default()
+            if isinstance(field, (models.CharField, models.TextField)):
+                return ""
+            raise ValidationError("This field is required.")
+        if isinstance(field, models.BooleanField):
+            if value.lower() in TRUE_VALUES:
+                return True
+            if value.lower() in FALSE_VALUES:
+                return False
+            raise ValidationError(f"“{value}” is not true or false.")
+        if isinstance(field, models.JSONField):
+            try:
+                return json.loads(value)
+            except ValueError:
+                raise ValidationError("Enter valid JSON.")
+        return field.to_python(value)
+
+    def _natural_key(self, related_model):
+        names = {field.name for field in related_model._meta.concrete_fields}
+        return next((name for name in NATURAL_KEYS if name in names), None)
+
+    def resolve_foreign_keys(self, field, values):
+        """{text: pk} for the values of one foreign key column; unknown values are left out."""
+        from definition.models import TableDropDownDefinition
+        from definition import registry
+
+        cache = self._related.setdefault(field.name, {})
+        missing = {value for value in values if value and value not in cache}
+        related_model = field.related_model
+        if missing and related_model is TableDropDownDefinition:
+            table_name = (field.get_limit_choices_to() or {}).get("table_name")
+            for value in missing:
+                definition = registry.get_definition_by_id(int(value)) if value.isdigit() else None
+                if definition is None and table_name:
+                    definition = registry.get_definition(table_name, value, iexact=True)
+                if definition is not None and (not table_name or definition.table_name == table_name):
+                    cache[value] = definition.pk
+        elif missing:
+            manager = related_model._base_manager
+            ids = {value for value in missing if value.isdigit()}
+            for pk in manager.filter(pk__in=ids).values_list("pk", flat=True):
+                cache[str(pk)] = pk
+            natural_key = self._natural_key(related_model)
+            names = missing - set(cache)
+            if natural_key and names:
+                for name, pk in manager.filter(**{f"{natural_key}__in": names}).values_list(natural_key, "pk"):
+                    cache.setdefault(str(name), pk)
+        return cache
+
+    # ---- chunks -------------------------------------------------------------
+
+    def before_create(self, objs):
+        """Hook for what save() would have done to new rows written in bulk."""
+
+    def import_chunk(self, chunk):
+        """Validate and write one list of (row number, row) pairs; returns a ChunkResult."""
+        result = ChunkResult()
+        if not chunk:
+            return result
+        columns, _ = self.split_columns(list(chunk[0][1]))
+        foreign_keys = {}
+        for column in columns:
+            field = self.fields.get(column)
+            if field is not None and field.is_relation:
+                foreign_keys[column] = self.resolve_foreign_keys(field, {row.get(column, "") for _, row in chunk})
+
+        ids = {}
+        for number, row in chunk:
+            value = row.get("id", "")
+            if value:
+                try:
+                    ids[number] = self.model._meta.pk.to_python(value)
+                except ValidationError as error:
+                    result.add_error(number, "id", _messages(error)[0])
+        existing = self.model._base_manager.in_bulk(set(ids.values()))
+
+        new, changed, update_fields = [], [], set()
+        for number, row in chunk:
+            if number in result.errors:
+                continue
+            values = {}
+            for column in columns:
+                field = self.fields.get(column)
+                if field is None:
+                    continue
+                text = row.get(column, "")
+                if field.is_relation:
+                    if text == "":
+                        if not field.null:
+                            result.add_error(number, column, "This field is required.")
+                        values[field.attname] = None
+                    elif text in foreign_keys[column]:
+                        values[field.attname] = foreign_keys[column][text]
+                    else:
+                        result.add_error(number, column, f"No {field.related_model._meta.verbose_name} “{text}”.")
+                    continue
+                try:
+                    values[field.attname] = self._to_python(field, text)
+                except ValidationError as error:
+                    for message in _messages(error):
+                        result.add_error(number, column, message)
+            if number in result.errors:
+                continue
+
+            obj = existing.get(ids.get(number)) if number in ids else None
+            if number in ids and obj is None:
+                result.add_error(number, "id", f"No {self.model._meta.verbose_name} with id {ids[number]}.")
+                continue
+            if obj is None:
+                obj = self.model(**{**values, **self.values})
+                exclude = {field.name for field in self.model._meta.fields if field.is_relation}
+            else:
+                for attname, value in values.items():
+                    setattr(obj, attname, value)
+                supplied = {self.fields[column].name for column in columns if column in self.fields}
+                exclude = {field.name for field in self.model._meta.fields if field.is_relation}
+                exclude |= {field.name for field in self.model._meta.fields if field.name not in supplied}
+                update_fields |= supplied
+            try:
+                obj.clean_fields(exclude=exclude)
+            except ValidationError as error:
+                for column, messages in error.message_dict.items():
+                    for message in messages:
+                        result.add_error(number, column, message)
+                continue
+            (changed if obj.pk else new).append((number, obj))
+
+        if changed:
+            now = timezone.now()
+            for field in self.model._meta.concrete_fields:
+                if getattr(field, "auto_now", False):
+                    update_fields.add(field.name)
+                    for _, obj in changed:
+                        setattr(obj, field.attname, now)
+        self._write(new, changed, sorted(update_fields), result)
+        return result
+
+    def _write(self, new, changed, update_fields, result):
+        if self.save_rows:
+            self._save_each(new, changed, result)
+            return
+        manager = self.model._base_manager
+
+        def create(objs):
+            self.before_create(objs)
+            manager.bulk_create(objs)
+
+        try:
+            with transaction.atomic():
+                if new:
+                    create([obj for _, obj in new])
+                if changed and update_fields:
+                    manager.bulk_update([obj for _, obj in changed], update_fields)
+                self._after_write(new, changed, result)
+        except IntegrityError:
+            # Something in the chunk broke a constraint: write row by row to find it.
+            result.created, result.updated = [], []
+            for _, obj in new:
+                obj.pk = None
+                obj._state.adding = True
+            with transaction.atomic():
+                for number, obj in new:
+                    try:
+                        with transaction.atomic():
+                            create([obj])
+                    except IntegrityError as error:
+                        obj.pk = None
+                        result.add_error(number, "__all__", error)
+                for number, obj in changed:
+                    try:
+                        with transaction.atomic():
+                            if update_fields:
+                                manager.bulk_update([obj], update_fields)
+                    except IntegrityError as error:
+                        result.add_error(number, "__all__", error)
+                self._after_write(
+                    [(number, obj) for number, obj in new if number not in result.errors],
+                    [(number, obj) for number, obj in changed if number not in result.errors],
+                    result,
+                )
+
+    def _save_each(self, new, changed, result):
+        """save() every row, so the model's own save() and signals run; a failing row is skipped."""
+        with transaction.atomic():
+            for number, obj in new:
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                except (IntegrityError, ValidationError) as error:
+                    obj.pk = None
+                    for message in _messages(error):
+                        result.add_error(number, "__all__", message)
+            for number, obj in changed:
+                try:
+                    with transaction.atomic():
+                        obj.save()
+                except (IntegrityError, ValidationError) as error:
+                    for message in _messages(error):
+                        result.add_error(number, "__all__", message)
+        result.created = [obj.pk for number, obj in new if number not in result.errors]
+        result.updated = [obj.pk for number, obj in changed if number not in result.errors]
+
+    def _after_write(self, new, changed, result):
+        result.created = [obj.pk for _, obj in new]
+        result.updated = [obj.pk for _, obj in changed]
+        written = result.created + result.updated
+        if written and issubclass(self.model, SearchDocumentModel):
+            reindex(self.model, pks=written)
+        if written:
+            transaction.on_commit(lambda: rows_imported.send(
+                sender=self.model, created=result.created, updated=result.updated,
+            ))
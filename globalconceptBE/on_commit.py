@@ -0,0 +1,35 @@
+"""
+Deduplicated on-commit work.
+
+`run_once_on_commit(func, *args)` runs func(*args) after the current
+transaction commits, once however many times it was requested for the same
+arguments within that transaction. Signal receivers use it so that a
+serializer writing a row and twenty children does the follow-up work once:
+
+    @receiver(post_save, sender=CVSkill)
+    def refresh(sender, instance, **kwargs):
+        run_once_on_commit(refresh_cv_vector, instance.cv_id)
+
+Every request registers its own callback, because a rolled-back savepoint
+drops the callbacks registered inside it; the first callback to run does the
+work and the others find nothing pending. Outside a transaction func runs
+immediately, as with transaction.on_commit.
+"""
+import threading
+
+from django.db import transaction
+
+_pending = threading.local()
+
+
+def run_once_on_commit(func, *args, using=None):
+    pending = _pending.__dict__.setdefault("keys", set())
+    key = (func, args)
+    pending.add(key)
+
+    def callback():
+        if key in pending:
+            pending.discard(key)
+            func(*args)
+
+    transaction.on_commit(callback, using=using)
@@ -0,0 +1,151 @@
+"""
+Serializer-declared query optimisation.
+
+A serializer lists the relations it reads in its Meta:
+
+    class Meta:
+        model = StudyVisaApplication
+        select_related = ("institution", "status")
+        prefetch_related = ("comments",)
+
+`related_paths(serializer_class)` merges those declarations with what can be
+inferred from the fields themselves (nested serializers and dotted `source`s
+over forward relations), prefixing nested declarations with the field's
+source. `OptimizedQuerySetMixin` applies the result to a viewset's queryset.
+
+`PrefetchCheckedSerializerMixin` watches list serialization when
+PREFETCH_WARNINGS is on (DEBUG by default) and logs a warning when rows after
+the first still issue queries, i.e. the serializer touches a relation that
+was not declared.
+"""
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+
+def _relation(model, name):
+    """Return the relation field `name` on `model`, or None if it is not a relation."""
+    if model is None:
+        return None
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+
+def _forward_single(field):
+    return field.many_to_one or field.one_to_one
+
+
+def _dotted_source_paths(model, source_attrs):
+    """select_related path for a dotted source such as `institution.name`."""
+    parts = []
+    for attr in source_attrs[:-1]:
+        field = _relation(model, attr)
+        if field is None or not _forward_single(field):
+            break
+        parts.append(attr)
+        model = field.related_model
+    return "__".join(parts)
+
+
+@lru_cache(maxsize=None)
+def related_paths(serializer_class):
+    """
+    Return (select_related, prefetch_related) tuples for `serializer_class`,
+    including the declarations of nested serializers.
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    model = getattr(meta, "model", None)
+    select = list(getattr(meta, "select_related", ()))
+    prefetch = list(getattr(meta, "prefetch_related", ()))
+
+    for name, field in serializer_class().fields.items():
+        if getattr(field, "write_only", False):
+            continue
+        source = field.source or name
+        many = isinstance(field, serializers.ListSerializer)
+        nested = field.child if many else field
+
+        if isinstance(nested, serializers.BaseSerializer):
+            relation = _relation(model, source) if source != "*" else None
+            if relation is None:
+                continue
+            child_select, child_prefetch = related_paths(type(nested))
+            if many or not _forward_single(relation):
+                prefetch.append(source)
+                prefetch.extend(f"{source}__{path}" for path in child_select + child_prefetch)
+            else:
+                select.append(source)
+                select.extend(f"{source}__{path}" for path in child_select)
+                prefetch.extend(f"{source}__{path}" for path in child_prefetch)
+        elif "." in source:
+            path = _dotted_source_paths(model, source.split("."))
+            if path:
+                select.append(path)
+
+    return tuple(dict.fromkeys(select)), tuple(dict.fromkeys(prefetch))
+
+
+def optimize_queryset(queryset, serializer_class):
+    """Apply the serializer's related paths to `queryset`."""
+    select, prefetch = related_paths(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class OptimizedQuerySetMixin:
+    """
+    Viewset mixin: select/prefetch whatever the serializer declares.
+    Put it before the DRF viewset base so it wraps the view's get_queryset.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(super().get_queryset(), self.get_serializer_class())
+
+
+class PrefetchCheckedSerializerMixin:
+    """
+    Serializer mixin that flags N+1 access during list serialization.
+    Only the outermost list is checked; the cost is a query counter while
+    PREFETCH_WARNINGS is enabled and nothing otherwise.
+    """
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if not (
+            getattr(settings, "PREFETCH_WARNINGS", False)
+            and isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None
+        ):
+            return super().to_representation(instance)
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            data = super().to_representation(instance)
+
+        rows = getattr(self, "_prefetch_rows", 0) + 1
+        self._prefetch_rows = rows
+        if rows > 1 and queries and not getattr(self, "_prefetch_warned", False):
+            self._prefetch_warned = True
+            logger.warning(
+                "%s issued %s queries for row %s of a list (first: %s). "
+                "Declare the relation in Meta.select_related/prefetch_related.",
+                type(self).__name__, len(queries), rows, queries[0][:200],
+            )
+        return data
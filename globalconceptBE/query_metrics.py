@@ -0,0 +1,176 @@
+"""
+Per-request / per-message SQL instrumentation.
+
+One execute wrapper is attached to every database connection. It does nothing
+unless a `QueryRecorder` is active in the current context, so the cost for
+uninstrumented traffic is one ContextVar lookup per query. Because asgiref
+copies the context into `sync_to_async` / `database_sync_to_async` threads,
+queries run from Channels consumers are attributed to the active recorder too.
+
+HTTP: `QueryMetricsMiddleware` records a request when SQL_INSTRUMENTATION is
+on, or when a staff user sends the SQL_INSTRUMENTATION_HEADER header. It adds
+`Server-Timing` and `X-DB-Queries` headers, logs slow requests and logs
+repeated query fingerprints (likely N+1) with the view name.
+
+Channels: consumers that inherit `QueryMetricsConsumerMixin` record each
+dispatched message the same way (logging only; there are no response headers).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("query_recorder", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def fingerprint(sql):
+    """Normalise `sql` so queries differing only in literals compare equal."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """Collects query count, DB time and fingerprints while active."""
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.started = None
+        self._token = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._token)
+        self.elapsed = time.perf_counter() - self.started
+        return False
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+    def report(self):
+        """Log slow work and likely N+1 patterns for this recorder."""
+        elapsed_ms = self.elapsed * 1000
+        if elapsed_ms >= _setting("SQL_SLOW_REQUEST_MS", 500):
+            logger.warning(
+                "Slow %s: %.0fms total, %s queries, %.0fms in DB",
+                self.label, elapsed_ms, self.count, self.duration * 1000,
+            )
+        for sql, n in self.duplicates(_setting("SQL_NPLUSONE_THRESHOLD", 5)):
+            logger.warning("Possible N+1 in %s: %s x %s", self.label, n, sql[:300])
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    recorder = _current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record(sql, time.perf_counter() - started)
+
+
+def _attach(connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def install():
+    """Attach the wrapper to current and future connections (idempotent)."""
+    connection_created.connect(_attach, dispatch_uid="query_metrics_attach")
+    for connection in connections.all(initialized_only=True):
+        _attach(connection)
+
+
+def _view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return f"{request.method} {request.path}"
+    return f"{request.method} {match.view_name or match._func_path}"
+
+
+class QueryMetricsMiddleware:
+    """
+    Off unless SQL_INSTRUMENTATION is true or a staff user sends the
+    SQL_INSTRUMENTATION_HEADER header (default `X-Debug-SQL`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def _wanted(self, request):
+        if _setting("SQL_INSTRUMENTATION", False):
+            return True
+        header = _setting("SQL_INSTRUMENTATION_HEADER", "X-Debug-SQL")
+        return bool(header and request.headers.get(header))
+
+    def __call__(self, request):
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        with QueryRecorder(request.path) as recorder:
+            response = self.get_response(request)
+
+        # DRF authenticates inside the view and copies the user back onto the
+        # Django request, so JWT staff users are visible here.
+        user = getattr(request, "user", None)
+        if not _setting("SQL_INSTRUMENTATION", False) and not getattr(user, "is_staff", False):
+            return response
+
+        recorder.label = _view_label(request)
+        recorder.report()
+        response["X-DB-Queries"] = str(recorder.count)
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f"total;dur={recorder.elapsed * 1000:.1f}"
+        )
+        return response
+
+
+class QueryMetricsConsumerMixin:
+    """
+    Channels consumer mixin: record every dispatched message when
+    SQL_INSTRUMENTATION is on. Put it before the consumer base class.
+    """
+
+    async def dispatch(self, message):
+        if not _setting("SQL_INSTRUMENTATION", False):
+            return await super().dispatch(message)
+        install()
+        label = f"{type(self).__name__}.{message.get('type', '?')}"
+        with QueryRecorder(label) as recorder:
+            result = await super().dispatch(message)
+        recorder.report()
+        logger.debug("%s: %s queries, %.1fms in DB", label, recorder.count, recorder.duration * 1000)
+        return result
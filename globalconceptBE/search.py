@@ -0,0 +1,191 @@
+"""
+Full-text search for offer models.
+
+A model opts in by extending `SearchDocumentModel` and listing the values to
+index with a weight:
+
+    class VacationOffer(SearchDocumentModel):
+        search_fields = (("title", "A"), ("destination__name", "A"), ("description", "C"))
+
+Paths follow attributes and relations with "__". On save the model stores
+the collected values in `search_text` (lower-cased, on every backend) and,
+on PostgreSQL, a weighted `search_vector`. Rows written without save()
+(bulk_create, queryset.update, renamed related terms) are brought up to date
+with `reindex` (optionally limited to some `pks`) or
+`manage.py rebuild_search_index`.
+
+`search(queryset, q)` is what the viewsets call for `?q=`:
+
+  * PostgreSQL: websearch syntax against `search_vector` (GIN index), OR a
+    pg_trgm word-similarity match on `search_text` (GIN trigram index) so
+    typos still find something; ordered by rank, then similarity.
+  * Other backends (SQLite in tests): every word must occur in
+    `search_text`; the queryset's own ordering is kept.
+
+The extension and the indexes are created by `setup_search` on post_migrate,
+as the project has no migrations to carry them.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models import F, Q, Value
+
+WEIGHTS = ("A", "B", "C", "D")
+
+
+def _config():
+    return getattr(settings, "SEARCH_CONFIG", "english")
+
+
+def _is_postgres(using):
+    return connections[using].vendor == "postgresql"
+
+
+def _resolve(obj, path):
+    for part in path.split("__"):
+        if obj is None:
+            return None
+        obj = getattr(obj, part, None)
+    return obj
+
+
+class SearchDocumentModel(models.Model):
+    search_text = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # (path, weight) pairs; weights "A" (highest) to "D".
+    search_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def search_document(self):
+        """The indexed text of this row, grouped by weight."""
+        grouped = {}
+        for path, weight in self.search_fields:
+            value = _resolve(self, path)
+            if value not in (None, ""):
+                grouped.setdefault(weight, []).append(str(value))
+        return {weight: " ".join(values) for weight, values in grouped.items()}
+
+    def search_columns(self, using=None):
+        """search_text and search_vector values for this row, for save() or update()."""
+        document = self.search_document()
+        text = " ".join(document[weight] for weight in WEIGHTS if weight in document)
+        vector = None
+        if _is_postgres(using or self._state.db or DEFAULT_DB_ALIAS) and document:
+            parts = [
+                SearchVector(Value(document[weight]), weight=weight, config=_config())
+                for weight in WEIGHTS if weight in document
+            ]
+            vector = parts[0]
+            for part in parts[1:]:
+                vector = vector + part
+        return {"search_text": text.lower(), "search_vector": vector}
+
+    def save(self, *args, **kwargs):
+        for name, value in self.search_columns(kwargs.get("using")).items():
+            setattr(self, name, value)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "search_text", "search_vector"}
+        super().save(*args, **kwargs)
+        # The vector was written as an SQL expression; leave it unloaded.
+        self.__dict__.pop("search_vector", None)
+
+
+def search(queryset, q):
+    """Filter `queryset` (of a SearchDocumentModel) by the free text `q`."""
+    q = (q or "").strip()
+    if not q:
+        return queryset
+    if _is_postgres(queryset.db):
+        query = SearchQuery(q, search_type="websearch", config=_config())
+        return (
+            queryset.filter(Q(search_vector=query) | Q(search_text__trigram_word_similar=q.lower()))
+            .annotate(
+                search_rank=SearchRank(F("search_vector"), query),
+                search_similarity=TrigramWordSimilarity(q.lower(), "search_text"),
+            )
+            .order_by("-search_rank", "-search_similarity", "-pk")
+        )
+    for word in q.lower().split():
+        queryset = queryset.filter(search_text__contains=word)
+    return queryset
+
+
+def _related_paths(model):
+    """Forward relations crossed by the search_fields, for select_related."""
+    paths = set()
+    for path, _ in model.search_fields:
+        current, prefix = model, []
+        for part in path.split("__")[:-1]:
+            try:
+                field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not (field.many_to_one or field.one_to_one):
+                break
+            prefix.append(part)
+            paths.add("__".join(prefix))
+            current = field.related_model
+    return sorted(paths)
+
+
+def reindex(model, using=DEFAULT_DB_ALIAS, only_missing=False, batch_size=500, pks=None):
+    """Recompute the search columns of `model`'s rows (or just `pks`); returns the number updated."""
+    queryset = model._base_manager.using(using).select_related(*_related_paths(model))
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    if only_missing:
+        queryset = queryset.filter(search_text="")
+    updated, batch = 0, []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        for name, value in obj.search_columns(using).items():
+            setattr(obj, name, value)
+        batch.append(obj)
+        if len(batch) == batch_size:
+            updated += _write_search_columns(model, using, batch)
+            batch = []
+    return updated + _write_search_columns(model, using, batch)
+
+
+def _write_search_columns(model, using, objs):
+    if objs:
+        model._base_manager.using(using).bulk_update(objs, ["search_text", "search_vector"])
+    return len(objs)
+
+
+def ensure_indexes(model, using=DEFAULT_DB_ALIAS):
+    """Create the GIN indexes for `model` (PostgreSQL only)."""
+    if not _is_postgres(using):
+        return
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_search_vector_gin" ON "{table}" USING gin (search_vector)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_search_text_trgm" ON "{table}" USING gin (search_text gin_trgm_ops)'
+        )
+
+
+def searchable_models(app_config=None):
+    from django.apps import apps
+
+    models_ = app_config.get_models() if app_config else apps.get_models()
+    return [model for model in models_ if issubclass(model, SearchDocumentModel)]
+
+
+def setup_search(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate: create indexes and index rows that have never been indexed."""
+    for model in searchable_models(sender):
+        ensure_indexes(model, using)
+        reindex(model, using, only_missing=True)
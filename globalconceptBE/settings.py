@@ -90,6 +90,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'account',
     'app',
@@ -112,6 +113,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'globalconceptBE.query_metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -145,7 +147,8 @@ ASGI_APPLICATION = 'globalconceptBE.asgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with the user read from the cache.
+        'account.authentication.CachedJWTAuthentication',
         # optionally keep session authentication for browsable API
         'rest_framework.authentication.SessionAuthentication',
     ),
@@ -190,6 +193,22 @@ else:
         }
     }
 
+# Shared cache. Redis keeps cache version keys consistent across web workers;
+# without REDIS_URL each process gets its own local-memory cache.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # ---- Celery configuration ----
 # If REDIS_URL is set, use it for Celery as both the broker and backend.
 # Otherwise, fallback to a local Redis server (for development).
@@ -206,6 +225,14 @@ CELERY_BEAT_SCHEDULE = {
         "task": "wallet.saving_plans.tasks.process_recurring_savings_plans",
         "schedule": 86400.0,  # Every day (in seconds), adjust as needed.
     },
+    "fail-stale-exports": {
+        "task": "app.exports.tasks.fail_stale_exports",
+        "schedule": 600.0,
+    },
+    "fail-stale-imports": {
+        "task": "app.imports.tasks.fail_stale_imports",
+        "schedule": 600.0,
+    },
 }
 
 
@@ -383,4 +410,102 @@ import os
 FLUTTERWAVE_SECRET_KEY     = os.environ.get("FLUTTERWAVE_SECRET_KEY", "")
 FLUTTERWAVE_PUBLIC_KEY     = os.environ.get("FLUTTERWAVE_PUBLIC_KEY", "")
 FLUTTERWAVE_ENCRYPTION_KEY = os.environ.get("FLUTTERWAVE_ENCRYPTION_KEY", "")
-FLUTTERWAVE_WEBHOOK_HASH   = os.environ.get("FLUTTERWAVE_WEBHOOK_HASH", "")
\ No newline at end of file
+FLUTTERWAVE_WEBHOOK_HASH   = os.environ.get("FLUTTERWAVE_WEBHOOK_HASH", "")
+
+# ── Bulk airtime / data disbursement ─────────────────────────────────────────
+AIRTIME_BULK_MAX_ROWS             = int(os.environ.get("AIRTIME_BULK_MAX_ROWS", "1000"))
+AIRTIME_BULK_MAX_WORKERS          = int(os.environ.get("AIRTIME_BULK_MAX_WORKERS", "16"))
+AIRTIME_BULK_PROVIDER_CONCURRENCY = int(os.environ.get("AIRTIME_BULK_PROVIDER_CONCURRENCY", "4"))
+AIRTIME_BULK_CHUNK_SIZE           = int(os.environ.get("AIRTIME_BULK_CHUNK_SIZE", "100"))
+
+# ── Serializer prefetch checks (globalconceptBE/prefetch.py) ─────────────────
+# Log a warning when a list serializer queries per row. On by default in DEBUG.
+PREFETCH_WARNINGS = os.environ.get("PREFETCH_WARNINGS", str(DEBUG)).lower() in ("1", "true", "yes", "on")
+
+# ── SQL instrumentation (globalconceptBE/query_metrics.py) ───────────────────
+# Off by default. SQL_INSTRUMENTATION=true records every request/consumer
+# message; otherwise staff users can opt in per request with the header below.
+SQL_INSTRUMENTATION        = os.environ.get("SQL_INSTRUMENTATION", "False").lower() in ("1", "true", "yes", "on")
+SQL_INSTRUMENTATION_HEADER = os.environ.get("SQL_INSTRUMENTATION_HEADER", "X-Debug-SQL")
+SQL_SLOW_REQUEST_MS        = int(os.environ.get("SQL_SLOW_REQUEST_MS", "500"))
+SQL_NPLUSONE_THRESHOLD     = int(os.environ.get("SQL_NPLUSONE_THRESHOLD", "5"))
+
+# ── External provider base URLs ──────────────────────────────────────────────
+# Point every provider client at the local simulator with
+# PROVIDER_SIMULATOR_URL=http://127.0.0.1:8765 (python manage.py provider_simulator).
+PROVIDER_SIMULATOR_URL   = os.environ.get("PROVIDER_SIMULATOR_URL", "").rstrip("/")
+AMADEUS_API_BASE_URL     = os.environ.get("AMADEUS_API_BASE_URL", "https://test.api.amadeus.com")
+FLUTTERWAVE_API_BASE_URL = os.environ.get("FLUTTERWAVE_API_BASE_URL", "https://api.flutterwave.com")
+PREMIUMSUB_API_BASE_URL  = os.environ.get("PREMIUMSUB_API_BASE_URL", "https://premiumsub.com.ng")
+if PROVIDER_SIMULATOR_URL:
+    AMADEUS_API_BASE_URL     = f"{PROVIDER_SIMULATOR_URL}/amadeus"
+    FLUTTERWAVE_API_BASE_URL = f"{PROVIDER_SIMULATOR_URL}/flutterwave"
+    PREMIUMSUB_API_BASE_URL  = f"{PROVIDER_SIMULATOR_URL}/premiumsub"
+
+# ── Customer dashboard cache (account/dashboard.py) ──────────────────────────
+# Entries are invalidated by signals; the timeout only bounds memory use.
+CUSTOMER_DASHBOARD_CACHE_SECONDS = int(os.environ.get("CUSTOMER_DASHBOARD_CACHE_SECONDS", "600"))
+
+# ── User custom_id allocation (account/custom_ids.py) ────────────────────────
+# Keys the permutation that turns the counter into codes. Set it once and never
+# change it: a new key lets new codes collide with the ones already issued.
+CUSTOM_ID_KEY = os.environ.get("CUSTOM_ID_KEY", "")
+
+# ── Offer search (globalconceptBE/search.py) ─────────────────────────────────
+# Text search configuration used for the offers' search vectors and ?q= queries.
+SEARCH_CONFIG = os.environ.get("SEARCH_CONFIG", "english")
+
+# ── Offer facets (globalconceptBE/facets.py) ─────────────────────────────────
+# Entries are invalidated by signals; the timeout only bounds memory use.
+OFFER_FACETS_CACHE_SECONDS = int(os.environ.get("OFFER_FACETS_CACHE_SECONDS", "300"))
+
+# ── CV-to-job matching (app/cv_builder/matching.py) ──────────────────────────
+# Changed vectors are scored from an overlay until this many accumulate, then
+# the in-process NumPy matrix and IDF weights are rebuilt.
+MATCH_INDEX_OVERLAY_LIMIT = int(os.environ.get("MATCH_INDEX_OVERLAY_LIMIT", "500"))
+
+# ── Table exports (globalconceptBE/exports.py, app/exports) ──────────────────
+# Rows are read from the database in chunks of EXPORT_CHUNK_SIZE. CSV exports
+# up to EXPORT_STREAM_MAX_ROWS rows stream in the response; larger ones, and
+# every XLSX export, are written by a background job. A job still running
+# after EXPORT_JOB_TIMEOUT_SECONDS is taken for dead and failed.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+EXPORT_STREAM_MAX_ROWS = int(os.environ.get("EXPORT_STREAM_MAX_ROWS", "50000"))
+EXPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get("EXPORT_JOB_TIMEOUT_SECONDS", "3600"))
+
+# ── Table imports (globalconceptBE/imports.py, app/imports) ──────────────────
+# Import jobs validate and write IMPORT_CHUNK_SIZE rows per transaction. Only
+# the first IMPORT_MAX_REPORTED_ERRORS row errors are kept on the job. A job
+# still running after IMPORT_JOB_TIMEOUT_SECONDS is taken for dead and failed.
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get("IMPORT_MAX_REPORTED_ERRORS", "500"))
+IMPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get("IMPORT_JOB_TIMEOUT_SECONDS", "3600"))
+
+# ── Effective staff permissions (definition/permissions/effective.py) ────────
+# Entries are invalidated by signals; the timeout only bounds memory use.
+EFFECTIVE_PERMISSIONS_CACHE_SECONDS = int(os.environ.get("EFFECTIVE_PERMISSIONS_CACHE_SECONDS", "3600"))
+
+# ── JWT authentication (account/authentication.py) ──────────────────────────
+# Authenticated users are cached for this long; saves and deletes invalidate
+# them, the timeout bounds staleness after queryset.update(). Tokens carry the
+# email, first name and user_type term unless JWT_EMBED_USER_CLAIMS is off.
+AUTH_USER_CACHE_SECONDS = int(os.environ.get("AUTH_USER_CACHE_SECONDS", "60"))
+JWT_EMBED_USER_CLAIMS = os.environ.get("JWT_EMBED_USER_CLAIMS", "True").lower() in ("1", "true", "yes", "on")
+
+# ── Storage (globalconceptBE/storage.py) ─────────────────────────────────────
+# Django 5.1+ reads STORAGES only; DEFAULT_FILE_STORAGE / STATICFILES_STORAGE
+# above are ignored, and "default" and "staticfiles" keep the local storages
+# actually in use. "job_files" holds files that web and Celery processes
+# hand to each other (CV renders, exports, imports): Cloudinary raw storage
+# when Cloudinary is configured, else MEDIA_ROOT, which needs web and
+# workers on one host.
+JOB_FILES_STORAGE_BACKEND = os.environ.get("JOB_FILES_STORAGE_BACKEND") or (
+    "cloudinary_storage.storage.RawMediaCloudinaryStorage"
+    if CLOUDINARY_STORAGE["CLOUD_NAME"]
+    else "django.core.files.storage.FileSystemStorage"
+)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "job_files": {"BACKEND": JOB_FILES_STORAGE_BACKEND},
+}
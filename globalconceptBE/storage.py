@@ -0,0 +1,14 @@
+"""
+Storage for files written by one process and read by another.
+
+CV renders, export files and import uploads are written by the web process or
+a Celery worker and read by the other, which may run on another host, so they
+live in the "job_files" storage (settings.STORAGES) rather than on local disk:
+
+    file = models.FileField(upload_to=..., storage=job_file_storage)
+"""
+from django.core.files.storage import storages
+
+
+def job_file_storage():
+    return storages["job_files"]
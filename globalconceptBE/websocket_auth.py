@@ -0,0 +1,131 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers cannot set headers on a WebSocket handshake, so the access token is
+sent in the query string (`ws/...?token=<access token>`); an
+`Authorization: Bearer <token>` header works too. `JWTAuthMiddleware`
+validates it once, when the socket connects, and puts in the scope:
+
+  * scope["user"]: the user, read through the same per-user cache as the
+    HTTP API (account/authentication.py), or AnonymousUser;
+  * scope["rooms"]: the rooms of the kind the socket's route is for (see
+    ROOM_PATHS) that the user may join, as a set of ids (strings, as they
+    appear in the URL):
+
+        {"study": {"12", "40"}}
+
+Consumers then authorize the connection and every message from the scope
+(`can_join(scope, "study", application_id)`), without querying the
+database. Rooms are read at connect with one query, and none for routes
+that are not rooms (notifications, the chat session list); a room created
+afterwards is picked up when the client reconnects.
+
+Without a valid token the session user from AuthMiddlewareStack (if any) is
+kept and no rooms are allowed.
+"""
+import logging
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.apps import apps
+from django.db.models import Q
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+logger = logging.getLogger(__name__)
+
+# Close codes for sockets refused by the consumers.
+CLOSE_UNAUTHENTICATED = 4401
+CLOSE_FORBIDDEN = 4403
+
+# Room kind -> (model, fields that name a participant).
+ROOM_SOURCES = {
+    "chat": ("chat.ChatSession", ("customer", "agent")),
+    "work": ("app.WorkVisaApplication", ("client",)),
+    "study": ("app.StudyVisaApplication", ("applicant",)),
+    "vacation": ("app.VacationVisaApplication", ("applicant",)),
+    "pilgrimage": ("app.PilgrimageVisaApplication", ("applicant",)),
+}
+
+# Route prefix (without the leading "/") -> the room kind its sockets join.
+ROOM_PATHS = (
+    ("ws/chat/", "chat"),
+    ("ws/work/visa-application/", "work"),
+    ("ws/study/visa-application/", "study"),
+    ("ws/vacation/visa-application/", "vacation"),
+    ("ws/pilgrimage/visa-application/", "pilgrimage"),
+)
+
+
+def _raw_token(scope):
+    params = parse_qs(scope.get("query_string", b"").decode("utf8"))
+    if params.get("token"):
+        return params["token"][0]
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            parts = value.decode("latin1").split()
+            if len(parts) == 2 and parts[0] in api_settings.AUTH_HEADER_TYPES:
+                return parts[1]
+    return None
+
+
+def room_kind(path):
+    """The room kind a socket on `path` joins, or None."""
+    path = path.lstrip("/")
+    return next((kind for prefix, kind in ROOM_PATHS if path.startswith(prefix)), None)
+
+
+def allowed_rooms(user_id, kinds=tuple(ROOM_SOURCES)):
+    """{kind: frozenset of ids} of the rooms of `kinds` that `user_id` takes part in."""
+    rooms = {}
+    for kind in kinds:
+        label, fields = ROOM_SOURCES[kind]
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}_id": user_id})
+        ids = apps.get_model(label).objects.filter(condition).values_list("pk", flat=True)
+        rooms[kind] = frozenset(str(pk) for pk in ids)
+    return rooms
+
+
+@database_sync_to_async
+def _principal(raw_token, kind):
+    from account.authentication import get_cached_user
+
+    try:
+        token = AccessToken(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError) as exc:
+        logger.info("Rejected WebSocket token: %s", exc)
+        return None, {}
+    user = get_cached_user(user_id)
+    if user is None or (api_settings.CHECK_USER_IS_ACTIVE and not user.is_active):
+        return None, {}
+    return user, allowed_rooms(user.pk, [kind]) if kind else {}
+
+
+def can_join(scope, kind, room_id):
+    """True if the socket's user takes part in room `room_id` of `kind`."""
+    return str(room_id) in scope.get("rooms", {}).get(kind, ())
+
+
+def scope_user_id(scope):
+    """Primary key of the socket's authenticated user, or None."""
+    user = scope.get("user")
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class JWTAuthMiddleware:
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, rooms={})
+        raw_token = _raw_token(scope)
+        if raw_token:
+            user, rooms = await _principal(raw_token, room_kind(scope.get("path", "")))
+            if user is not None:
+                scope["user"] = user
+                scope["rooms"] = rooms
+        return await self.inner(scope, receive, send)
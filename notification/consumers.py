@@ -3,16 +3,18 @@ import logging
 from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from globalconceptBE.query_metrics import QueryMetricsConsumerMixin
+from globalconceptBE.websocket_auth import scope_user_id
 
 Notification = None
 NotificationSerializer = None
 
 logger = logging.getLogger("notification.websocket")
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(QueryMetricsConsumerMixin, AsyncWebsocketConsumer):
     async def connect(self):
         """
-        Accepts a websocket connection if 'user_id' provided and user has notifications.
+        Accepts a websocket connection if the token names a user and they have notifications.
         Response is always built in this async context safely.
         """
         try:
@@ -29,7 +31,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                     logger.info("No notifications found for user_id=%r. Closing connection.", user_id)
                     await self.close()
             else:
-                logger.info("No user_id provided in query string. Closing connection.")
+                logger.info("No authenticated user for this socket. Closing connection.")
                 await self.close()
         except Exception as exc:
             logger.exception("WebSocket connection error: %s", exc)
@@ -42,8 +44,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         user_id = self._get_user_id_from_query()
         if not user_id:
-            logger.info("Received data but no user_id in query string: %s", text_data)
-            await self.send(text_data=json.dumps({'error': 'user_id required in query string.'}))
+            logger.info("Received data but no authenticated user: %s", text_data)
+            await self.send(text_data=json.dumps({'error': 'Authentication required.'}))
             await self.close()
             return
         notifications_data = await self.get_notifications_data_for_user_id(user_id)
@@ -90,12 +92,16 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             )
 
     def _get_user_id_from_query(self):
+        """
+        The user authenticated by JWTAuthMiddleware. A user_id still sent in
+        the query string by older clients must name that same user.
+        """
+        user_id = scope_user_id(self.scope)
         query_string = self.scope.get("query_string", b"").decode("utf8")
-        params = parse_qs(query_string)
-        user_id_list = params.get("user_id", [])
-        if user_id_list:
-            return user_id_list[0]
-        return None
+        user_id_list = parse_qs(query_string).get("user_id", [])
+        if user_id_list and str(user_id_list[0]) != str(user_id):
+            return None
+        return user_id
 
     def get_notification_model(self):
         global Notification
@@ -118,13 +118,9 @@ def savings_plan_pre_save_handler(sender, instance, **kwargs):
     """
     Stash old values before save to detect changes in post_save.
     """
-    if instance.pk:
-        try:
-            old_instance = SavingsPlan.objects.get(pk=instance.pk)
-            instance._old_amount_saved = old_instance.amount_saved
-            instance._old_status = old_instance.status
-        except SavingsPlan.DoesNotExist:
-            pass
+    if not instance._state.adding and instance.previous('status') is not None:
+        instance._old_amount_saved = instance.previous('amount_saved')
+        instance._old_status = instance.previous('status')
 
 @receiver(post_delete, sender=SavingsPlan)
 def savings_plan_post_delete_handler(sender, instance, **kwargs):
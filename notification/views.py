@@ -2,7 +2,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework import viewsets, permissions
 
-from app.views import CustomPagination
+from app.views import KeysetPagination
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -17,7 +17,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         # Only return notifications belonging to the current authenticated user
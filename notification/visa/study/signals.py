@@ -21,29 +21,13 @@ def study_application_pre_save(sender, instance, **kwargs):
     Attach the old instance or old status to the instance before saving,
     so we can detect status changes and other changes in post_save.
     """
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._old_status_id = old_instance.status_id
-            instance._old_is_submitted = old_instance.is_submitted
-            instance._old_institution_id = old_instance.institution_id
-            instance._old_course_of_study_id = old_instance.course_of_study_id
-            instance._old_program_type_id = old_instance.program_type_id
-            instance._old_offer_id = old_instance.study_visa_offer_id
-        except sender.DoesNotExist:
-            instance._old_status_id = None
-            instance._old_is_submitted = None
-            instance._old_institution_id = None
-            instance._old_course_of_study_id = None
-            instance._old_program_type_id = None
-            instance._old_offer_id = None
-    else:
-        instance._old_status_id = None
-        instance._old_is_submitted = None
-        instance._old_institution_id = None
-        instance._old_course_of_study_id = None
-        instance._old_program_type_id = None
-        instance._old_offer_id = None
+    # Read from the values snapshotted at load time (None for a new row).
+    instance._old_status_id = instance.previous('status')
+    instance._old_is_submitted = instance.previous('is_submitted')
+    instance._old_institution_id = instance.previous('institution')
+    instance._old_course_of_study_id = instance.previous('course_of_study')
+    instance._old_program_type_id = instance.previous('program_type')
+    instance._old_offer_id = instance.previous('study_visa_offer')
 
 @receiver(post_save, sender=StudyVisaApplication)
 def study_application_post_save(sender, instance, created, **kwargs):
@@ -83,9 +67,9 @@ def study_application_post_save(sender, instance, created, **kwargs):
 
     if old_status_id != new_status_id:
         try:
-            from definition.models import TableDropDownDefinition
-            old_status = TableDropDownDefinition.objects.get(pk=old_status_id) if old_status_id else None
-            new_status = TableDropDownDefinition.objects.get(pk=new_status_id) if new_status_id else None
+            from definition.registry import get_definition_by_id
+            old_status = get_definition_by_id(old_status_id)
+            new_status = get_definition_by_id(new_status_id)
             new_status_term = new_status.term if new_status else "Status Updated"
             old_status_term = old_status.term if old_status else None
         except Exception:
@@ -51,14 +51,7 @@ def vacation_application_pre_save(sender, instance, **kwargs):
     """
     Attach old status to the instance, to detect changes in post_save.
     """
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._old_status_id = old_instance.status_id
-        except sender.DoesNotExist:
-            instance._old_status_id = None
-    else:
-        instance._old_status_id = None
+    instance._old_status_id = instance.previous('status')
 
 @receiver(post_save, sender=VacationVisaApplication)
 def vacation_application_post_save(sender, instance, created, **kwargs):
@@ -88,8 +81,8 @@ def vacation_application_post_save(sender, instance, created, **kwargs):
             new_status = None
             if old_status_id:
                 try:
-                    from definition.models import TableDropDownDefinition
-                    old_status = TableDropDownDefinition.objects.get(pk=old_status_id)
+                    from definition.registry import get_definition_by_id
+                    old_status = get_definition_by_id(old_status_id)
                 except Exception:
                     old_status = None
             if instance.status:
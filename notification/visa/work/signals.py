@@ -62,17 +62,9 @@ def work_visa_application_post_save(sender, instance, created, **kwargs):
         )
     else:
         # Status changed/updated
-        # Only notify if status field has actually changed
-        from django.db.models import F
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            old_status_id = getattr(old_instance, "status_id", None)
-            new_status_id = getattr(instance, "status_id", None)
-        except sender.DoesNotExist:
-            old_status_id = None
-            new_status_id = instance.status_id
-
-        if old_status_id != new_status_id:
+        # Only notify if status field has actually changed. The snapshot still
+        # holds the pre-save value here; the row itself is already updated.
+        if instance.has_changed("status"):
             status_name = getattr(instance.status, "term", "updated")
             title = "Application Status Updated"
             message = (
@@ -91,13 +91,9 @@ def wallet_pre_save_handler(sender, instance, **kwargs):
     """
     Store old values before save so we can compare in post_save.
     """
-    if instance.pk:
-        try:
-            old_instance = Wallet.objects.get(pk=instance.pk)
-            instance._old_balance = old_instance.balance
-            instance._old_is_active = old_instance.is_active
-        except Wallet.DoesNotExist:
-            pass
+    if not instance._state.adding and instance.previous('balance') is not None:
+        instance._old_balance = instance.previous('balance')
+        instance._old_is_active = instance.previous('is_active')
 
 @receiver(post_delete, sender=Wallet)
 def wallet_post_delete_handler(sender, instance, **kwargs):
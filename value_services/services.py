@@ -21,7 +21,8 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://premiumsub.com.ng/api"
+BASE_URL = f"{getattr(settings, 'PREMIUMSUB_API_BASE_URL', 'https://premiumsub.com.ng')}/api"
+FLUTTERWAVE_BASE_URL = f"{getattr(settings, 'FLUTTERWAVE_API_BASE_URL', 'https://api.flutterwave.com')}/v3"
 TIMEOUT = 30  # seconds
 
 
@@ -418,7 +419,7 @@ def create_flutterwave_payment_link(tx_ref, amount, currency, customer_email,
 
     try:
         resp = rq.post(
-            "https://api.flutterwave.com/v3/payments",
+            f"{FLUTTERWAVE_BASE_URL}/payments",
             headers={"Authorization": f"Bearer {secret_key}", "Content-Type": "application/json"},
             json=payload, timeout=20,
         )
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from definition.models import TableDropDownDefinition
+from definition.registry import get_definition, get_definitions
 
 class LoanOffer(models.Model):
     """
@@ -107,14 +108,10 @@ class LoanApplication(models.Model):
     def save(self, *args, **kwargs):
         # Assign default status as 'Pending' if not set
         if self.status is None:
-            try:
-                self.status = TableDropDownDefinition.objects.get(
-                    table_name='loan_status',
-                    term__iexact='Pending'
-                )
-            except TableDropDownDefinition.DoesNotExist:
+            self.status = get_definition('loan_status', 'Pending', iexact=True)
+            if self.status is None:
                 # Fallback: try first available 'loan_status' or raise
-                first_status = TableDropDownDefinition.objects.filter(table_name='loan_status').first()
+                first_status = next(iter(get_definitions('loan_status')), None)
                 if first_status:
                     self.status = first_status
                 else:
@@ -8,7 +8,7 @@ from .models import LoanApplication, LoanRepayment, LoanOffer
 from .serializers import LoanApplicationSerializer, LoanRepaymentSerializer, LoanOfferSerializer
 
 # Import actual model for loan_type
-from definition.models import TableDropDownDefinition
+from definition.registry import get_definition
 
 class LoanOfferViewSet(viewsets.ModelViewSet):
     """
@@ -38,7 +38,7 @@ class LoanOfferViewSet(viewsets.ModelViewSet):
         Assumes corresponding TableDropDownDefinition.term is 'Study Loan'.
         """
         # Find the TableDropDownDefinition object with term="Study Loan"
-        study_loan_type = TableDropDownDefinition.objects.filter(term__iexact='Study Loan').first()
+        study_loan_type = get_definition('loan_type', 'Study Loan', iexact=True)
         if not study_loan_type:
             # No study loan type found, return empty response
             study_loans = LoanOffer.objects.none()
@@ -63,7 +63,7 @@ class LoanOfferViewSet(viewsets.ModelViewSet):
         Return only loan offers of type 'Civil Servant Loan'.
         Assumes corresponding TableDropDownDefinition.term is 'Civil Servant Loan'.
         """
-        civil_servant_type = TableDropDownDefinition.objects.filter(term__iexact='Civil Servant').first()
+        civil_servant_type = get_definition('loan_type', 'Civil Servant', iexact=True)
         if not civil_servant_type:
             civil_servant_loans = LoanOffer.objects.none()
         else:
@@ -1,12 +1,16 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
 
 
-class Wallet(models.Model):
+class Wallet(DirtyFieldsMixin, models.Model):
     """
     Represents a user's wallet balance and status.
     """
+    # Compared on save by the notification signals.
+    tracked_fields = ('balance', 'is_active')
+
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, related_name='wallet', on_delete=models.CASCADE
     )
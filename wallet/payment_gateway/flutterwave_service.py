@@ -17,7 +17,7 @@ import requests
 from django.conf import settings
 
 
-FLW_BASE_URL = "https://api.flutterwave.com/v3"
+FLW_BASE_URL = f"{getattr(settings, 'FLUTTERWAVE_API_BASE_URL', 'https://api.flutterwave.com')}/v3"
 SECRET_KEY = getattr(settings, "FLUTTERWAVE_SECRET_KEY", "")
 WEBHOOK_HASH = getattr(settings, "FLUTTERWAVE_WEBHOOK_HASH", "")
 
@@ -2,14 +2,18 @@
 from django.db import models
 from django.conf import settings
 from wallet.models import Wallet
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
 from datetime import timedelta, date
 
-class SavingsPlan(models.Model):
+class SavingsPlan(DirtyFieldsMixin, models.Model):
     """
     Represents a user's saving plan to fund their wallet.
     Automatically calculates deduction amount for recurring plans.
     Supports plan cancellation.
     """
+    # Compared on save by the notification signals.
+    tracked_fields = ('amount_saved', 'status')
+
     PLAN_STATUS = (
         ('active', 'Active'),
         ('completed', 'Completed'),
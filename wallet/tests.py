@@ -1,3 +1,83 @@
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from account.client.models import Client
+from app.benchmark import fixtures
+from wallet.models import Wallet
+from wallet.transactions.models import WalletTransaction
+
+
+class DirtyFieldTrackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 3, "notifications": 0, "messages": 0, "applications": 0})
+
+    def setUp(self):
+        self.transaction = WalletTransaction.objects.filter(status="pending").first()
+        if self.transaction is None:
+            self.transaction = WalletTransaction.objects.first()
+            WalletTransaction.objects.filter(pk=self.transaction.pk).update(status="pending")
+            self.transaction.refresh_from_db()
+
+    def test_change_detection_needs_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(self.transaction.has_changed("status"))
+            self.transaction.status = "failed"
+            self.assertTrue(self.transaction.has_changed("status"))
+            self.assertEqual(self.transaction.previous("status"), "pending")
+
+    def test_save_does_not_refetch_and_resets_snapshot(self):
+        self.transaction.status = "failed"
+        with CaptureQueriesContext(connection) as ctx:
+            self.transaction.save()
+        table = WalletTransaction._meta.db_table
+        self.assertFalse([q for q in ctx.captured_queries
+                          if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]])
+        self.assertEqual(self.transaction.previous("status"), "failed")
+        self.assertFalse(self.transaction.has_changed("status"))
+
+
+class SuccessfulTransitionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed(counts={"customers": 1, "transactions": 0, "notifications": 0, "messages": 0, "applications": 0})
+        cls.customer = Client.objects.filter(email__endswith=f"@{fixtures.EMAIL_DOMAIN}").get()
+        cls.wallet, _ = Wallet.objects.get_or_create(user=cls.customer)
+
+    def setUp(self):
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=Decimal("0"))
+        self.deposit = WalletTransaction.objects.create(
+            user=self.customer, wallet=self.wallet, transaction_type="deposit",
+            amount=Decimal("100"), reference="transition-test")
+
+    def _balance(self):
+        return Wallet.objects.get(pk=self.wallet.pk).balance
+
+    def test_two_stale_instances_credit_once(self):
+        # The verify view and the webhook each loaded the pending deposit.
+        verify = WalletTransaction.objects.get(pk=self.deposit.pk)
+        webhook = WalletTransaction.objects.get(pk=self.deposit.pk)
+        webhook.status = "successful"
+        webhook.save()
+        verify.status = "successful"
+        verify.save()
+        self.assertEqual(self._balance(), Decimal("100"))
+        self.assertEqual(WalletTransaction.objects.get(pk=self.deposit.pk).status, "successful")
+
+    def test_saving_a_successful_transaction_again_does_not_credit(self):
+        self.deposit.status = "successful"
+        self.deposit.save()
+        self.deposit.description = "Verified"
+        self.deposit.save()
+        self.assertEqual(self._balance(), Decimal("100"))
 
-# Create your tests here.
+    def test_created_successful_credits(self):
+        WalletTransaction.objects.create(
+            user=self.customer, wallet=self.wallet, transaction_type="deposit",
+            amount=Decimal("40"), reference="transition-test-2", status="successful")
+        self.assertEqual(self._balance(), Decimal("40"))
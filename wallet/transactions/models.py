@@ -3,13 +3,17 @@ from django.conf import settings
 from wallet.models import Wallet
 from wallet.saving_plans.models import SavingsPlan
 from django.db import transaction as db_transaction  # For atomic wallet updates
+from globalconceptBE.dirty_fields import DirtyFieldsMixin
 
 # Do NOT import PaymentGateway here to avoid circular import issues
 
-class WalletTransaction(models.Model):
+class WalletTransaction(DirtyFieldsMixin, models.Model):
     """
     Represents all wallet-related financial transactions.
     """
+    # save() processes the balance on the transition to 'successful'.
+    tracked_fields = ('status', 'transaction_type')
+
     TYPE_CHOICES = (
         ('deposit', 'Deposit'),
         ('withdrawal', 'Withdrawal'),
@@ -196,39 +200,40 @@ class WalletTransaction(models.Model):
     def save(self, *args, **kwargs):
         # Determine whether this is a new transaction or an update
         is_new = self._state.adding
-        old_status = None
-        old_type = None
-        if not is_new and self.pk:
-            # Fetch the previous object to see if status/type has changed
-            previous = type(self).objects.get(pk=self.pk)
-            old_status = previous.status
-            old_type = previous.transaction_type
-
-        # Save the transaction first to ensure it has an ID/reference, etc.
-        super().save(*args, **kwargs)
-
-        # Only process wallet balance when status transitions to 'successful'
-        should_process = False
-        if is_new:
-            # If created directly as 'successful', process immediately
-            if self.status == 'successful':
-                should_process = True
-        else:
-            # If an update changed the status to 'successful', process now
-            if self.status == 'successful' and (old_status != 'successful'):
-                should_process = True
+        # Status as loaded; only a hint, another instance may have saved since
+        old_status = self.previous('status')
 
-        # Only process once
-        if should_process:
-            try:
+        with db_transaction.atomic():
+            # Only process wallet balance when status transitions to 'successful'
+            should_process = False
+            if is_new:
+                # If created directly as 'successful', process immediately
+                should_process = self.status == 'successful'
+            elif self.status == 'successful' and old_status != 'successful':
+                # Claim the transition in the row itself: of several stale
+                # instances saved as 'successful' (verify view and webhook),
+                # only the one whose UPDATE moves the row gets to process it.
+                claimed = (
+                    type(self)._base_manager
+                    .filter(pk=self.pk)
+                    .exclude(status='successful')
+                    .update(status='successful')
+                )
+                should_process = claimed == 1
+
+            # Save the transaction first to ensure it has an ID/reference, etc.
+            super().save(*args, **kwargs)
+
+            # Only process once
+            if should_process:
                 self.process_transaction()
-            except Exception as e:
-                # Optionally, re-raise or log for admin feedback
-                raise e
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user']),
             models.Index(fields=['reference']),
+            # Keyset pagination: (created_at, id) overall and per wallet.
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['wallet', '-created_at', '-id']),
         ]
@@ -1,7 +1,9 @@
 from rest_framework import serializers
+
+from globalconceptBE.prefetch import PrefetchCheckedSerializerMixin
 from .models import WalletTransaction
 
-class WalletTransactionSerializer(serializers.ModelSerializer):
+class WalletTransactionSerializer(PrefetchCheckedSerializerMixin, serializers.ModelSerializer):
     wallet = serializers.StringRelatedField(read_only=True)
     user = serializers.StringRelatedField(read_only=True)
     payment_gateway = serializers.StringRelatedField(read_only=True)
@@ -9,6 +11,7 @@ class WalletTransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = WalletTransaction
+        select_related = ('user', 'wallet__user', 'payment_gateway', 'savings_plan__user')
         fields = [
             'id',
             'user',
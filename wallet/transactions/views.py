@@ -1,15 +1,16 @@
 from rest_framework import viewsets, permissions, decorators
 from rest_framework.response import Response
 
-from app.views import CustomPagination
+from app.views import KeysetPagination
+from globalconceptBE.prefetch import OptimizedQuerySetMixin
 from .models import WalletTransaction
 from .serializers import WalletTransactionSerializer
 
-class WalletTransactionViewSet(viewsets.ModelViewSet):
+class WalletTransactionViewSet(OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = WalletTransaction.objects.all()
     serializer_class = WalletTransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -19,7 +20,7 @@ class WalletTransactionViewSet(viewsets.ModelViewSet):
         date_from (created_at >=), date_to (created_at <=), and reference (exact).
         """
         user = self.request.user
-        base_queryset = WalletTransaction.objects.select_related('wallet', 'wallet__user')
+        base_queryset = super().get_queryset()
         if user.is_staff or user.is_superuser:
             # Admin: see all transactions, but filters still apply
             queryset = base_queryset.order_by('-created_at')